@@ -2,8 +2,13 @@
 the plot window is resized. Use the start() and stop() functions to turn
 updates on and off.
 
+With an asyncio event loop, use start_asyncio() and stop_asyncio() instead:
+the processing of R events is then scheduled by the loop, and run in the
+thread of the default rpy2.rinterface.executor.RExecutor.
+
 """
 from rpy2.rinterface import process_revents
+from rpy2.rinterface import executor
 import time
 import warnings
 import threading
@@ -57,3 +62,87 @@ def stop():
     """ Stop the threaded processing of R events. """
     EventProcessor().stop()
 
+
+
+class AsyncioEventProcessor(object):
+    """ Processor for R events driven by an asyncio event loop.
+
+    The loop schedules a call to rinterface.process_revents() every
+    `interval` seconds. The call is run in the thread of the default
+    RExecutor, and the next one is only scheduled once it has completed,
+    so the loop is never blocked by R and calls do not accumulate while
+    R is busy. """
+
+    def __init__(self, loop=None, interval=None):
+        import asyncio
+        if loop is None:
+            loop = asyncio.get_event_loop()
+        if interval is None:
+            interval = EventProcessor.interval
+        self._loop = loop
+        self.interval = interval
+        self._handle = None
+        self._future = None
+        self._running = False
+
+    loop = property(lambda self: self._loop,
+                    None, None, "Event loop driving the processing.")
+
+    running = property(lambda self: self._running,
+                       None, None, "Is the processing of R events started.")
+
+    def start(self):
+        """ start the event processor """
+        if self._running:
+            warnings.warn("Processing of R events already started.")
+            return
+        self._running = True
+        self._schedule()
+
+    def stop(self):
+        """ stop the event processor """
+        self._running = False
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+    def _schedule(self):
+        self._handle = self._loop.call_later(self.interval, self._process)
+
+    def _process(self):
+        import asyncio
+        self._handle = None
+        if not self._running:
+            return
+        future = executor.get_executor().submit(process_revents)
+        self._future = asyncio.wrap_future(future, loop=self._loop)
+        self._future.add_done_callback(self._done)
+
+    def _done(self, future):
+        self._future = None
+        if not future.cancelled() and future.exception() is not None:
+            warnings.warn("Error while processing R events: %s" %
+                          str(future.exception()))
+        if self._running:
+            self._schedule()
+
+
+_asyncio_processor = None
+
+def start_asyncio(loop=None, interval=None):
+    """ Start the processing of R events from an asyncio event loop
+    (the current event loop if `loop` is None). """
+    global _asyncio_processor
+    if _asyncio_processor is not None and _asyncio_processor.running:
+        warnings.warn("Processing of R events already started.")
+        return _asyncio_processor
+    _asyncio_processor = AsyncioEventProcessor(loop=loop, interval=interval)
+    _asyncio_processor.start()
+    return _asyncio_processor
+
+def stop_asyncio():
+    """ Stop the processing of R events from an asyncio event loop. """
+    global _asyncio_processor
+    if _asyncio_processor is not None:
+        _asyncio_processor.stop()
+        _asyncio_processor = None
@@ -0,0 +1,37 @@
+import unittest
+import asyncio
+from rpy2.interactive import process_revents
+
+
+class AsyncioEventProcessorTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        process_revents.stop_asyncio()
+        self.loop.close()
+
+    def testStartStop(self):
+        processor = process_revents.start_asyncio(loop=self.loop,
+                                                  interval=0.01)
+        self.assertTrue(processor.running)
+        self.assertTrue(processor.loop is self.loop)
+        self.loop.run_until_complete(asyncio.sleep(0.1))
+        self.assertTrue(processor.running)
+        process_revents.stop_asyncio()
+        self.assertFalse(processor.running)
+
+    def testStartTwice(self):
+        processor = process_revents.start_asyncio(loop=self.loop)
+        with self.assertWarns(UserWarning):
+            res = process_revents.start_asyncio(loop=self.loop)
+        self.assertTrue(res is processor)
+
+
+def suite():
+    suite = unittest.TestLoader().loadTestsFromTestCase(AsyncioEventProcessorTestCase)
+    return suite
+
+if __name__ == '__main__':
+    unittest.main()
@@ -56,6 +56,7 @@ from rpy2.rinterface._rinterface import (baseenv,
                                          get_flushconsole,
                                          get_initoptions,
                                          get_readconsole,
+                                         get_release_gil,
                                          get_resetconsole,
                                          get_showfiles,
                                          get_showmessage,
@@ -72,6 +73,7 @@ from rpy2.rinterface._rinterface import (baseenv,
                                          set_flushconsole,
                                          set_initoptions,
                                          set_readconsole,
+                                         set_release_gil,
                                          set_resetconsole,
                                          set_showfiles,
                                          set_showmessage,
@@ -79,6 +81,10 @@ from rpy2.rinterface._rinterface import (baseenv,
                                          set_writeconsole_warnerror,
                                          str_typeint,
                                          unserialize,
+                                         load,
+                                         vector_frombuffer,
+                                         vector_tobuffer,
+                                         vector_wrapbuffer,
                                          BoolSexpVector,
                                          ByteSexpVector,
                                          ComplexSexpVector,
@@ -109,6 +115,7 @@ from rpy2.rinterface._rinterface import (baseenv,
                                          NULL,
                                          REALSXP,
                                          R_LEN_T_MAX,
+                                         R_XLEN_T_MAX,
                                          R_VERSION_BUILD,
                                          R_NilValue,
                                          RNULLType,
@@ -119,6 +126,7 @@ from rpy2.rinterface._rinterface import (baseenv,
                                          SexpClosure,
                                          SexpEnvironment,
                                          SexpExtPtr,
+                                         SexpPreparedCall,
                                          SexpSymbol,
                                          SexpS4,
                                          SexpVector,
@@ -94,11 +94,13 @@ static PyObject* EmbeddedR_unserialize(PyObject* self, PyObject* args);
 #include "embeddedr.h"
 #include "na_values.h"
 #include "sexp.h"
+#include "serialize.h"
 #include "r_utils.h"
 #include "buffer.h"
 #include "array.h"
 #include "sequence.h"
 #include "rexternalptr.h"
+#include "altrep.h"
 
 static PySexpObject* newPySexpObject(const SEXP sexp);
 /* Helper variable to quickly resolve SEXP types.
@@ -112,11 +114,13 @@ static SEXP newSEXP(PyObject *object, const int rType);
 #include "embeddedr.c"
 #include "null_value.c"
 #include "na_values.c"
+#include "serialize.c"
 #include "sexp.c"
 #include "buffer.c"
 #include "array.c"
 #include "sequence.c"
 #include "rexternalptr.c"
+#include "altrep.c"
 
 /* A tuple that holds options to initialize R */
 static PyObject *initOptions;
@@ -363,6 +367,8 @@ EmbeddedR_WriteConsoleEx(const char *buf, int len, int otype)
   }
 
   if (consolecallback == NULL) {
+    Py_XDECREF(arglist);
+    RPY_GIL_RELEASE(is_threaded, gstate);
     return;
   }
 
@@ -430,10 +436,13 @@ EmbeddedR_ShowMessage(const char *buf)
     //PyErr_NoMemory();
     printf("Ouch. Likely a out of memory.\n");
     signal(SIGINT, old_int);
+    RPY_GIL_RELEASE(is_threaded, gstate);
     return;
   }
 
   if (showMessageCallback == NULL) {
+    Py_DECREF(arglist);
+    RPY_GIL_RELEASE(is_threaded, gstate);
     return;
   }
 
@@ -949,14 +958,18 @@ EmbeddedR_CleanUp(SA_TYPE saveact, int status, int runLast)
     /* FIXME: Print the exception in the meanwhile */
     PyErr_Print();
     PyErr_Clear();
+    RPY_GIL_RELEASE(is_threaded, gstate);
   } else {
-    if (result == Py_None)
+    if (result == Py_None) {
+      RPY_GIL_RELEASE(is_threaded, gstate);
       jump_to_toplevel();
+    }
 
     int res_true = PyObject_IsTrue(result);
     switch(res_true) {
     case -1:
       printf("*** error while testing of the value returned from the cleanup callback is true.\n");
+      RPY_GIL_RELEASE(is_threaded, gstate);
       jump_to_toplevel();
       break;
     case 1:
@@ -1082,10 +1095,6 @@ static PyObject* EmbeddedR_ProcessEvents(PyObject *self)
                  "R should not process events before being initialized.");
     return NULL;
   }
-  if (rpy_has_status(RPY_R_BUSY)) {
-    PyErr_Format(PyExc_RuntimeError, "Concurrent access to R is not allowed.");
-    return NULL;
-  }
   embeddedR_setlock();
 #if defined(HAVE_AQUA) || (defined(Win32) || defined(Win64))
   /* Can the call to R_ProcessEvents somehow fail ? */
@@ -1140,9 +1149,9 @@ end_r(void)
 PyDoc_STRVAR(EmbeddedR_init_doc,
              "Initialize an embedded R.\n"
 	     "initr(r_preservehash=False) -> return code (an integer)\n"
-	     "\nThe optional argument r_preservehash is using an hash of "
-	     "the memory address as a key in an R environment to "
-	     "preserve R objects from garbage collection.");
+	     "\nThe optional argument r_preservehash is ignored (R objects "
+	     "are always preserved from garbage collection using rpy2's "
+	     "own pool) and only kept for backward compatibility.");
 
 static PyObject* EmbeddedR_init(PyObject *self, PyObject *args, PyObject *kwds)
 {
@@ -1349,18 +1358,6 @@ static PyObject* EmbeddedR_init(PyObject *self, PyObject *args, PyObject *kwds)
      to try to initialize R anyway. */
   }
 
-  /* FIXME: Attempt at using an R container distinct from R's PreciousList */
-  /* (currently replaced by a Python dict and R's PreciousList) */
-  if (preservehash == Py_True) {
-    PROTECT(
-	    RPY_R_PreciousEnv = rpy2_newenv(Rf_ScalarLogical(TRUE),
-					    R_GlobalEnv, 
-					    Rf_ScalarInteger(29))
-	    );
-    R_PreserveObject(RPY_R_PreciousEnv);
-    UNPROTECT(1);
-  }
-
   return res;
 }
 
@@ -1434,6 +1431,42 @@ PyDoc_STRVAR(EmbeddedR_setinteractive_doc,
              and could lead to an unpredictable outcome.)");
 
 
+/* Whether the GIL is released while R is evaluating an expression */
+static int embeddedR_releasegil = 0;
+
+static PyObject* EmbeddedR_setReleaseGIL(PyObject *self, PyObject *status)
+{
+  if (! PyBool_Check(status)) {
+    PyErr_SetString(PyExc_ValueError, "The status must be a boolean");
+    return NULL;
+  }
+  embeddedR_releasegil = PyObject_IsTrue(status);
+  Py_RETURN_NONE;
+}
+PyDoc_STRVAR(EmbeddedR_setReleaseGIL_doc,
+             "set_release_gil(status)\n\
+             \n\
+             Set whether the Python GIL is released while R is evaluating\n\
+             an expression (default: False). When True, other Python threads\n\
+             can run during long R computations; Python callbacks from R\n\
+             (console, functions exposed with rternalize, ...) reacquire\n\
+             the GIL. Threads wanting to use R while it is busy wait for it\n\
+             to be free.");
+
+static PyObject* EmbeddedR_getReleaseGIL(PyObject *self)
+{
+  if (embeddedR_releasegil) {
+    Py_RETURN_TRUE;
+  }
+  Py_RETURN_FALSE;
+}
+PyDoc_STRVAR(EmbeddedR_getReleaseGIL_doc,
+             "get_release_gil()\n\
+             \n\
+             Return whether the Python GIL is released while R is\n\
+             evaluating an expression (see set_release_gil).");
+
+
 
 
 /* Create a Python exception from an R error */
@@ -1530,8 +1563,6 @@ SEXP do_eval_expr(SEXP expr_R, SEXP env_R) {
     /* env_R = R_GlobalContext; */
   }
 
-  /* Py_BEGIN_ALLOW_THREADS */
-
 #ifdef _WIN32  
   last_sighandler = PyOS_setsig(SIGBREAK, interrupt_R);
 #else
@@ -1542,9 +1573,15 @@ SEXP do_eval_expr(SEXP expr_R, SEXP env_R) {
 
   /* FIXME: evaluate expression in the given environment */
   interrupted = 0;
-  res_R = R_tryEval(expr_R, env_R, &errorOccurred);
+  if (embeddedR_releasegil) {
+    /* Callbacks to Python reacquire the GIL with PyGILState_Ensure() */
+    PyThreadState *thread_state = PyEval_SaveThread();
+    res_R = R_tryEval(expr_R, env_R, &errorOccurred);
+    PyEval_RestoreThread(thread_state);
+  } else {
+    res_R = R_tryEval(expr_R, env_R, &errorOccurred);
+  }
 
-  /* Py_END_ALLOW_THREADS */
 #ifdef _WIN32
   PyOS_setsig(SIGBREAK, python_sighandler);   
 #else 
@@ -1566,6 +1603,7 @@ SEXP do_eval_expr(SEXP expr_R, SEXP env_R) {
 
 
 static PyTypeObject EnvironmentSexp_Type;
+static PyTypeObject PreparedCallSexp_Type;
 
 /* This is the method to call when invoking a 'Sexp' */
 static PyObject *
@@ -1595,10 +1633,6 @@ Sexp_rcall(PyObject *self, PyObject *args)
     return NULL;
   }
 
-  if (rpy_has_status(RPY_R_BUSY)) {
-    PyErr_Format(PyExc_RuntimeError, "Concurrent access to R is not allowed.");
-    return NULL;
-  }
   embeddedR_setlock();
     
   SEXP call_R, c_R, res_R;
@@ -1856,6 +1890,93 @@ Sexp_call(PyObject *self, PyObject *args, PyObject *kwds)
 }
 
 
+/* Build the R call (LANGSXP) for the function once, with the names
+ * of the arguments already installed as symbols. The values are set
+ * for each call by PreparedCallSexp_call(), into a copy of the cells.
+ */
+static PyObject *
+SexpClosure_prepare(PyObject *self, PyObject *args)
+{
+  if (! (rpy_has_status(RPY_R_INITIALIZED))) {
+    PyErr_Format(PyExc_RuntimeError, 
+                 "R must be initialized before any call to R functions is possible.");
+    return NULL;
+  }
+
+  PyObject *names, *names_seq, *argName, *pybytes;
+  if (! PyArg_ParseTuple(args, "O", &names)) {
+    return NULL;
+  }
+  names_seq = PySequence_Fast(names, 
+                              "The names of the arguments must be a sequence.");
+  if (! names_seq) {
+    return NULL;
+  }
+  Py_ssize_t nparams = PySequence_Fast_GET_SIZE(names_seq);
+  Py_ssize_t arg_i;
+  for (arg_i = 0; arg_i < nparams; arg_i++) {
+    argName = PySequence_Fast_GET_ITEM(names_seq, arg_i);
+    if (argName != Py_None && 
+        ! (PyUnicode_Check(argName) && (PyUnicode_GET_LENGTH(argName) > 0))) {
+      PyErr_SetString(PyExc_TypeError, 
+                      "All names must be non-empty strings (or None).");
+      Py_DECREF(names_seq);
+      return NULL;
+    }
+  }
+
+  SEXP fun_R = RPY_SEXP((PySexpObject *)self);
+  if (! fun_R) {
+    PyErr_Format(PyExc_ValueError, "Underlying R function is a NULL SEXP.");
+    Py_DECREF(names_seq);
+    return NULL;
+  }
+
+  embeddedR_setlock();
+
+  SEXP call_R, c_R;
+  PROTECT(call_R = allocList(nparams + 1));
+  SET_TYPEOF(call_R, LANGSXP);
+  SETCAR(call_R, fun_R);
+  c_R = CDR(call_R);
+  for (arg_i = 0; arg_i < nparams; arg_i++) {
+    argName = PySequence_Fast_GET_ITEM(names_seq, arg_i);
+    if (argName != Py_None) {
+      pybytes = PyUnicode_AsUTF8String(argName);
+      if (! pybytes) {
+        UNPROTECT(1);
+        Py_DECREF(names_seq);
+        embeddedR_freelock();
+        return NULL;
+      }
+      SET_TAG(c_R, installChar(mkCharCE(PyBytes_AsString(pybytes), CE_UTF8)));
+      Py_DECREF(pybytes);
+    }
+    c_R = CDR(c_R);
+  }
+  Py_DECREF(names_seq);
+
+  PySexpObject *res = (PySexpObject *)Sexp_new(&PreparedCallSexp_Type,
+                                               Py_None, Py_None);
+  if (res && Rpy_ReplaceSexp(res, call_R) == -1) {
+    Py_DECREF(res);
+    res = NULL;
+  }
+  UNPROTECT(1);
+  embeddedR_freelock();
+  return (PyObject *)res;
+}
+
+PyDoc_STRVAR(SexpClosure_prepare_doc,
+             "S.prepare(names) -> SexpPreparedCall\n\n"
+             "Return a call to the underlying R function, built once,"
+             " for a fixed signature. names is a sequence with"
+             " for each argument in the call either its name"
+             " or None (unnamed argument)."
+             " Calling the returned object with as many positional arguments"
+             " only sets their values in the R call before evaluating it.");
+
+
 static PySexpObject*
 SexpClosure_env_get(PyObject *self)
 {
@@ -1865,10 +1986,6 @@ SexpClosure_env_get(PyObject *self)
       PyErr_Format(PyExc_ValueError, "NULL SEXP.");
       return NULL;
   }
-  if (rpy_has_status(RPY_R_BUSY)) {
-    PyErr_Format(PyExc_RuntimeError, "Concurrent access to R is not allowed.");
-    return NULL;
-  }
   embeddedR_setlock();
   PROTECT(closureEnv = CLOENV(sexp));
   embeddedR_freelock();
@@ -1886,6 +2003,8 @@ This corresponds to the C-level function CLOENV(SEXP).\n\
 static PyMethodDef ClosureSexp_methods[] = {
   {"rcall", (PyCFunction)Sexp_rcall, METH_VARARGS,
    SexpClosure_rcall_doc},
+  {"prepare", (PyCFunction)SexpClosure_prepare, METH_VARARGS,
+   SexpClosure_prepare_doc},
   {NULL, NULL}          /* sentinel */
 };
 
@@ -2003,10 +2122,6 @@ EnvironmentSexp_findVar(PyObject *self, PyObject *args, PyObject *kwds)
     return NULL; 
   }
 
-  if (rpy_has_status(RPY_R_BUSY)) {
-    PyErr_Format(PyExc_RuntimeError, "Concurrent access to R is not allowed.");
-    return NULL;
-  }
   embeddedR_setlock();
 
   const SEXP rho_R = RPY_SEXP((PySexpObject *)self);
@@ -2068,14 +2183,11 @@ EnvironmentSexp_frame(PyObject *self)
   SEXP res_R = NULL;
   PySexpObject *res;
 
-  if (rpy_has_status(RPY_R_BUSY)) {
-    PyErr_Format(PyExc_RuntimeError, "Concurrent access to R is not allowed.");
-    return NULL;
-  }
   embeddedR_setlock();
 
   res_R = FRAME(RPY_SEXP((PySexpObject *)self));
   res = newPySexpObject(res_R);
+  embeddedR_freelock();
   return (PyObject *)res;
 }
 PyDoc_STRVAR(EnvironmentSexp_frame_doc,
@@ -2089,10 +2201,6 @@ EnvironmentSexp_enclos(PyObject *self)
                  "R must be initialized before environments can be accessed.");
     return NULL;
   }
-  if (rpy_has_status(RPY_R_BUSY)) {
-    PyErr_Format(PyExc_RuntimeError, "Concurrent access to R is not allowed.");
-    return NULL;
-  }
   embeddedR_setlock();
 
   SEXP res_R = NULL;
@@ -2108,10 +2216,6 @@ PyDoc_STRVAR(EnvironmentSexp_enclos_doc,
 static PyObject* 
 EnvironmentSexp_keys(PyObject *sexpEnvironment)
 {
-  if (rpy_has_status(RPY_R_BUSY)) {
-    PyErr_Format(PyExc_RuntimeError, "Concurrent access to R is not allowed.");
-    return NULL;
-  }
   embeddedR_setlock();
 
   SEXP rho_R = RPY_SEXP((PySexpObject *)sexpEnvironment);
@@ -2177,11 +2281,6 @@ EnvironmentSexp_subscript(PyObject *self, PyObject *key)
     return NULL;
   }
 
-  if (rpy_has_status(RPY_R_BUSY)) {
-    PyErr_Format(PyExc_RuntimeError, "Concurrent access to R is not allowed.");
-    Py_DECREF(pybytes);
-    return NULL;
-  }
   embeddedR_setlock();
 
   SEXP rho_R = RPY_SEXP((PySexpObject *)self);
@@ -2253,11 +2352,6 @@ EnvironmentSexp_ass_subscript(PyObject *self, PyObject *key, PyObject *value)
   PyObject *pybytes = PyUnicode_AsUTF8String(key);
   name = PyBytes_AsString(pybytes);
 
-  if (rpy_has_status(RPY_R_BUSY)) {
-    PyErr_Format(PyExc_RuntimeError, "Concurrent access to R is not allowed.");
-    Py_DECREF(pybytes);
-    return -1;
-  }
   embeddedR_setlock();
 
 
@@ -2353,10 +2447,6 @@ EnvironmentSexp_ass_subscript(PyObject *self, PyObject *key, PyObject *value)
 
 static Py_ssize_t EnvironmentSexp_length(PyObject *self) 
 {
-  if (rpy_has_status(RPY_R_BUSY)) {
-    PyErr_Format(PyExc_RuntimeError, "Concurrent access to R is not allowed.");
-    return -1;
-  }
   embeddedR_setlock();
 
   SEXP rho_R = RPY_SEXP((PySexpObject *)self);
@@ -2382,10 +2472,6 @@ static PyMappingMethods EnvironmentSexp_mappingMethods = {
 static PyObject* 
 EnvironmentSexp_iter(PyObject *sexpEnvironment)
 {
-  if (rpy_has_status(RPY_R_BUSY)) {
-    PyErr_Format(PyExc_RuntimeError, "Concurrent access to R is not allowed.");
-    return NULL;
-  }
   embeddedR_setlock();
 
   SEXP rho_R = RPY_SEXP((PySexpObject *)sexpEnvironment);
@@ -2491,10 +2577,6 @@ EnvironmentSexp_init(PyObject *self, PyObject *args, PyObject *kwds)
     return -1;
   }
 
-  if (rpy_has_status(RPY_R_BUSY)) {
-    PyErr_Format(PyExc_RuntimeError, "Concurrent access to R is not allowed.");
-    return -1;
-  }
   embeddedR_setlock();
 
   if (PyObject_IsInstance(object, 
@@ -2652,10 +2734,6 @@ SymbolSexp_init(PyObject *self, PyObject *args, PyObject *kwds)
     return -1;
   }
 
-  if (rpy_has_status(RPY_R_BUSY)) {
-    PyErr_Format(PyExc_RuntimeError, "Concurrent access to R is not allowed.");
-    return -1;
-  }
   embeddedR_setlock();
   
   SEXP rres = R_NilValue;
@@ -2756,6 +2834,148 @@ static PyTypeObject LangSexp_Type = {
 };
 
 
+/* Evaluate a prepared call, the values for the arguments
+ * replacing the ones from the previous evaluation. */
+static PyObject *
+PreparedCallSexp_call(PyObject *self, PyObject *args, PyObject *kwds)
+{
+  if (kwds != NULL && PyDict_Check(kwds) && PyDict_Size(kwds) > 0) {
+    PyErr_Format(PyExc_TypeError, 
+                 "The names of the arguments are set when the call is prepared: "
+                 "only positional arguments are accepted.");
+    return NULL;
+  }
+  if (! (rpy_has_status(RPY_R_INITIALIZED))) {
+    PyErr_Format(PyExc_RuntimeError, 
+                 "R must be initialized before any call to R functions is possible.");
+    return NULL;
+  }
+  SEXP call_R = RPY_SEXP((PySexpObject *)self);
+  if (! call_R) {
+    PyErr_Format(PyExc_ValueError, "NULL SEXP.");
+    return NULL;
+  }
+  /* The arguments are set by walking the call: anything else than
+   * a call (for example when the instance was built from an arbitrary
+   * Sexp) cannot be evaluated. */
+  if (TYPEOF(call_R) != LANGSXP) {
+    PyErr_Format(PyExc_TypeError, 
+                 "The underlying R object is not a call (typeof %i). "
+                 "Prepared calls are built with SexpClosure.prepare().",
+                 TYPEOF(call_R));
+    return NULL;
+  }
+  Py_ssize_t nparams = PyTuple_GET_SIZE(args);
+  if (nparams != (Py_ssize_t)(length(call_R) - 1)) {
+    PyErr_Format(PyExc_TypeError, 
+                 "The prepared call takes %i arguments (%zd given).",
+                 length(call_R) - 1, nparams);
+    return NULL;
+  }
+
+  embeddedR_setlock();
+
+  SEXP c_R, tmp_R, res_R, thiscall_R;
+  PyObject *argValue;
+  PyObject *res = NULL;
+  int protect_count = 0;
+  Py_ssize_t arg_i;
+  /* The values are set into a copy of the cells of the call (the function
+   * and the names of the arguments are shared): the call R sees during
+   * the evaluation (sys.call(), match.call()) keeps its values after it,
+   * and re-entrant calls do not overwrite each other's values. */
+  PROTECT(thiscall_R = shallow_duplicate(call_R));
+  for (arg_i = 0, c_R = CDR(thiscall_R); 
+       arg_i < nparams; 
+       arg_i++, c_R = CDR(c_R)) {
+    argValue = PyTuple_GET_ITEM(args, arg_i);
+    if (PyObject_TypeCheck(argValue, &Sexp_Type)) {
+      tmp_R = RPY_SEXP((PySexpObject *)argValue);
+    } else {
+      RPY_PYSCALAR_RVECTOR(argValue, tmp_R);
+    }
+    if (! tmp_R) {
+      PyErr_Format(PyExc_ValueError, 
+                   "All parameters must be of type Sexp_Type,"
+                   "or Python int/long, float, bool, or None"
+                   );
+      goto clear;
+    }
+    SETCAR(c_R, tmp_R);
+    UNPROTECT(protect_count);
+    protect_count = 0;
+  }
+
+  PROTECT(res_R = do_eval_expr(thiscall_R, RPY_SEXP(globalEnv)));
+  protect_count++;
+  if (PyErr_Occurred()) {
+    /* Python exception set during the call to do_eval_expr() */
+    if (res_R == R_NilValue) {
+      goto clear;
+    } else {
+      printf("Warning: Exception while result not R_NilValue.\n");
+    }
+  }
+  res = (PyObject *)newPySexpObject(res_R);
+
+ clear:
+  UNPROTECT(protect_count + 1);
+  embeddedR_freelock();
+  return res;
+}
+
+PyDoc_STRVAR(PreparedCallSexp_Type_doc,
+"Call to an R function with a fixed signature, as returned\
+ by the method SexpClosure.prepare(). Calling it with values\
+ for the arguments evaluates the call in the global environment.");
+
+static PyTypeObject PreparedCallSexp_Type = {
+        /* The ob_type field must be initialized in the module init function
+         * to be portable to Windows without using C++. */
+	PyVarObject_HEAD_INIT(NULL, 0)
+        "rpy2.rinterface.SexpPreparedCall",  /*tp_name*/
+        sizeof(PySexpObject),   /*tp_basicsize*/
+        0,                      /*tp_itemsize*/
+        /* methods */
+        0, /*tp_dealloc*/
+        0,                      /*tp_print*/
+        0,                      /*tp_getattr*/
+        0,                      /*tp_setattr*/
+        0,                      /*tp_compare*/
+        0,                      /*tp_repr*/
+        0,                      /*tp_as_number*/
+        0,                      /*tp_as_sequence*/
+        0,                      /*tp_as_mapping*/
+        0,                      /*tp_hash*/
+        PreparedCallSexp_call,  /*tp_call*/
+        0,                      /*tp_str*/
+        0,                      /*tp_getattro*/
+        0,                      /*tp_setattro*/
+        0,                      /*tp_as_buffer*/
+        Py_TPFLAGS_DEFAULT,     /*tp_flags*/
+        PreparedCallSexp_Type_doc,                      /*tp_doc*/
+        0,                      /*tp_traverse*/
+        0,                      /*tp_clear*/
+        0,                      /*tp_richcompare*/
+        0,                      /*tp_weaklistoffset*/
+        0,                      /*tp_iter*/
+        0,                      /*tp_iternext*/
+        0,           /*tp_methods*/
+        0,                      /*tp_members*/
+        0,                      /*tp_getset*/
+        &LangSexp_Type,         /*tp_base*/
+        0,                      /*tp_dict*/
+        0,                      /*tp_descr_get*/
+        0,                      /*tp_descr_set*/
+        0,                      /*tp_dictoffset*/
+        0,                      /*tp_init*/
+        0,                      /*tp_alloc*/
+        0,                      /*tp_new*/
+        0,                      /*tp_free*/
+        0                      /*tp_is_gc*/
+};
+
+
 /* --- Create a SEXP object --- 
  * Given an R SEXP object, it creates a 
  * PySexpObject that is an rpy2 Python representation
@@ -2773,6 +2993,7 @@ static PySexpObject*
     PyErr_Format(PyExc_ValueError, "NULL SEXP.");
     return NULL;
   }
+  int is_locked = embeddedR_setlock_nested();
   /* FIXME: let the possibility to manipulate un-evaluated promises ? */
   if (TYPEOF(sexp) == PROMSXP) {
     PROTECT(env_R = PRENV(sexp));
@@ -2850,12 +3071,15 @@ static PySexpObject*
     /* FIXME: Override possible error message from Rpy_ReleaseObject 
     (should an aggregated error message be made ? */
     PyErr_NoMemory();
+    embeddedR_freelock_nested(is_locked);
     return NULL;
   }
   /* PyObject_Init(&object, &ClosureSexp_Type); */
   if (Rpy_ReplaceSexp(object, sexp_ok) == -1) {
+    embeddedR_freelock_nested(is_locked);
     return NULL;
   }
+  embeddedR_freelock_nested(is_locked);
   /* FIXME: Increment reference ? */
   /* Py_INCREF(object); */
   return object;
@@ -2870,6 +3094,7 @@ newSEXP(PyObject *object, int rType)
 {
   SEXP sexp;
   SEXP str_R; /* used whenever there a string / unicode */
+  RPy_StrCache strcache;
   PyObject *seq_object, *item, *item_tmp, *na, *pybytes; 
 
 #ifdef RPY_VERBOSE
@@ -2967,32 +3192,18 @@ newSEXP(PyObject *object, int rType)
   case STRSXP:
     PROTECT(sexp = NEW_CHARACTER(length));
     na = NACharacter_New(1);
+    RPy_StrCache_init(&strcache);
     for (i = 0; i < length; ++i) {
       /* item is a borrowed reference */
       item = PySequence_Fast_GET_ITEM(seq_object, i);
       if (item == na) {
         str_R = NA_STRING;
       } else if (PyUnicode_Check(item)) {
-	pybytes = PyUnicode_AsUTF8String(item);
-	if (pybytes == NULL) {
+	str_R = RPy_StrCache_tocharsxp(&strcache, item);
+	if (str_R == NULL) {
 	  sexp = NULL;
 	  break;
 	}
-	const char *string = PyBytes_AsString(pybytes);
-	if (string == NULL) {
-	  Py_DECREF(pybytes);
-	  sexp = NULL;
-	  break;
-	}
-        str_R = mkCharCE(string, CE_UTF8);
-	Py_DECREF(pybytes);
-        if (!str_R) {
-          PyErr_NoMemory();
-          UNPROTECT(1);
-          sexp = NULL;
-          Py_DECREF(na);
-          break;
-        }
       }
       else {
         PyErr_Clear();
@@ -3000,6 +3211,7 @@ newSEXP(PyObject *object, int rType)
       }
       SET_STRING_ELT(sexp, i, str_R);
     }
+    RPy_StrCache_clear(&strcache);
     UNPROTECT(1);
     Py_XDECREF(na);
     break;
@@ -3099,6 +3311,223 @@ newSEXP(PyObject *object, int rType)
 
 
 
+PyDoc_STRVAR(EmbeddedR_vectorFromBuffer_doc,
+	     "vector_frombuffer(obj, sexptype, setdim=False)\n\n"
+	     "Build an R vector of type sexptype from a Python object\n"
+	     "exporting the buffer protocol (array.array, memoryview,\n"
+	     "numpy arrays, ...), copying the items in FORTRAN order.\n"
+	     "When setdim is True the R attribute \"dim\" is set\n"
+	     "to the shape of the buffer.\n"
+	     "The items in the buffer must be native-endian booleans,\n"
+	     "integers, floats or complexes that fit the R type "
+	     "(TypeError is raised otherwise). OverflowError is raised\n"
+	     "for integers that do not fit in an R integer (INTSXP).");
+
+static PyObject*
+EmbeddedR_vectorFromBuffer(PyObject *self, PyObject *args, PyObject *kwds)
+{
+  PyObject *object;
+  int sexptype;
+  int setdim = 0;
+  int status;
+  SEXP sexp;
+  static char *kwlist[] = {"obj", "sexptype", "setdim", NULL};
+
+  if (! PyArg_ParseTupleAndKeywords(args, kwds, "Oi|i",
+                                    kwlist,
+                                    &object, &sexptype, &setdim)) {
+    return NULL;
+  }
+
+  if (! (rpy_has_status(RPY_R_INITIALIZED))) {
+    PyErr_Format(PyExc_RuntimeError, 
+                 "R must be initialized before any instance can be created.");
+    return NULL;
+  }
+
+  if ((sexptype != REALSXP) && (sexptype != INTSXP) &&
+      (sexptype != LGLSXP) && (sexptype != CPLXSXP)) {
+    PyErr_Format(PyExc_ValueError, "Invalid SEXP type '%i'.", sexptype);
+    return NULL;
+  }
+
+  embeddedR_setlock();
+
+  status = RPy_BufferToSEXP(object, sexptype,
+			    setdim ? RPY_BUFFER_SETDIM : 0, &sexp);
+  if (status == 1) {
+    PyErr_Format(PyExc_TypeError,
+		 "The object does not export a buffer with items "
+		 "that can be copied into an R vector of type '%s'.",
+		 validSexpType[sexptype]);
+  }
+  if (status != 0) {
+    embeddedR_freelock();
+    return NULL;
+  }
+  PROTECT(sexp);
+  PyObject *res = (PyObject *)newPySexpObject(sexp);
+  UNPROTECT(1);
+  embeddedR_freelock();
+  return res;
+}
+
+
+PyDoc_STRVAR(EmbeddedR_vectorWrapBuffer_doc,
+	     "vector_wrapbuffer(obj, sexptype, setdim=False)\n\n"
+	     "Build an R vector of type sexptype (REALSXP, INTSXP, LGLSXP,\n"
+	     "or STRSXP) using the memory of a Python object exporting the\n"
+	     "buffer protocol (numpy arrays, memoryview, mmap, ...),\n"
+	     "without copying the items (ALTREP, requires R >= 3.5.0).\n"
+	     "The Python object is kept alive for as long as R uses the\n"
+	     "vector. When setdim is True the R attribute \"dim\" is set\n"
+	     "to the shape of the buffer.\n"
+	     "The items must be native-endian doubles (REALSXP), 32-bit\n"
+	     "integers (INTSXP, LGLSXP), 1-byte booleans or unsigned\n"
+	     "integers (LGLSXP), or fixed-width bytes or UCS4 strings as in\n"
+	     "numpy 'S' and 'U' arrays (STRSXP), contiguous in FORTRAN\n"
+	     "order (TypeError is raised otherwise). The R strings are made\n"
+	     "when R first accesses each of them.\n"
+	     "Changes R makes in place to doubles and integers are made in\n"
+	     "the buffer. The items are copied into a regular R vector the\n"
+	     "first time R asks for a writable pointer to them (REAL(),\n"
+	     "INTEGER(), LOGICAL(), used by most compiled code even to only\n"
+	     "read them) if the buffer is read-only, and the first time R\n"
+	     "asks for any pointer to 1-byte booleans or to strings.");
+
+static PyObject*
+EmbeddedR_vectorWrapBuffer(PyObject *self, PyObject *args, PyObject *kwds)
+{
+  PyObject *object;
+  int sexptype;
+  int setdim = 0;
+  int status;
+  SEXP sexp;
+  static char *kwlist[] = {"obj", "sexptype", "setdim", NULL};
+
+  if (! PyArg_ParseTupleAndKeywords(args, kwds, "Oi|i",
+                                    kwlist,
+                                    &object, &sexptype, &setdim)) {
+    return NULL;
+  }
+
+  if (! (rpy_has_status(RPY_R_INITIALIZED))) {
+    PyErr_Format(PyExc_RuntimeError, 
+                 "R must be initialized before any instance can be created.");
+    return NULL;
+  }
+
+  if ((sexptype != REALSXP) && (sexptype != INTSXP) &&
+      (sexptype != LGLSXP) && (sexptype != STRSXP)) {
+    PyErr_Format(PyExc_ValueError, "Invalid SEXP type '%i'.", sexptype);
+    return NULL;
+  }
+
+  embeddedR_setlock();
+
+  status = RPy_BufferToALTREP(object, sexptype,
+			      setdim ? RPY_BUFFER_SETDIM : 0, &sexp);
+  if (status == 1) {
+    PyErr_Format(PyExc_TypeError,
+		 "The object does not export a contiguous buffer with items "
+		 "that can be used by an R vector of type '%s'.",
+		 validSexpType[sexptype]);
+  }
+  if (status != 0) {
+    embeddedR_freelock();
+    return NULL;
+  }
+  PROTECT(sexp);
+  PyObject *res = (PyObject *)newPySexpObject(sexp);
+  UNPROTECT(1);
+  embeddedR_freelock();
+  return res;
+}
+
+
+PyDoc_STRVAR(EmbeddedR_vectorToBuffer_doc,
+	     "vector_tobuffer(vector, obj)\n\n"
+	     "Copy the items of the R vector (of type REALSXP, INTSXP,\n"
+	     "LGLSXP, CPLXSXP, or RAWSXP) into the writable Python object\n"
+	     "obj exporting the buffer protocol (bytearray, mmap,\n"
+	     "shared memory, ...), in one block and in R's (FORTRAN)\n"
+	     "order. The buffer must be large enough. Attributes are\n"
+	     "not copied. Return the number of bytes copied.");
+
+static PyObject*
+EmbeddedR_vectorToBuffer(PyObject *self, PyObject *args, PyObject *kwds)
+{
+  PyObject *vector, *object;
+  Py_buffer view;
+  SEXP sexp;
+  void *src;
+  Py_ssize_t itemsize;
+  static char *kwlist[] = {"vector", "obj", NULL};
+
+  if (! PyArg_ParseTupleAndKeywords(args, kwds, "O!O",
+                                    kwlist,
+                                    &Sexp_Type, &vector, &object)) {
+    return NULL;
+  }
+
+  sexp = RPY_SEXP((PySexpObject *)vector);
+  if (! sexp) {
+    PyErr_Format(PyExc_ValueError, "NULL SEXP.");
+    return NULL;
+  }
+
+  /* Getting the pointer to the items can make R allocate memory
+   * (ALTREP vectors). */
+  embeddedR_setlock();
+  switch (TYPEOF(sexp)) {
+  case REALSXP:
+    src = NUMERIC_POINTER(sexp);
+    itemsize = sizeof(double);
+    break;
+  case INTSXP:
+    src = INTEGER_POINTER(sexp);
+    itemsize = sizeof(int);
+    break;
+  case LGLSXP:
+    src = LOGICAL_POINTER(sexp);
+    itemsize = sizeof(int);
+    break;
+  case CPLXSXP:
+    src = COMPLEX_POINTER(sexp);
+    itemsize = sizeof(Rcomplex);
+    break;
+  case RAWSXP:
+    src = RAW_POINTER(sexp);
+    itemsize = 1;
+    break;
+  default:
+    PyErr_Format(PyExc_ValueError, "Invalid SEXP type '%i'.", TYPEOF(sexp));
+    embeddedR_freelock();
+    return NULL;
+  }
+
+  if (PyObject_GetBuffer(object, &view, PyBUF_WRITABLE) == -1) {
+    embeddedR_freelock();
+    return NULL;
+  }
+  Py_ssize_t nbytes = (Py_ssize_t)XLENGTH(sexp) * itemsize;
+  if (view.len < nbytes) {
+    PyErr_Format(PyExc_ValueError,
+		 "The buffer is too small (%zd bytes needed, %zd available).",
+		 nbytes, view.len);
+    PyBuffer_Release(&view);
+    embeddedR_freelock();
+    return NULL;
+  }
+
+  memcpy(view.buf, src, nbytes);
+  embeddedR_freelock();
+  PyBuffer_Release(&view);
+  return PyLong_FromSsize_t(nbytes);
+}
+
+
+
 /* --- Find a variable in an environment --- */
 
 
@@ -3144,6 +3573,10 @@ static PyMethodDef EmbeddedR_methods[] = {
    EmbeddedR_end_doc},
   {"set_interactive",   (PyCFunction)EmbeddedR_setinteractive,  METH_O,
    EmbeddedR_setinteractive_doc},
+  {"set_release_gil",   (PyCFunction)EmbeddedR_setReleaseGIL,  METH_O,
+   EmbeddedR_setReleaseGIL_doc},
+  {"get_release_gil",   (PyCFunction)EmbeddedR_getReleaseGIL,  METH_NOARGS,
+   EmbeddedR_getReleaseGIL_doc},
   {"set_writeconsole_regular",   (PyCFunction)EmbeddedR_setWriteConsoleRegular, 
    METH_VARARGS, EmbeddedR_setWriteConsoleRegular_doc},
   {"get_writeconsole_regular",   (PyCFunction)EmbeddedR_getWriteConsoleRegular,  
@@ -3186,9 +3619,18 @@ static PyMethodDef EmbeddedR_methods[] = {
    EmbeddedR_ProcessEvents_doc},
   {"str_typeint",       (PyCFunction)EmbeddedR_sexpType, METH_VARARGS,
    "Return the SEXP name tag (string) corresponding to an integer."},
+  {"vector_frombuffer", (PyCFunction)EmbeddedR_vectorFromBuffer,
+   METH_VARARGS | METH_KEYWORDS, EmbeddedR_vectorFromBuffer_doc},
+  {"vector_wrapbuffer", (PyCFunction)EmbeddedR_vectorWrapBuffer,
+   METH_VARARGS | METH_KEYWORDS, EmbeddedR_vectorWrapBuffer_doc},
+  {"vector_tobuffer", (PyCFunction)EmbeddedR_vectorToBuffer,
+   METH_VARARGS | METH_KEYWORDS, EmbeddedR_vectorToBuffer_doc},
   {"unserialize",       (PyCFunction)EmbeddedR_unserialize, METH_VARARGS,
    "unserialize(str, rtype)\n"
-   "Unserialize an R object from its string representation."},
+   "Unserialize an R object from its string representation\n"
+   "(a str, or any object exporting the buffer protocol)."},
+  {"load",       (PyCFunction)EmbeddedR_load, METH_VARARGS | METH_KEYWORDS,
+   EmbeddedR_load_doc},
   {"protected_rids", (PyCFunction)Rpy_ProtectedIDs, METH_NOARGS,
    Rpy_ProtectedIDs_doc},
   {NULL,                NULL}           /* sentinel */
@@ -3228,36 +3670,46 @@ do_Python(SEXP args)
   }
   PyObject *pyf = R_ExternalPtrAddr(sexp);
 
+  /* The GIL might have been released during the evaluation of R code
+   * (see set_release_gil()). It must be released again before returning
+   * to R, including before R errors (as they long jump).
+   */
+  const int is_threaded = PyEval_ThreadsInitialized();
+  PyGILState_STATE gstate;
+  RPY_GIL_ENSURE(is_threaded, gstate);
+
   /* Result for the evaluation of the Python function */
   PyObject *pyres;
   /* create argument list */
   PyObject *pyargs = PyList_New(0);
   /* named arguments */
   PyObject *pynargs = PyDict_New();
+  PyObject *pyarg;
   const char *tag;
   int ok_setnamedarg;
   for (args = CDR(args); args != R_NilValue; args = CDR(args)) {
     sexp = CAR(args);
+    if (R_PyObject_TYPE_CHECK(sexp)) {
+      pyarg = (PyObject *)R_ExternalPtrAddr(sexp);
+      Py_INCREF(pyarg);
+    }
+    else {
+      pyarg = (PyObject *)newPySexpObject(sexp);
+    }
     if (isNull(TAG(args))) {
       /* unnamed argument */
-      if (R_PyObject_TYPE_CHECK(sexp)) {
-	PyList_Append(pyargs, (PyObject *)R_ExternalPtrAddr(sexp));
-      }
-      else {
-	PyList_Append(pyargs, (PyObject *)newPySexpObject(sexp));
-      }
+      PyList_Append(pyargs, pyarg);
+      Py_DECREF(pyarg);
     } else {
       tag = CHAR(PRINTNAME(TAG(args)));
       /* named argument */
-      if (R_PyObject_TYPE_CHECK(sexp)) {
-	ok_setnamedarg = PyDict_SetItemString(pynargs, tag, 
-					      (PyObject *)R_ExternalPtrAddr(sexp));
-      }
-      else {
-	ok_setnamedarg = PyDict_SetItemString(pynargs, tag, 
-					      (PyObject *)newPySexpObject(sexp));
-      }
+      ok_setnamedarg = PyDict_SetItemString(pynargs, tag, pyarg);
+      Py_DECREF(pyarg);
       if (ok_setnamedarg == -1) {
+	PyErr_Clear();
+	Py_DECREF(pyargs);
+	Py_DECREF(pynargs);
+	RPY_GIL_RELEASE(is_threaded, gstate);
 	error("rpy2: Error while setting a named argument");
       }
     }
@@ -3265,30 +3717,37 @@ do_Python(SEXP args)
 
   PyObject *pyargstup = PyList_AsTuple(pyargs);
 
-  /* free the R lock as we are leaving the R side back to Python */
-  embeddedR_freelock();
+  /* the R lock is kept while in Python: it is re-entrant, and the
+     callback can use R again from this thread */
   pyres = PyObject_Call(pyf, pyargstup, pynargs);
-  embeddedR_setlock();
+  Py_DECREF(pyargs);
+  Py_DECREF(pyargstup);
+  Py_DECREF(pynargs);
   if (!pyres) {
     PyObject *exctype;
     PyObject *excvalue; 
     PyObject *exctraceback;
     PyObject *excstr;
+    /* copy of the message, as error() is called without the GIL */
+    char errmessage[1024] = "rpy2: Python error.";
     PyErr_Fetch(&exctype, &excvalue, &exctraceback);
     excstr = PyObject_Str(excvalue);
     if (excstr) {
       PyObject *pybytes = PyUnicode_AsLatin1String(excstr);
-      error(PyBytes_AsString(pybytes));
-      Py_DECREF(pybytes);
+      if (pybytes) {
+	snprintf(errmessage, sizeof(errmessage), "%s",
+		 PyBytes_AsString(pybytes));
+	Py_DECREF(pybytes);
+      }
       Py_DECREF(excstr);
     } 
-    else {
-      error("rpy2: Python error.");
-    }
+    Py_XDECREF(exctype);
+    Py_XDECREF(excvalue);
+    Py_XDECREF(exctraceback);
     PyErr_Clear();
+    RPY_GIL_RELEASE(is_threaded, gstate);
+    error("%s", errmessage);
   }
-  Py_DECREF(pyargs);
-  Py_DECREF(pyargstup);
   if (PyObject_IsInstance((PyObject*)pyres, 
                           (PyObject*)&Sexp_Type)) {
     res = RPY_SEXP((PySexpObject*)pyres);
@@ -3302,6 +3761,7 @@ do_Python(SEXP args)
     UNPROTECT(protect_count);
   }
   Py_DECREF(pyres);
+  RPY_GIL_RELEASE(is_threaded, gstate);
   
   return res;
 }
@@ -3367,6 +3827,9 @@ PyInit__rinterface(void)
   if (PyType_Ready(&VectorSexp_Type) < 0) {
     return NULL;
   }
+  if (PyType_Ready(&VectorSexpIter_Type) < 0) {
+    return NULL;
+  }
   if (PyType_Ready(&IntVectorSexp_Type) < 0) {
     return NULL;
   }
@@ -3397,6 +3860,9 @@ PyInit__rinterface(void)
   if (PyType_Ready(&LangSexp_Type) < 0) {
     return NULL;
   }
+  if (PyType_Ready(&PreparedCallSexp_Type) < 0) {
+    return NULL;
+  }
   if (PyType_Ready(&ExtPtrSexp_Type) < 0) {
     return NULL;
   }
@@ -3453,6 +3919,12 @@ PyInit__rinterface(void)
     return NULL;
   }
 
+  embeddedR_lock = PyThread_allocate_lock();
+  if (embeddedR_lock == NULL) {
+    PyErr_NoMemory();
+    return NULL;
+  }
+
   /* Create a Capsule containing the API pointer array's address */
   c_api_object = PyCapsule_New((void *)PyRinterface_API, 
 			       PyRinterface_API_NAME, NULL);
@@ -3496,6 +3968,9 @@ PyInit__rinterface(void)
 
   /* longuest integer for R indexes */
   ADD_INT_CONSTANT(m, R_LEN_T_MAX);
+  /* R_xlen_t can be larger than a C long (on Windows) */
+  PyModule_AddObject(m, "R_XLEN_T_MAX",
+                     PyLong_FromSsize_t((Py_ssize_t)R_XLEN_T_MAX));
 
   /* "Logical" (boolean) values */
   ADD_INT_CONSTANT(m, TRUE);
@@ -3541,11 +4016,6 @@ PyInit__rinterface(void)
   /* Add an extra ref. It should remain impossible to delete it */
   Py_INCREF(initOptions);
 
-  Rpy_R_Precious = PyDict_New();
-  PyModule_AddObject(m, "_Rpy_R_Precious", Rpy_R_Precious);
-  /* Add an extra ref. It should remain impossible to delete it */
-  Py_INCREF(Rpy_R_Precious);
-
   PyModule_AddObject(m, "R_VERSION_BUILD", RPY_R_VERSION_BUILD);
   PyModule_AddObject(m, "initoptions", initOptions);
   PyModule_AddObject(m, "Sexp", (PyObject *)&Sexp_Type);
@@ -3562,6 +4032,7 @@ PyInit__rinterface(void)
   PyModule_AddObject(m, "SexpEnvironment", (PyObject *)&EnvironmentSexp_Type);
   PyModule_AddObject(m, "SexpS4", (PyObject *)&S4Sexp_Type);
   PyModule_AddObject(m, "SexpLang", (PyObject *)&LangSexp_Type);
+  PyModule_AddObject(m, "SexpPreparedCall", (PyObject *)&PreparedCallSexp_Type);
   PyModule_AddObject(m, "SexpExtPtr", (PyObject *)&ExtPtrSexp_Type);
 
   /* NA types */
@@ -31,6 +31,7 @@ typedef struct {
   Py_ssize_t pycount;
   int rcount;
   SEXP sexp;
+  R_xlen_t pool_index;
 } SexpObject;
 /* -- SexpObject-end -- */
 
@@ -0,0 +1,559 @@
+/*
+ ***** BEGIN LICENSE BLOCK *****
+ * Version: MPL 1.1/GPL 2.0/LGPL 2.1
+ *
+ * The contents of this file are subject to the Mozilla Public License Version
+ * 1.1 (the "License"); you may not use this file except in compliance with
+ * the License. You may obtain a copy of the License at
+ * http://www.mozilla.org/MPL/
+ *
+ * Software distributed under the License is distributed on an "AS IS" basis,
+ * WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License
+ * for the specific language governing rights and limitations under the
+ * License.
+ *
+ * Copyright (C) 2008-2017 Laurent Gautier
+ *
+ * Alternatively, the contents of this file may be used under the terms of
+ * either the GNU General Public License Version 2 or later (the "GPL"), or
+ * the GNU Lesser General Public License Version 2.1 or later (the "LGPL"),
+ * in which case the provisions of the GPL or the LGPL are applicable instead
+ * of those above. If you wish to allow use of your version of this file only
+ * under the terms of either the GPL or the LGPL, and not to allow others to
+ * use your version of this file under the terms of the MPL, indicate your
+ * decision by deleting the provisions above and replace them with the notice
+ * and other provisions required by the GPL or the LGPL. If you do not delete
+ * the provisions above, a recipient may use your version of this file under
+ * the terms of any one of the MPL, the GPL or the LGPL.
+ *
+ * ***** END LICENSE BLOCK ***** */
+
+/* R vectors (REALSXP, INTSXP, LGLSXP, or STRSXP) with their items in the
+ * memory of a Python object exporting the buffer protocol, using R's
+ * ALTREP (alternative representations for R objects).
+ *
+ * data1 is an R external pointer to a Python memoryview on the buffer.
+ * The finalizer for the external pointer (R_PyObject_decref()) releases
+ * the memoryview, and with it the Python object, once R no longer uses
+ * the vector.
+ *
+ * data2 is R_NilValue, or a regular R vector with a copy of the items
+ * once the vector is materialised. This happens when R asks for a pointer
+ * to the items it can write to (DATAPTR(), and with it REAL(), INTEGER(),
+ * or LOGICAL(), as used by most compiled code) and the buffer is
+ * read-only, or when R asks for any pointer to the items and they are not
+ * laid out as R's (logical vectors from 1-byte booleans, strings). R code
+ * only reading the items through ALTREP-aware accessors (element,
+ * region, or read-only pointer) does not materialise the vector.
+ * Writable buffers of doubles or 32-bit integers are shared: R modifying
+ * the vector in place modifies the buffer.
+ *
+ * Strings are fixed-width buffers of bytes (numpy 'S', struct format
+ * "<n>s") or of UCS4 code points (numpy 'U', format "<n>w"), trailing
+ * NULs being padding. The R strings (CHARSXP) are made when R asks for
+ * an element.
+ *
+ * The methods only use the memory of the buffer (no Python API) and can
+ * be called by R while the GIL is released.
+ */
+
+#include <Python.h>
+#include <Rinternals.h>
+
+#include "altrep.h"
+
+#if RPY_HAS_ALTREP
+
+#include <R_ext/Altrep.h>
+
+static R_altrep_class_t rpy_altreal_class;
+static R_altrep_class_t rpy_altinteger_class;
+static R_altrep_class_t rpy_altlogical_class;
+static R_altrep_class_t rpy_altlogical_byte_class;
+static R_altrep_class_t rpy_altstring_bytes_class;
+static R_altrep_class_t rpy_altstring_ucs4_class;
+static int rpy_altrep_classes_ready = 0;
+
+static inline Py_buffer *
+rpy_altrep_view(SEXP x)
+{
+  PyObject *memview = (PyObject *)R_ExternalPtrAddr(R_altrep_data1(x));
+  return PyMemoryView_GET_BUFFER(memview);
+}
+
+static R_xlen_t
+rpy_altrep_Length(SEXP x)
+{
+  SEXP data2 = R_altrep_data2(x);
+  if (data2 != R_NilValue) {
+    return XLENGTH(data2);
+  }
+  Py_buffer *view = rpy_altrep_view(x);
+  return (R_xlen_t)(view->len / view->itemsize);
+}
+
+static Rboolean
+rpy_altrep_Inspect(SEXP x, int pre, int deep, int pvec,
+		   void (*inspect_subtree)(SEXP, int, int, int))
+{
+  Rprintf(" rpy2 Python buffer (len=%lld, %s)\n",
+	  (long long)rpy_altrep_Length(x),
+	  R_altrep_data2(x) == R_NilValue ? "shared" : "materialized");
+  return TRUE;
+}
+
+static SEXP rpy_altstring_buffer_Elt(SEXP x, R_xlen_t i);
+
+/* Copy the items into a regular R vector, kept as data2. */
+static SEXP
+rpy_altrep_materialize(SEXP x)
+{
+  Py_buffer *view = rpy_altrep_view(x);
+  const R_xlen_t len = (R_xlen_t)(view->len / view->itemsize);
+  R_xlen_t i;
+  SEXP data2;
+  PROTECT(data2 = allocVector(TYPEOF(x), len));
+  if (TYPEOF(x) == STRSXP) {
+    for (i = 0; i < len; i++) {
+      SET_STRING_ELT(data2, i, rpy_altstring_buffer_Elt(x, i));
+    }
+  } else if (TYPEOF(x) == LGLSXP && view->itemsize == 1) {
+    const unsigned char *buf = (const unsigned char *)view->buf;
+    int *dest = LOGICAL(data2);
+    for (i = 0; i < len; i++) {
+      dest[i] = (buf[i] != 0);
+    }
+  } else {
+    memcpy(DATAPTR(data2), view->buf, (size_t)view->len);
+  }
+  R_set_altrep_data2(x, data2);
+  UNPROTECT(1);
+  return data2;
+}
+
+/* Only buffers of doubles or 32-bit integers have their items laid out
+   as in R vectors. */
+static inline int
+rpy_altrep_is_rlayout(SEXP x)
+{
+  return (TYPEOF(x) == REALSXP || TYPEOF(x) == INTSXP ||
+	  (TYPEOF(x) == LGLSXP && rpy_altrep_view(x)->itemsize == sizeof(int)));
+}
+
+static void *
+rpy_altrep_Dataptr(SEXP x, Rboolean writeable)
+{
+  SEXP data2 = R_altrep_data2(x);
+  if (data2 == R_NilValue) {
+    Py_buffer *view = rpy_altrep_view(x);
+    if (rpy_altrep_is_rlayout(x) && ! (writeable && view->readonly)) {
+      return view->buf;
+    }
+    data2 = rpy_altrep_materialize(x);
+  }
+  return DATAPTR(data2);
+}
+
+static const void *
+rpy_altrep_Dataptr_or_null(SEXP x)
+{
+  SEXP data2 = R_altrep_data2(x);
+  if (data2 == R_NilValue) {
+    if (! rpy_altrep_is_rlayout(x)) {
+      return NULL;
+    }
+    return rpy_altrep_view(x)->buf;
+  }
+  return DATAPTR(data2);
+}
+
+static R_xlen_t
+rpy_altrep_get_region(SEXP x, R_xlen_t i, R_xlen_t n, void *buf,
+		      size_t itemsize)
+{
+  const R_xlen_t len = rpy_altrep_Length(x);
+  const char *data = (const char *)rpy_altrep_Dataptr_or_null(x);
+  if (i >= len) {
+    return 0;
+  }
+  if (n > len - i) {
+    n = len - i;
+  }
+  memcpy(buf, data + i * itemsize, (size_t)n * itemsize);
+  return n;
+}
+
+static double
+rpy_altreal_Elt(SEXP x, R_xlen_t i)
+{
+  return ((const double *)rpy_altrep_Dataptr_or_null(x))[i];
+}
+
+static R_xlen_t
+rpy_altreal_Get_region(SEXP x, R_xlen_t i, R_xlen_t n, double *buf)
+{
+  return rpy_altrep_get_region(x, i, n, buf, sizeof(double));
+}
+
+/* R's logical vectors are vectors of int, like integer vectors. */
+static int
+rpy_altinteger_Elt(SEXP x, R_xlen_t i)
+{
+  return ((const int *)rpy_altrep_Dataptr_or_null(x))[i];
+}
+
+static R_xlen_t
+rpy_altinteger_Get_region(SEXP x, R_xlen_t i, R_xlen_t n, int *buf)
+{
+  return rpy_altrep_get_region(x, i, n, buf, sizeof(int));
+}
+
+/* Logical vectors from buffers of 1-byte booleans (or unsigned bytes,
+   any value other than 0 being TRUE). */
+static int
+rpy_altlogical_byte_Elt(SEXP x, R_xlen_t i)
+{
+  SEXP data2 = R_altrep_data2(x);
+  if (data2 != R_NilValue) {
+    return LOGICAL(data2)[i];
+  }
+  return (((const unsigned char *)rpy_altrep_view(x)->buf)[i] != 0);
+}
+
+static R_xlen_t
+rpy_altlogical_byte_Get_region(SEXP x, R_xlen_t i, R_xlen_t n, int *buf)
+{
+  const R_xlen_t len = rpy_altrep_Length(x);
+  R_xlen_t k;
+  if (i >= len) {
+    return 0;
+  }
+  if (n > len - i) {
+    n = len - i;
+  }
+  for (k = 0; k < n; k++) {
+    buf[k] = rpy_altlogical_byte_Elt(x, i + k);
+  }
+  return n;
+}
+
+/* Make the R string for item i of a buffer of fixed-width strings. */
+static SEXP
+rpy_altstring_buffer_Elt(SEXP x, R_xlen_t i)
+{
+  Py_buffer *view = rpy_altrep_view(x);
+  const char *item = (const char *)view->buf + i * view->itemsize;
+  Py_ssize_t n, k;
+  SEXP res;
+  if (R_altrep_inherits(x, rpy_altstring_bytes_class)) {
+    n = view->itemsize;
+    while (n > 0 && item[n - 1] == '\0') {
+      n--;
+    }
+    return mkCharLenCE(item, (int)n, CE_NATIVE);
+  }
+  /* UCS4 code points, encoded in UTF-8 */
+  const uint32_t *codepoints = (const uint32_t *)item;
+  n = view->itemsize / 4;
+  while (n > 0 && codepoints[n - 1] == 0) {
+    n--;
+  }
+  const void *vmax = vmaxget();
+  char *utf8 = R_alloc(4 * n + 1, sizeof(char));
+  char *p = utf8;
+  for (k = 0; k < n; k++) {
+    uint32_t c = codepoints[k];
+    if (c > 0x10FFFF || (c >= 0xD800 && c <= 0xDFFF)) {
+      /* replacement character */
+      c = 0xFFFD;
+    }
+    if (c < 0x80) {
+      *p++ = (char)c;
+    } else if (c < 0x800) {
+      *p++ = (char)(0xC0 | (c >> 6));
+      *p++ = (char)(0x80 | (c & 0x3F));
+    } else if (c < 0x10000) {
+      *p++ = (char)(0xE0 | (c >> 12));
+      *p++ = (char)(0x80 | ((c >> 6) & 0x3F));
+      *p++ = (char)(0x80 | (c & 0x3F));
+    } else {
+      *p++ = (char)(0xF0 | (c >> 18));
+      *p++ = (char)(0x80 | ((c >> 12) & 0x3F));
+      *p++ = (char)(0x80 | ((c >> 6) & 0x3F));
+      *p++ = (char)(0x80 | (c & 0x3F));
+    }
+  }
+  res = mkCharLenCE(utf8, (int)(p - utf8), CE_UTF8);
+  vmaxset(vmax);
+  return res;
+}
+
+static SEXP
+rpy_altstring_Elt(SEXP x, R_xlen_t i)
+{
+  SEXP data2 = R_altrep_data2(x);
+  if (data2 != R_NilValue) {
+    return STRING_ELT(data2, i);
+  }
+  return rpy_altstring_buffer_Elt(x, i);
+}
+
+/* Strings set by R are never written to the buffer. */
+static void
+rpy_altstring_Set_elt(SEXP x, R_xlen_t i, SEXP v)
+{
+  SEXP data2 = R_altrep_data2(x);
+  if (data2 == R_NilValue) {
+    PROTECT(v);
+    data2 = rpy_altrep_materialize(x);
+    UNPROTECT(1);
+  }
+  SET_STRING_ELT(data2, i, v);
+}
+
+static int
+rpy_altstring_No_NA(SEXP x)
+{
+  return R_altrep_data2(x) == R_NilValue;
+}
+
+#define RPY_ALTREP_SET_METHODS(cls)					\
+  R_set_altrep_Length_method(cls, rpy_altrep_Length);			\
+  R_set_altrep_Inspect_method(cls, rpy_altrep_Inspect);			\
+  R_set_altvec_Dataptr_method(cls, rpy_altrep_Dataptr);			\
+  R_set_altvec_Dataptr_or_null_method(cls, rpy_altrep_Dataptr_or_null);
+
+/* The ALTREP classes are made when first needed (R must be
+ * initialized). */
+static void
+rpy_altrep_init_classes(void)
+{
+  if (rpy_altrep_classes_ready) {
+    return;
+  }
+  rpy_altreal_class = R_make_altreal_class("rpy2_buffer_real",
+					   "rpy2", NULL);
+  RPY_ALTREP_SET_METHODS(rpy_altreal_class)
+  R_set_altreal_Elt_method(rpy_altreal_class, rpy_altreal_Elt);
+  R_set_altreal_Get_region_method(rpy_altreal_class,
+				  rpy_altreal_Get_region);
+
+  rpy_altinteger_class = R_make_altinteger_class("rpy2_buffer_integer",
+						 "rpy2", NULL);
+  RPY_ALTREP_SET_METHODS(rpy_altinteger_class)
+  R_set_altinteger_Elt_method(rpy_altinteger_class, rpy_altinteger_Elt);
+  R_set_altinteger_Get_region_method(rpy_altinteger_class,
+				     rpy_altinteger_Get_region);
+
+  rpy_altlogical_class = R_make_altlogical_class("rpy2_buffer_logical",
+						 "rpy2", NULL);
+  RPY_ALTREP_SET_METHODS(rpy_altlogical_class)
+  R_set_altlogical_Elt_method(rpy_altlogical_class, rpy_altinteger_Elt);
+  R_set_altlogical_Get_region_method(rpy_altlogical_class,
+				     rpy_altinteger_Get_region);
+
+  rpy_altlogical_byte_class = R_make_altlogical_class("rpy2_buffer_logical_byte",
+						      "rpy2", NULL);
+  RPY_ALTREP_SET_METHODS(rpy_altlogical_byte_class)
+  R_set_altlogical_Elt_method(rpy_altlogical_byte_class,
+			      rpy_altlogical_byte_Elt);
+  R_set_altlogical_Get_region_method(rpy_altlogical_byte_class,
+				     rpy_altlogical_byte_Get_region);
+
+  rpy_altstring_bytes_class = R_make_altstring_class("rpy2_buffer_string_bytes",
+						     "rpy2", NULL);
+  RPY_ALTREP_SET_METHODS(rpy_altstring_bytes_class)
+  R_set_altstring_Elt_method(rpy_altstring_bytes_class, rpy_altstring_Elt);
+  R_set_altstring_Set_elt_method(rpy_altstring_bytes_class,
+				 rpy_altstring_Set_elt);
+  R_set_altstring_No_NA_method(rpy_altstring_bytes_class,
+			       rpy_altstring_No_NA);
+
+  rpy_altstring_ucs4_class = R_make_altstring_class("rpy2_buffer_string_ucs4",
+						    "rpy2", NULL);
+  RPY_ALTREP_SET_METHODS(rpy_altstring_ucs4_class)
+  R_set_altstring_Elt_method(rpy_altstring_ucs4_class, rpy_altstring_Elt);
+  R_set_altstring_Set_elt_method(rpy_altstring_ucs4_class,
+				 rpy_altstring_Set_elt);
+  R_set_altstring_No_NA_method(rpy_altstring_ucs4_class,
+			       rpy_altstring_No_NA);
+
+  rpy_altrep_classes_ready = 1;
+}
+
+/* Size in bytes of the characters in a buffer of fixed-width strings
+   (1 for bytes, format "<n>s", and 4 for UCS4 code points, format
+   "<n>w"), or 0 if the buffer does not contain strings. */
+static int
+rpy_buffer_string_charsize(const char *format, Py_ssize_t itemsize)
+{
+  const int one = 1;
+  const int is_littleendian = *(const char *)&one;
+  Py_ssize_t count = 0;
+  int charsize;
+
+  if (format == NULL) {
+    return 0;
+  }
+  switch (format[0]) {
+  case '@':
+  case '=':
+  case '|':
+    format++;
+    break;
+  case '<':
+    if (! is_littleendian) {
+      return 0;
+    }
+    format++;
+    break;
+  case '>':
+  case '!':
+    if (is_littleendian) {
+      return 0;
+    }
+    format++;
+    break;
+  }
+  if (format[0] < '0' || format[0] > '9') {
+    count = 1;
+  }
+  while (format[0] >= '0' && format[0] <= '9') {
+    count = count * 10 + (format[0] - '0');
+    format++;
+  }
+  if (format[0] == 's') {
+    charsize = 1;
+  } else if (format[0] == 'w') {
+    charsize = 4;
+  } else {
+    return 0;
+  }
+  if (format[1] != '\0' || count * charsize != itemsize) {
+    return 0;
+  }
+  return charsize;
+}
+
+#endif
+
+/* Build an R vector of type 'rtype' (REALSXP, INTSXP, LGLSXP, or STRSXP)
+   using the memory of the Python object 'object', that must export a
+   buffer of doubles (REALSXP), 32-bit integers (INTSXP and LGLSXP),
+   1-byte booleans or unsigned integers (LGLSXP), or fixed-width bytes or
+   UCS4 strings (STRSXP), in native byte order and contiguous in FORTRAN
+   order (one-dimensional buffers only need to be contiguous). The R vector has a reference to the
+   Python object until R no longer needs it.
+   'flags' can be RPY_BUFFER_SETDIM (the attribute "dim" of the R vector
+   is set to the shape of the buffer).
+   The function returns 0 on success and -1 on failure (with a Python
+   exception set). It returns 1, with no exception set, if the object
+   does not export a buffer that can be used for an R vector of type
+   'rtype'. The caller must hold the lock on R.
+*/
+static int
+RPy_BufferToALTREP(PyObject *object, int rtype, int flags, SEXP *sexpp)
+{
+#if RPY_HAS_ALTREP
+  PyObject *memview;
+  Py_buffer *view;
+  RPy_BufferKind kind;
+  R_altrep_class_t altrep_class;
+  SEXP data1, new_sexp, dim_sexp;
+  int dim_i, is_valid;
+
+  if (! PyObject_CheckBuffer(object)) {
+    return 1;
+  }
+  rpy_altrep_init_classes();
+  memview = PyMemoryView_FromObject(object);
+  if (memview == NULL) {
+    return -1;
+  }
+  view = PyMemoryView_GET_BUFFER(memview);
+  kind = rpy_buffer_kind(view->format, view->itemsize);
+  switch (rtype) {
+  case REALSXP:
+    is_valid = (kind == RPY_BUF_FLOAT64);
+    altrep_class = rpy_altreal_class;
+    break;
+  case INTSXP:
+    is_valid = (kind == RPY_BUF_INT32);
+    altrep_class = rpy_altinteger_class;
+    break;
+  case LGLSXP:
+    if (kind == RPY_BUF_BOOL || kind == RPY_BUF_UINT8) {
+      is_valid = 1;
+      altrep_class = rpy_altlogical_byte_class;
+    } else {
+      is_valid = (kind == RPY_BUF_INT32);
+      altrep_class = rpy_altlogical_class;
+    }
+    break;
+  case STRSXP:
+    switch (rpy_buffer_string_charsize(view->format, view->itemsize)) {
+    case 1:
+      is_valid = 1;
+      altrep_class = rpy_altstring_bytes_class;
+      break;
+    case 4:
+      is_valid = 1;
+      altrep_class = rpy_altstring_ucs4_class;
+      break;
+    default:
+      is_valid = 0;
+      altrep_class = rpy_altstring_bytes_class;
+      break;
+    }
+    break;
+  default:
+    is_valid = 0;
+    altrep_class = rpy_altreal_class;
+    break;
+  }
+  if (! (is_valid && PyBuffer_IsContiguous(view, 'F'))) {
+    Py_DECREF(memview);
+    return 1;
+  }
+  if ((view->len / view->itemsize) > R_XLEN_T_MAX) {
+    PyErr_Format(PyExc_ValueError,
+		 "The Python buffer is longer than the longuest possible vector in R.");
+    Py_DECREF(memview);
+    return -1;
+  }
+  if (flags & RPY_BUFFER_SETDIM) {
+    /* R vectors can be long, but each dimension is an R integer. */
+    for (dim_i = 0; dim_i < view->ndim; dim_i++) {
+      if (view->shape[dim_i] > INT_MAX) {
+	PyErr_Format(PyExc_ValueError,
+		     "Dimension %i of the Python buffer is larger than what R can handle.",
+		     dim_i);
+	Py_DECREF(memview);
+	return -1;
+      }
+    }
+  }
+
+  /* The reference to the memoryview is handed over to the external
+   * pointer, and released by its finalizer. */
+  PROTECT(data1 = R_MakeExternalPtr(memview, R_NilValue, R_NilValue));
+  R_RegisterCFinalizer(data1, (R_CFinalizer_t)R_PyObject_decref);
+  PROTECT(new_sexp = R_new_altrep(altrep_class, data1, R_NilValue));
+
+  if ((flags & RPY_BUFFER_SETDIM) && view->ndim > 0) {
+    PROTECT(dim_sexp = allocVector(INTSXP, view->ndim));
+    for (dim_i = 0; dim_i < view->ndim; dim_i++) {
+      INTEGER_POINTER(dim_sexp)[dim_i] = (int)view->shape[dim_i];
+    }
+    setAttrib(new_sexp, R_DimSymbol, dim_sexp);
+    UNPROTECT(1);
+  }
+  UNPROTECT(2);
+  *sexpp = new_sexp;
+  return 0;
+#else
+  PyErr_Format(PyExc_NotImplementedError,
+	       "R vectors using the memory of Python buffers require R >= 3.5.0 (ALTREP).");
+  return -1;
+#endif
+}
@@ -0,0 +1,23 @@
+#ifndef _RPY_PRIVATE_ALTREP_H_
+#define _RPY_PRIVATE_ALTREP_H_
+
+#ifndef _RPY_RINTERFACE_MODULE_
+#error altrep.h should not be included directly
+#endif
+
+#include <Python.h>
+#include <Rinternals.h>
+#include <Rversion.h>
+
+/* ALTREP (alternative representations for R vectors) is only
+ * available with R >= 3.5.0. */
+#if defined(R_VERSION) && (R_VERSION >= R_Version(3, 5, 0))
+#define RPY_HAS_ALTREP 1
+#else
+#define RPY_HAS_ALTREP 0
+#endif
+
+static int RPy_BufferToALTREP(PyObject *object, int rtype, int flags,
+			      SEXP *sexpp);
+
+#endif
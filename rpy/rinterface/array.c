@@ -151,6 +151,7 @@ array_struct_free(PyObject *rpynumpycapsule)
     (PyArrayInterface *)(PyCapsule_GetPointer(rpynumpycapsule,
 					      NULL));
   PyMem_Free(inter->shape);
+  PyMem_Free(inter->strides);
   PyMem_Free(inter);
 }
 
@@ -181,6 +182,7 @@ array_struct_get(PySexpObject *self)
 
   inter->version = ARRAY_INTERFACE_VERSION;
 
+  int is_locked = embeddedR_setlock_nested();
   int nd = sexp_rank(sexp);
   inter->nd = nd;
 
@@ -194,11 +196,18 @@ array_struct_get(PySexpObject *self)
 	       inter->shape, nd);
 
   inter->data = sexp_typepointer(sexp);
+  embeddedR_freelock_nested(is_locked);
   if (inter->data == NULL) {
     PyErr_SetString(PyExc_RuntimeError, "Error while mapping type.");
+    PyMem_Free(inter->shape);
+    PyMem_Free(inter->strides);
+    PyMem_Free(inter);
     return NULL;
   }
-  Py_INCREF(self);
+  /* The capsule only lives while the consumer builds its array.
+   * The consumer keeps a reference to 'self' (numpy uses it as the
+   * base of the array), and this is what keeps the R object alive
+   * while the array is in use. */
   return PyCapsule_New(inter,
 		       NULL, /* Numpy does not seem to give a name */
 		       (PyCapsule_Destructor) array_struct_free);
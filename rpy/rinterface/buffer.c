@@ -58,7 +58,7 @@ sexp_shape(SEXP sexp, Py_intptr_t *shape, int nd)
   int i;
   SEXP dim = getAttrib(sexp, R_DimSymbol);
   if (dim == R_NilValue)
-    shape[0] = LENGTH(sexp);
+    shape[0] = XLENGTH(sexp);
   else for (i = 0; i < nd; i++) {
       shape[i] = INTEGER(dim)[i];
     }
@@ -104,39 +104,42 @@ VectorSexp_getbuffer(PyObject *obj, Py_buffer *view, int flags)
   PySexpObject *self = (PySexpObject *)obj;
   SEXP sexp = RPY_SEXP(self);
 
+  /* Getting the data pointer of an ALTREP vector can allocate. */
+  int is_locked = embeddedR_setlock_nested();
   switch (TYPEOF(sexp)) {
   case REALSXP:
     view->buf = NUMERIC_POINTER(sexp);
-    view->len = GET_LENGTH(sexp) * sizeof(double);
+    view->len = XLENGTH(sexp) * sizeof(double);
     view->itemsize = sizeof(double);
     view->format = "d";
     break;
   case INTSXP:
     view->buf = INTEGER_POINTER(sexp);
-    view->len = GET_LENGTH(sexp) * sizeof(int);
+    view->len = XLENGTH(sexp) * sizeof(int);
     view->itemsize = sizeof(int);
     view->format = "i";
     break;
   case LGLSXP:
     view->buf = LOGICAL_POINTER(sexp);
-    view->len = GET_LENGTH(sexp) * sizeof(int);
+    view->len = XLENGTH(sexp) * sizeof(int);
     view->itemsize = sizeof(int);
     view->format = "i";
     break;
   case CPLXSXP:
     view->buf = COMPLEX_POINTER(sexp);
-    view->len = GET_LENGTH(sexp) * sizeof(Rcomplex);
+    view->len = XLENGTH(sexp) * sizeof(Rcomplex);
     view->itemsize = sizeof(Rcomplex);
-    view->format = "B"; /* FIXME: correct format for complex ? */
+    view->format = "Zd";
     break;
   case RAWSXP:
     view->buf = RAW_POINTER(sexp);
-    view->len = GET_LENGTH(sexp);
+    view->len = XLENGTH(sexp);
     view->itemsize = 1;
     view->format = "B";
     break;
   default:
     PyErr_Format(PyExc_ValueError, "Buffer for this type not yet supported.");
+    embeddedR_freelock_nested(is_locked);
     return -1;
   }
 
@@ -160,6 +163,7 @@ VectorSexp_getbuffer(PyObject *obj, Py_buffer *view, int flags)
   /* } */
   view->suboffsets = NULL;
   view->internal = NULL;
+  embeddedR_freelock_nested(is_locked);
   return 0;
 }
 #endif
@@ -170,3 +174,385 @@ static PyBufferProcs VectorSexp_as_buffer = {
 	(getbufferproc)VectorSexp_getbuffer,
 	(releasebufferproc)0,
 };
+
+
+/* Kinds of items a Python buffer can be made of, as far as
+ * copying them into an R vector is concerned.
+ */
+typedef enum {
+  RPY_BUF_UNSUPPORTED = 0,
+  RPY_BUF_BOOL,
+  RPY_BUF_INT8, RPY_BUF_INT16, RPY_BUF_INT32, RPY_BUF_INT64,
+  RPY_BUF_UINT8, RPY_BUF_UINT16, RPY_BUF_UINT32, RPY_BUF_UINT64,
+  RPY_BUF_FLOAT32, RPY_BUF_FLOAT64,
+  RPY_BUF_COMPLEX64, RPY_BUF_COMPLEX128
+} RPy_BufferKind;
+
+static RPy_BufferKind
+rpy_buffer_kind(const char *format, Py_ssize_t itemsize)
+{
+  /* Map a struct-module format string (as found in Py_buffer.format)
+   * and an item size to the kind of items in the buffer.
+   * Only buffers of one native-endian scalar item type are supported.
+   */
+  const int one = 1;
+  const int is_littleendian = *(const char *)&one;
+
+  if (format == NULL) {
+    /* NULL means unsigned bytes (PEP 3118) */
+    format = "B";
+  }
+  switch (format[0]) {
+  case '@':
+  case '=':
+    format++;
+    break;
+  case '<':
+    if (! is_littleendian) {
+      return RPY_BUF_UNSUPPORTED;
+    }
+    format++;
+    break;
+  case '>':
+  case '!':
+    if (is_littleendian) {
+      return RPY_BUF_UNSUPPORTED;
+    }
+    format++;
+    break;
+  }
+
+  if (format[0] == 'Z') {
+    if (format[1] == '\0' || format[2] != '\0') {
+      return RPY_BUF_UNSUPPORTED;
+    }
+    if (format[1] == 'd' && itemsize == 2 * sizeof(double)) {
+      return RPY_BUF_COMPLEX128;
+    }
+    if (format[1] == 'f' && itemsize == 2 * sizeof(float)) {
+      return RPY_BUF_COMPLEX64;
+    }
+    return RPY_BUF_UNSUPPORTED;
+  }
+
+  if (format[0] == '\0' || format[1] != '\0') {
+    return RPY_BUF_UNSUPPORTED;
+  }
+
+  switch (format[0]) {
+  case '?':
+    return (itemsize == 1) ? RPY_BUF_BOOL : RPY_BUF_UNSUPPORTED;
+  case 'b':
+  case 'h':
+  case 'i':
+  case 'l':
+  case 'q':
+  case 'n':
+    switch (itemsize) {
+    case 1: return RPY_BUF_INT8;
+    case 2: return RPY_BUF_INT16;
+    case 4: return RPY_BUF_INT32;
+    case 8: return RPY_BUF_INT64;
+    }
+    break;
+  case 'B':
+  case 'H':
+  case 'I':
+  case 'L':
+  case 'Q':
+  case 'N':
+    switch (itemsize) {
+    case 1: return RPY_BUF_UINT8;
+    case 2: return RPY_BUF_UINT16;
+    case 4: return RPY_BUF_UINT32;
+    case 8: return RPY_BUF_UINT64;
+    }
+    break;
+  case 'f':
+  case 'd':
+    if (itemsize == sizeof(float)) {
+      return RPY_BUF_FLOAT32;
+    }
+    if (itemsize == sizeof(double)) {
+      return RPY_BUF_FLOAT64;
+    }
+    break;
+  }
+  return RPY_BUF_UNSUPPORTED;
+}
+
+static int
+rpy_buffer_kind_tortype(RPy_BufferKind kind, int rtype, int flags)
+{
+  /* Return 1 if items of kind 'kind' can be stored in an R vector
+   * of type 'rtype' (without going through Python objects),
+   * 0 otherwise.
+   */
+  switch (kind) {
+  case RPY_BUF_UNSUPPORTED:
+    return 0;
+  case RPY_BUF_FLOAT32:
+  case RPY_BUF_FLOAT64:
+    return (rtype == REALSXP) ||
+      ((rtype == CPLXSXP) && ! (flags & RPY_BUFFER_STRICT));
+  case RPY_BUF_COMPLEX64:
+  case RPY_BUF_COMPLEX128:
+    return rtype == CPLXSXP;
+  default:
+    /* booleans and integers */
+    return (rtype == REALSXP) || (rtype == INTSXP) || (rtype == LGLSXP) ||
+      ((rtype == CPLXSXP) && ! (flags & RPY_BUFFER_STRICT));
+  }
+}
+
+/* Convert the 'n' items starting at 'src' and separated by 'stride' bytes
+ * with the statement 'store' (in which the current item is 'value' and
+ * its index is 'ii'). memcpy() is used to read the items because
+ * buffers are not necessarily aligned.
+ */
+#define RPY_BUFFER_RUN(ctype, store)			\
+  for (ii = 0; ii < n; ii++) {				\
+    ctype value;					\
+    memcpy(&value, src + ii * stride, sizeof(ctype));	\
+    store;						\
+  }							\
+  break;
+
+#define RPY_BUFFER_RUN_ALLKINDS(store_int, store_uint, store_float)	\
+  switch (kind) {							\
+  case RPY_BUF_BOOL:   RPY_BUFFER_RUN(unsigned char, store_uint)	\
+  case RPY_BUF_INT8:   RPY_BUFFER_RUN(int8_t, store_int)			\
+  case RPY_BUF_INT16:  RPY_BUFFER_RUN(int16_t, store_int)		\
+  case RPY_BUF_INT32:  RPY_BUFFER_RUN(int32_t, store_int)		\
+  case RPY_BUF_INT64:  RPY_BUFFER_RUN(int64_t, store_int)		\
+  case RPY_BUF_UINT8:  RPY_BUFFER_RUN(uint8_t, store_uint)		\
+  case RPY_BUF_UINT16: RPY_BUFFER_RUN(uint16_t, store_uint)		\
+  case RPY_BUF_UINT32: RPY_BUFFER_RUN(uint32_t, store_uint)		\
+  case RPY_BUF_UINT64: RPY_BUFFER_RUN(uint64_t, store_uint)		\
+  case RPY_BUF_FLOAT32: RPY_BUFFER_RUN(float, store_float)		\
+  case RPY_BUF_FLOAT64: RPY_BUFFER_RUN(double, store_float)		\
+  default:								\
+    break;								\
+  }
+
+static Py_ssize_t
+rpy_buffer_copyrun(RPy_BufferKind kind, const char *src, Py_ssize_t stride,
+		   Py_ssize_t n, SEXP sexp, Py_ssize_t offset)
+{
+  /* Copy 'n' items of kind 'kind' from the buffer memory 'src'
+   * (items separated by 'stride' bytes) into the R vector 'sexp',
+   * starting at index 'offset'. The compatibility of 'kind' with the
+   * type of 'sexp' must have been checked with rpy_buffer_kind_tortype().
+   * Integers that do not fit in an R integer are replaced by NA, and
+   * the number of such integers is returned.
+   */
+  Py_ssize_t ii;
+  Py_ssize_t n_overflow = 0;
+  double *double_ptr;
+  int *int_ptr;
+  Rcomplex *cplx_ptr;
+
+  switch (TYPEOF(sexp)) {
+  case REALSXP:
+    double_ptr = NUMERIC_POINTER(sexp) + offset;
+    RPY_BUFFER_RUN_ALLKINDS(double_ptr[ii] = (double)value,
+			    double_ptr[ii] = (double)value,
+			    double_ptr[ii] = (double)value)
+    break;
+  case INTSXP:
+    int_ptr = INTEGER_POINTER(sexp) + offset;
+    RPY_BUFFER_RUN_ALLKINDS(if (value <= INT_MAX && value >= INT_MIN) {
+			      int_ptr[ii] = (int)value;
+			    } else {
+			      int_ptr[ii] = NA_INTEGER;
+			      n_overflow++;
+			    },
+			    if (value <= INT_MAX) {
+			      int_ptr[ii] = (int)value;
+			    } else {
+			      int_ptr[ii] = NA_INTEGER;
+			      n_overflow++;
+			    },
+			    int_ptr[ii] = NA_INTEGER)
+    break;
+  case LGLSXP:
+    int_ptr = LOGICAL_POINTER(sexp) + offset;
+    RPY_BUFFER_RUN_ALLKINDS(int_ptr[ii] = (value == NA_LOGICAL) ?
+			    NA_LOGICAL : (value != 0),
+			    int_ptr[ii] = (value != 0),
+			    int_ptr[ii] = NA_LOGICAL)
+    break;
+  case CPLXSXP:
+    cplx_ptr = COMPLEX_POINTER(sexp) + offset;
+    if (kind == RPY_BUF_COMPLEX128) {
+      for (ii = 0; ii < n; ii++) {
+	memcpy(cplx_ptr + ii, src + ii * stride, sizeof(Rcomplex));
+      }
+    } else if (kind == RPY_BUF_COMPLEX64) {
+      for (ii = 0; ii < n; ii++) {
+	float value[2];
+	memcpy(value, src + ii * stride, 2 * sizeof(float));
+	cplx_ptr[ii].r = (double)value[0];
+	cplx_ptr[ii].i = (double)value[1];
+      }
+    } else {
+      RPY_BUFFER_RUN_ALLKINDS(cplx_ptr[ii].r = (double)value; cplx_ptr[ii].i = 0,
+			      cplx_ptr[ii].r = (double)value; cplx_ptr[ii].i = 0,
+			      cplx_ptr[ii].r = (double)value; cplx_ptr[ii].i = 0)
+    }
+    break;
+  }
+  return n_overflow;
+}
+
+/* Take a Python object exporting the buffer protocol and build an R
+   vector of type 'rtype' with a copy of its items, in column-major
+   (FORTRAN) order. When the items are already of the C type used by R
+   and laid out in FORTRAN order the copy is a single memcpy().
+   'flags' is a combination of:
+   - RPY_BUFFER_SETDIM: the attribute "dim" of the R vector is set to
+     the shape of the buffer.
+   - RPY_BUFFER_STRICT: only accept the items the constructors for
+     R vectors would accept from a Python sequence: only complex numbers
+     make complex vectors.
+   Integers that do not fit in an R integer raise an OverflowError.
+   The function returns 0 on success and -1 on failure (with a Python
+   exception set). It returns 1, with no exception set, if the object does
+   not export a buffer or if the items in the buffer cannot be copied
+   into a vector of type 'rtype' (the caller can then fall back to
+   the sequence protocol).
+*/
+static int
+RPy_BufferToSEXP(PyObject *object, int rtype, int flags, SEXP *sexpp)
+{
+  Py_buffer view;
+  RPy_BufferKind kind;
+  Py_ssize_t length, nruns, irun, dim_i;
+  Py_ssize_t n_overflow = 0;
+  Py_ssize_t *index, *strides, *c_strides = NULL;
+  SEXP new_sexp, dim_sexp;
+  int ndim;
+
+  if (! PyObject_CheckBuffer(object)) {
+    return 1;
+  }
+  if (PyObject_GetBuffer(object, &view, PyBUF_STRIDES | PyBUF_FORMAT) == -1) {
+    return -1;
+  }
+
+  kind = rpy_buffer_kind(view.format, view.itemsize);
+  if (! rpy_buffer_kind_tortype(kind, rtype, flags)) {
+    PyBuffer_Release(&view);
+    return 1;
+  }
+
+  ndim = view.ndim;
+  length = 1;
+  for (dim_i = 0; dim_i < ndim; dim_i++) {
+    length *= view.shape[dim_i];
+  }
+  if (length > R_XLEN_T_MAX) {
+    PyErr_Format(PyExc_ValueError,
+		 "The Python buffer is longer than the longuest possible vector in R");
+    PyBuffer_Release(&view);
+    return -1;
+  }
+  if (flags & RPY_BUFFER_SETDIM) {
+    /* R vectors can be long, but each dimension is an R integer. */
+    for (dim_i = 0; dim_i < ndim; dim_i++) {
+      if (view.shape[dim_i] > INT_MAX) {
+	PyErr_Format(PyExc_ValueError,
+		     "Dimension %zd of the Python buffer is larger than what R can handle.",
+		     dim_i);
+	PyBuffer_Release(&view);
+	return -1;
+      }
+    }
+  }
+
+  strides = view.strides;
+  if (strides == NULL && ndim > 0) {
+    /* C-contiguous */
+    c_strides = (Py_ssize_t *)PyMem_Malloc(sizeof(Py_ssize_t) * ndim);
+    if (c_strides == NULL) {
+      PyBuffer_Release(&view);
+      PyErr_NoMemory();
+      return -1;
+    }
+    c_strides[ndim-1] = view.itemsize;
+    for (dim_i = ndim-1; dim_i > 0; dim_i--) {
+      c_strides[dim_i-1] = c_strides[dim_i] * view.shape[dim_i];
+    }
+    strides = c_strides;
+  }
+
+  PROTECT(new_sexp = allocVector(rtype, length));
+
+  if (length == 0) {
+    /* nothing to copy */
+  } else if (ndim == 0) {
+    n_overflow = rpy_buffer_copyrun(kind, (const char *)view.buf,
+				    view.itemsize, 1, new_sexp, 0);
+  } else if (kind == RPY_BUF_FLOAT64 && rtype == REALSXP &&
+	     PyBuffer_IsContiguous(&view, 'F')) {
+    memcpy(NUMERIC_POINTER(new_sexp), view.buf, length * sizeof(double));
+  } else if (kind == RPY_BUF_INT32 && rtype == INTSXP &&
+	     PyBuffer_IsContiguous(&view, 'F')) {
+    memcpy(INTEGER_POINTER(new_sexp), view.buf, length * sizeof(int));
+  } else if (kind == RPY_BUF_COMPLEX128 && rtype == CPLXSXP &&
+	     PyBuffer_IsContiguous(&view, 'F')) {
+    memcpy(COMPLEX_POINTER(new_sexp), view.buf, length * sizeof(Rcomplex));
+  } else {
+    /* Copy the buffer one run along the first dimension at a time,
+     * iterating over the other dimensions in FORTRAN order. */
+    index = (Py_ssize_t *)PyMem_Calloc(ndim, sizeof(Py_ssize_t));
+    if (index == NULL) {
+      UNPROTECT(1);
+      PyMem_Free(c_strides);
+      PyBuffer_Release(&view);
+      PyErr_NoMemory();
+      return -1;
+    }
+    nruns = length / view.shape[0];
+    for (irun = 0; irun < nruns; irun++) {
+      const char *src = (const char *)view.buf;
+      for (dim_i = 1; dim_i < ndim; dim_i++) {
+	src += index[dim_i] * strides[dim_i];
+      }
+      n_overflow += rpy_buffer_copyrun(kind, src, strides[0], view.shape[0],
+				       new_sexp, irun * view.shape[0]);
+      for (dim_i = 1; dim_i < ndim; dim_i++) {
+	if (++index[dim_i] < view.shape[dim_i]) {
+	  break;
+	}
+	index[dim_i] = 0;
+      }
+    }
+    PyMem_Free(index);
+  }
+
+  if (n_overflow > 0) {
+    UNPROTECT(1);
+    PyMem_Free(c_strides);
+    PyBuffer_Release(&view);
+    PyErr_Format(PyExc_OverflowError,
+		 "Integer overflow with %zd element(s) in the buffer.",
+		 n_overflow);
+    return -1;
+  }
+
+  if ((flags & RPY_BUFFER_SETDIM) && ndim > 0) {
+    PROTECT(dim_sexp = allocVector(INTSXP, ndim));
+    for (dim_i = 0; dim_i < ndim; dim_i++) {
+      INTEGER_POINTER(dim_sexp)[dim_i] = (int)view.shape[dim_i];
+    }
+    setAttrib(new_sexp, R_DimSymbol, dim_sexp);
+    UNPROTECT(1);
+  }
+
+  UNPROTECT(1);
+  PyMem_Free(c_strides);
+  PyBuffer_Release(&view);
+  *sexpp = new_sexp;
+  return 0;
+}
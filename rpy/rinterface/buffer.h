@@ -6,6 +6,11 @@
 #endif
 
 static PyBufferProcs VectorSexp_as_buffer;
+#define RPY_BUFFER_SETDIM 1
+#define RPY_BUFFER_STRICT 2
+
+static int RPy_BufferToSEXP(PyObject *object, int rtype, int flags,
+			    SEXP *sexpp);
 
 #endif
 
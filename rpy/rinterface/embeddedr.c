@@ -7,320 +7,332 @@ const unsigned int const RPY_R_BUSY = 0x02;
 /* Initial status is 0 */
 static unsigned int embeddedR_status = 0;
 
-/* An environment to keep R objects preserved by rpy2 */
-static SEXP RPY_R_PreciousEnv = NULL;
-static PyObject *Rpy_R_Precious;
+/* Objects preserved by rpy2 are tracked with an open-addressing hash table
+   (linear probing) keyed by the SEXP, and kept from R's garbage collection
+   by being stored in a single R list (the "precious pool"). Free slots in
+   the pool are recycled through a stack of indices. */
+static SexpObject **Rpy_PreservedTable = NULL;
+static Py_ssize_t Rpy_PreservedTable_size = 0;
+static Py_ssize_t Rpy_PreservedTable_used = 0;
+
+static SEXP RPY_R_PreciousPool = NULL;
+static R_xlen_t RPY_R_PreciousPool_size = 0;
+static R_xlen_t *Rpy_PoolFreeSlots = NULL;
+static R_xlen_t Rpy_PoolFreeSlots_n = 0;
+
+/* R can only be used by one thread at a time. The status RPY_R_BUSY is
+   backed by a lock: a thread wanting to use R while it is busy in an
+   other thread waits for R to be free (without holding the GIL).
+   The lock is re-entrant: the thread owning it (for example running a
+   Python callback from R) can take it again, and it is only released
+   when embeddedR_freelock() was called as many times as
+   embeddedR_setlock(). The status, the owner, and the depth are only
+   modified while holding the GIL. */
+static PyThread_type_lock embeddedR_lock = NULL;
+static unsigned long embeddedR_lock_owner = 0;
+static unsigned long embeddedR_lock_depth = 0;
+
+/* Pool slots released while R was busy in an other thread (the pool
+   cannot be modified then). They are cleared the next time the lock is
+   taken. */
+static R_xlen_t *Rpy_PoolPendingSlots = NULL;
+static R_xlen_t Rpy_PoolPendingSlots_n = 0;
+
+static void Rpy_PreciousPool_flush(void);
+
+static inline int embeddedR_isbusyelsewhere(void) {
+  return (embeddedR_status & RPY_R_BUSY) &&
+    (embeddedR_lock_owner != (unsigned long)PyThread_get_thread_ident());
+}
 
 static inline void embeddedR_setlock(void) {
+  const unsigned long thread_id = (unsigned long)PyThread_get_thread_ident();
+  if ((embeddedR_status & RPY_R_BUSY) && (embeddedR_lock_owner == thread_id)) {
+    embeddedR_lock_depth++;
+    return;
+  }
+  if (embeddedR_lock != NULL &&
+      ! PyThread_acquire_lock(embeddedR_lock, NOWAIT_LOCK)) {
+    Py_BEGIN_ALLOW_THREADS
+    PyThread_acquire_lock(embeddedR_lock, WAIT_LOCK);
+    Py_END_ALLOW_THREADS
+  }
+  embeddedR_lock_owner = thread_id;
+  embeddedR_lock_depth = 1;
   embeddedR_status = embeddedR_status | RPY_R_BUSY;
+  if (Rpy_PoolPendingSlots_n > 0) {
+    Rpy_PreciousPool_flush();
+  }
 }
 static inline void embeddedR_freelock(void) {
-  embeddedR_status = embeddedR_status ^ RPY_R_BUSY;
+  if (! (embeddedR_status & RPY_R_BUSY)) {
+    return;
+  }
+  if (--embeddedR_lock_depth > 0) {
+    return;
+  }
+  embeddedR_status = embeddedR_status & (~RPY_R_BUSY);
+  embeddedR_lock_owner = 0;
+  if (embeddedR_lock != NULL) {
+    PyThread_release_lock(embeddedR_lock);
+  }
+}
+/* Entry points that only read or modify R objects (slots, attributes,
+   creation of Python wrappers) take the lock with
+   embeddedR_setlock_nested() and give the returned value back to
+   embeddedR_freelock_nested(). The lock being re-entrant, this is the
+   same as embeddedR_setlock() and embeddedR_freelock(). */
+static inline int embeddedR_setlock_nested(void) {
+  embeddedR_setlock();
+  return 1;
+}
+static inline void embeddedR_freelock_nested(int is_locked) {
+  if (is_locked) {
+    embeddedR_freelock();
+  }
 }
 static inline unsigned int rpy_has_status(unsigned int status) {
   return (embeddedR_status & status) == status;
 }
 
-/*FIXME: this is not thread safe (calls to R not using
-         locking). Can this is be a source of errors ?
-*/
-static void SexpObject_clear(SexpObject *sexpobj)
-{
-  if (sexpobj->pycount <= 0) {
-    printf("Warning: clearing an R object with a refcount <= zero.\n");
+static inline Py_ssize_t Rpy_PreservedTable_hash(SEXP object) {
+  /* SEXPs are aligned pointers: drop the low bits and mix (Fibonacci
+     hashing) before masking with the table size. */
+  size_t h = ((size_t)object) >> 3;
+  h = h * (size_t)2654435761U;
+  return (Py_ssize_t)(h ^ (h >> 16)) & (Rpy_PreservedTable_size - 1);
+}
+
+/* Return the position of object in the table, or the position of the empty
+   slot where it would be inserted. The table must be allocated. */
+static inline Py_ssize_t Rpy_PreservedTable_lookup(SEXP object) {
+  Py_ssize_t mask = Rpy_PreservedTable_size - 1;
+  Py_ssize_t i = Rpy_PreservedTable_hash(object);
+  while (Rpy_PreservedTable[i] != NULL &&
+	 Rpy_PreservedTable[i]->sexp != object) {
+    i = (i + 1) & mask;
   }
+  return i;
+}
 
-  if ((sexpobj->sexp) != R_NilValue) {
-    /* R objects that needs to be preserved from garbage collection */
-    if (RPY_R_PreciousEnv == NULL) {
-      /* Use the R "precious list" */
-      R_ReleaseObject(sexpobj->sexp);
-    } else {
-      /* Use the environment */
-      static char *name_buf;
-      if (name_buf == NULL) {
-	/* Initialize with the number of characters required for an hexadecimal
-	   representation of a pointer*/
-	name_buf = (char *)calloc(sizeof(name_buf)*2+2+1, sizeof(char)) ; 
-      }
-      sprintf(name_buf, "%p", (void *)(sexpobj->sexp));
-      
-      SEXP res = rpy2_remove(Rf_mkString(name_buf), 
-			     RPY_R_PreciousEnv,
-			     Rf_ScalarLogical(FALSE));
-      //Rf_defineVar(name_r, sexpobj->sexp, RPY_R_PreciousEnv);
+/* Return 0 on success, -1 on failure (with a Python exception set). */
+static int Rpy_PreservedTable_resize(Py_ssize_t newsize) {
+  SexpObject **oldtable = Rpy_PreservedTable;
+  Py_ssize_t oldsize = Rpy_PreservedTable_size;
+  SexpObject **newtable = (SexpObject **)PyMem_Calloc(newsize,
+						       sizeof(SexpObject *));
+  if (newtable == NULL) {
+    PyErr_NoMemory();
+    return -1;
+  }
+  Rpy_PreservedTable = newtable;
+  Rpy_PreservedTable_size = newsize;
+  Py_ssize_t i;
+  for (i = 0; i < oldsize; i++) {
+    if (oldtable[i] != NULL) {
+      newtable[Rpy_PreservedTable_lookup(oldtable[i]->sexp)] = oldtable[i];
     }
-    PyMem_Free(sexpobj);
   }
+  PyMem_Free(oldtable);
+  return 0;
+}
 
-/*   sexpobj->count--; */
+/* Remove the entry at position i (backward-shift deletion, so no tombstones
+   are needed). */
+static void Rpy_PreservedTable_delete(Py_ssize_t i) {
+  Py_ssize_t mask = Rpy_PreservedTable_size - 1;
+  Py_ssize_t j = i;
+  Py_ssize_t k;
+  Rpy_PreservedTable[i] = NULL;
+  while (1) {
+    j = (j + 1) & mask;
+    if (Rpy_PreservedTable[j] == NULL) {
+      break;
+    }
+    k = Rpy_PreservedTable_hash(Rpy_PreservedTable[j]->sexp);
+    if ((j > i && (k <= i || k > j)) ||
+	(j < i && (k <= i && k > j))) {
+      Rpy_PreservedTable[i] = Rpy_PreservedTable[j];
+      Rpy_PreservedTable[j] = NULL;
+      i = j;
+    }
+  }
+  Rpy_PreservedTable_used--;
+}
 
-/* #ifdef RPY_VERBOSE */
-/*   printf("R:%p -- sexp count is %i...",  */
-/*          sexpobj->sexp, sexpobj->count); */
-/* #endif */
-/*   if (((*sexpobj).count == 0) && (*sexpobj).sexp) { */
-/* #ifdef RPY_VERBOSE */
-/*     printf("freeing SEXP resources..."); */
-/* #endif  */
+/* Store object in the precious pool, growing it when full.
+   Return the index in the pool, or -1 on failure (with a Python
+   exception set). */
+static R_xlen_t Rpy_PreciousPool_add(SEXP object) {
+  if (Rpy_PoolFreeSlots_n == 0) {
+    R_xlen_t oldsize = RPY_R_PreciousPool_size;
+    R_xlen_t newsize = (oldsize == 0) ? 1024 : oldsize * 2;
+    R_xlen_t *freeslots = (R_xlen_t *)PyMem_Realloc(Rpy_PoolFreeSlots,
+						    newsize * sizeof(R_xlen_t));
+    if (freeslots == NULL) {
+      PyErr_NoMemory();
+      return -1;
+    }
+    Rpy_PoolFreeSlots = freeslots;
+    R_xlen_t *pendingslots = (R_xlen_t *)PyMem_Realloc(Rpy_PoolPendingSlots,
+						       newsize * sizeof(R_xlen_t));
+    if (pendingslots == NULL) {
+      PyErr_NoMemory();
+      return -1;
+    }
+    Rpy_PoolPendingSlots = pendingslots;
+    /* The object might not be protected by the caller, and allocating
+       the new pool can trigger R's garbage collection. */
+    SEXP newpool;
+    PROTECT(object);
+    PROTECT(newpool = allocVector(VECSXP, newsize));
+    R_xlen_t i;
+    for (i = 0; i < oldsize; i++) {
+      SET_VECTOR_ELT(newpool, i, VECTOR_ELT(RPY_R_PreciousPool, i));
+    }
+    R_PreserveObject(newpool);
+    if (RPY_R_PreciousPool != NULL) {
+      R_ReleaseObject(RPY_R_PreciousPool);
+    }
+    UNPROTECT(2);
+    RPY_R_PreciousPool = newpool;
+    RPY_R_PreciousPool_size = newsize;
+    for (i = newsize - 1; i >= oldsize; i--) {
+      Rpy_PoolFreeSlots[Rpy_PoolFreeSlots_n++] = i;
+    }
+  }
+  R_xlen_t slot = Rpy_PoolFreeSlots[--Rpy_PoolFreeSlots_n];
+  SET_VECTOR_ELT(RPY_R_PreciousPool, slot, object);
+  return slot;
+}
 
-/* /\*     if (sexpobj->sexp != R_NilValue) { *\/ */
-/* /\* #ifdef RPY_DEBUG_PRESERVE *\/ */
-/* /\*       printf("  PRESERVE -- Sexp_clear: R_ReleaseObject -- %p ",  *\/ */
-/* /\*              sexpobj->sexp); *\/ */
-/* /\*       preserved_robjects -= 1; *\/ */
-/* /\*       printf("-- %i\n", preserved_robjects); *\/ */
-/* /\* #endif  *\/ */
-/* /\*       int preserve_status = Rpy_ReleaseObject(sexpobj->sexp); *\/ */
-/* /\*       if (preserve_status == -1) { *\/ */
-/* /\* 	PyErr_Print(); *\/ */
-/* /\* 	PyErr_Clear(); *\/ */
-/* /\*       } *\/ */
-/* /\*     } *\/ */
-/*     /\* self->ob_type->tp_free((PyObject*)self); *\/ */
-/* #ifdef RPY_VERBOSE */
-/*     printf("done.\n"); */
-/* #endif  */
-/*   }   */
+static inline void Rpy_PreciousPool_remove(R_xlen_t slot) {
+  if (embeddedR_isbusyelsewhere()) {
+    Rpy_PoolPendingSlots[Rpy_PoolPendingSlots_n++] = slot;
+    return;
+  }
+  SET_VECTOR_ELT(RPY_R_PreciousPool, slot, R_NilValue);
+  Rpy_PoolFreeSlots[Rpy_PoolFreeSlots_n++] = slot;
 }
 
-static void SexpObject_CObject_destroy(PyObject *rpycapsule)
-{
-  SexpObject *sexpobj_ptr = (SexpObject *)(PyCapsule_GetPointer(rpycapsule,
-								"rpy2.rinterface._rinterface.SEXPOBJ_C_API"));
-  SexpObject_clear(sexpobj_ptr);
+/* Clear the slots released while R was busy in an other thread. */
+static void Rpy_PreciousPool_flush(void) {
+  while (Rpy_PoolPendingSlots_n > 0) {
+    R_xlen_t slot = Rpy_PoolPendingSlots[--Rpy_PoolPendingSlots_n];
+    SET_VECTOR_ELT(RPY_R_PreciousPool, slot, R_NilValue);
+    Rpy_PoolFreeSlots[Rpy_PoolFreeSlots_n++] = slot;
+  }
+}
+
+/* Return the SexpObject tracking object, or NULL if not tracked. */
+static SexpObject* Rpy_FindPreserved(SEXP object) {
+  if (Rpy_PreservedTable == NULL) {
+    return NULL;
+  }
+  return Rpy_PreservedTable[Rpy_PreservedTable_lookup(object)];
 }
 
 /* Keep track of R objects preserved by rpy2 
    Return NULL on failure (a Python exception being set) 
  */
 static SexpObject* Rpy_PreserveObject(SEXP object) {
-  /* PyDict can be confused if an error has been raised.
-     We put aside the exception if the case, to restore it at the end.
-     FIXME: this situation can occur because of presumed shortcomings
-     in the overall design of rpy2.
-   */
-  int reset_error_state = 0; 
-  PyObject *ptype, *pvalue, *ptraceback;
-
-  if (PyErr_Occurred()) {
-    reset_error_state = 1;
-    PyErr_Fetch(&ptype, &pvalue, &ptraceback);
-  }
-
-  PyObject *key = PyLong_FromVoidPtr((void *)object);
-  PyObject *capsule = PyDict_GetItem(Rpy_R_Precious, key);
+  Py_ssize_t i;
   SexpObject *sexpobj_ptr;
-  /* capsule is a borrowed reference */
-  if (capsule == NULL) {
-    /* The R object is not yet tracked by rpy2 so we:
-       - create a new SexpObject. 
-       - create a capsule for it
-       - put the capsule in the tracking dictionary
-    */
-    sexpobj_ptr = (SexpObject *)PyMem_Malloc(1 * sizeof(SexpObject));
-    if (! sexpobj_ptr) {
-      PyErr_NoMemory();
+
+  if (Rpy_PreservedTable == NULL) {
+    if (Rpy_PreservedTable_resize(1024) == -1) {
       return NULL;
     }
-    sexpobj_ptr->pycount = 1;
-    sexpobj_ptr->sexp = object;
-    capsule = PyCapsule_New((void *)(sexpobj_ptr),
-			    "rpy2.rinterface._rinterface.SEXPOBJ_C_API",
-			    SexpObject_CObject_destroy);
-    if (PyDict_SetItem(Rpy_R_Precious, key, capsule) == -1) {
-      Py_DECREF(key);
-      Py_DECREF(capsule);
+  }
+  /* Adding to the precious pool allocates R objects and modifies an R
+     list: this cannot happen while R is busy in an other thread (the
+     lock is taken before the lookup since waiting for it releases the
+     GIL). R_NilValue is never added to the pool. */
+  int is_locked = (object != R_NilValue) ? embeddedR_setlock_nested() : 0;
+  i = Rpy_PreservedTable_lookup(object);
+  sexpobj_ptr = Rpy_PreservedTable[i];
+  if (sexpobj_ptr != NULL) {
+    sexpobj_ptr->pycount++;
+    embeddedR_freelock_nested(is_locked);
+    return sexpobj_ptr;
+  }
+
+  /* The R object is not yet tracked by rpy2. */
+  sexpobj_ptr = (SexpObject *)PyMem_Malloc(sizeof(SexpObject));
+  if (! sexpobj_ptr) {
+    PyErr_NoMemory();
+    embeddedR_freelock_nested(is_locked);
+    return NULL;
+  }
+  sexpobj_ptr->pycount = 1;
+  sexpobj_ptr->rcount = 0;
+  sexpobj_ptr->sexp = object;
+  sexpobj_ptr->pool_index = -1;
+  if (object != R_NilValue) {
+    /* R objects that needs to be preserved from garbage collection */
+    sexpobj_ptr->pool_index = Rpy_PreciousPool_add(object);
+    if (sexpobj_ptr->pool_index == -1) {
+      PyMem_Free(sexpobj_ptr);
+      embeddedR_freelock_nested(is_locked);
       return NULL;
     }
-    Py_DECREF(capsule);
-    if (object != R_NilValue) {
-      /* R objects that needs to be preserved from garbage collection */
-      if (RPY_R_PreciousEnv == NULL) {
-	/* Use the R "precious list" */
-	R_PreserveObject(object);
-      } else {
-	/* Use an enclosing environment instead of R's "precious list" 
-	   to protect the object from garbage collection */
-	static char *name_buf;
-	if (name_buf == NULL) {
-	  /* Initialize with the number of characters required for an hexadecimal
-	     representation of a pointer*/
-	  name_buf = (char *)calloc(sizeof(name_buf)*2+2+1, sizeof(char)) ; 
-	}
-	sprintf(name_buf, "%p", (void *)object);
-	SEXP name_r = Rf_install(name_buf);
-	Rf_defineVar(name_r, object, RPY_R_PreciousEnv);
-      }
-    }
-  } else {
-    /* Reminder: capsule is a borrowed reference */
-    sexpobj_ptr = (SexpObject *)(PyCapsule_GetPointer(capsule,
-						      "rpy2.rinterface._rinterface.SEXPOBJ_C_API"));
-    if (sexpobj_ptr != NULL) {
-      sexpobj_ptr->pycount++;
-    }
   }
-  Py_DECREF(key);
-  
-  if (reset_error_state) {
-    if (PyErr_Occurred()) {
-      PyErr_Print();
+  Rpy_PreservedTable[i] = sexpobj_ptr;
+  Rpy_PreservedTable_used++;
+  /* Keep the load factor under 1/2 */
+  if (Rpy_PreservedTable_used * 2 > Rpy_PreservedTable_size) {
+    if (Rpy_PreservedTable_resize(Rpy_PreservedTable_size * 2) == -1) {
+      /* The entry is in the table: only the growth failed. */
       PyErr_Clear();
     }
-    PyErr_Restore(ptype, pvalue, ptraceback);
   }
+  embeddedR_freelock_nested(is_locked);
   return sexpobj_ptr;
 } 
 
-/* static int Rpy_PreserveObject(SEXP object) { */
-/* R_ReleaseObject(RPY_R_Precious); */
-/* PROTECT(RPY_R_Precious); */
-/* RPY_R_Precious = CONS(object, RPY_R_Precious); */
-/* UNPROTECT(1); */
-/* R_PreserveObject(RPY_R_Precious); */
-/* } */
-
+/* Return 0 on success, -1 on failure (with a Python exception set) */
 static int Rpy_ReleaseObject(SEXP object) {
-  /* PyDict can be confused if an error has been raised.
-     We put aside the exception if the case, to restore it at the end.
-     FIXME: this situation can occur because of presumed shortcomings
-     in the overall design of rpy2.
-   */
-  int reset_error_state = 0; 
-  PyObject *ptype, *pvalue, *ptraceback; 
-  if (PyErr_Occurred()) {
-    reset_error_state = 1;
-    PyErr_Fetch(&ptype, &pvalue, &ptraceback);
-  }
+  Py_ssize_t i;
+  SexpObject *sexpobj_ptr = NULL;
 
-  PyObject *key = PyLong_FromVoidPtr((void *)object);
-  PyObject *capsule = PyDict_GetItem(Rpy_R_Precious, key);
-  /* capsule is a borrowed reference */
-  if (capsule == NULL) {
-    /* FIXME: should all rpy2 proxy objects have an associated capsule ?
-     *        If yes, why are we here ?
-     */
-    printf("Warning: the rpy2 object we are trying to release has no associated capsule.\n");
-    if (reset_error_state) {
-      PyErr_Restore(ptype, pvalue, ptraceback);
-      printf("Restoring an earlier exception.\n");
-      printf("Error:Trying to release object ID %ld while not preserved\n",
-	     PyLong_AsLong(key));
-    } else {
-      PyErr_Format(PyExc_KeyError, 
-		   "Trying to release object ID %ld while not preserved\n",
-		   PyLong_AsLong(key));
-    }
-    Py_DECREF(key);
-    return -1;
-  } 
-
-  SexpObject *sexpobj_ptr = (SexpObject *)(PyCapsule_GetPointer(capsule,
-								"rpy2.rinterface._rinterface.SEXPOBJ_C_API"));
+  if (Rpy_PreservedTable != NULL) {
+    i = Rpy_PreservedTable_lookup(object);
+    sexpobj_ptr = Rpy_PreservedTable[i];
+  }
   if (sexpobj_ptr == NULL) {
-    if (reset_error_state) {
-      if (PyErr_Occurred()) {
-	PyErr_Print();
-      }
-      PyErr_Restore(ptype, pvalue, ptraceback);
-    }
-    Py_DECREF(key);
+    PyErr_Format(PyExc_KeyError, 
+		 "Trying to release object ID %p while not preserved\n",
+		 (void *)object);
     return -1;
-  }
-  int res = 0;
+  } 
 
   switch (sexpobj_ptr->pycount) {
   case 0:
     if (object != R_NilValue) {
-      res = -1;
       PyErr_Format(PyExc_ValueError,
-		   "Preserved object ID %ld with a count of zero\n", 
-		   PyLong_AsLong(key));
-      Py_DECREF(key);
-      return res;
+		   "Preserved object ID %p with a count of zero\n", 
+		   (void *)object);
+      return -1;
     }
     break;
   case 1:
-    /* By deleting the capsule from the dictionary, the count of the SexpObject
-      will go down by one, reach zero, and the release of the R object 
-      will be performed. */
+    /* R_NilValue is never collected and it is kept in the table
+       (with a count possibly down to zero) since it is constantly
+       acquired and released by newly created objects. */
     if (object == R_NilValue) {
       sexpobj_ptr->pycount--;
     } else {
-      res = PyDict_DelItem(Rpy_R_Precious, key);
-      if (res == -1)
-	PyErr_Format(PyExc_ValueError,
-		     "Occured while deleting preserved object ID %ld\n",  
-		     PyLong_AsLong(key));
+      Rpy_PreciousPool_remove(sexpobj_ptr->pool_index);
+      Rpy_PreservedTable_delete(i);
+      PyMem_Free(sexpobj_ptr);
     }
     break;
-  case 2:
-    /* When the refcount is exactly 2, we could have the following possible
-     * situations:
-     * A- 1 PySexpObject, 1 SexpObject in a capsule
-     * B- 2 SexpObject in a capsule
-     * C- 2 PySexObject
-     * Only A is effectively possible because each PySexpObject has
-     * an associated capsule (rules out C) and each capsule is unique
-     * for a given SEXP (rules out B).
-     * In addition to that, the reference counting in rpy2 is independent
-     * from Python's reference counting. This is means that in the situation A/
-     * above we can have n pointers to the PySexpObject and m pointers
-     * to the SexpObject. 
-     */
-    //  ob_refcnt;
-    /* if (PyLong_AsLong(key) == 0) { */
-    /*   printf("Count 2 for: 0\n"); */
-    /*   break; */
-    /* } */
-    sexpobj_ptr->pycount--;
-    /* if (object == R_NilValue) { */
-    /*   sexpobj_ptr->count--; */
-    /* } else { */
-    /*   //printf("-->use to delete %ld here\n", PyLong_AsLong(key)); */
-    /*   res = PyDict_DelItem(Rpy_R_Precious, key); */
-    /*   if (res == -1) */
-    /*   	PyErr_Format(PyExc_ValueError, */
-    /*   		     "Occured while deleting preserved object ID %ld\n", */
-    /*   		     PyLong_AsLong(key)); */
-    /* } */
-    break;
   default:
     sexpobj_ptr->pycount--;
     break;
   }
-  
-  Py_DECREF(key);
-  if (reset_error_state) {
-    if (PyErr_Occurred()) {
-      PyErr_Print();
-    }
-    PyErr_Restore(ptype, pvalue, ptraceback);
-  }
-  return res;
+  return 0;
 }
-  /* SEXP parentnode, node; */
-  /* Py_ssize_t res = -1; */
-  /* if (isNull(RPY_R_Precious)) { */
-  /*   return res; */
-  /* } */
-  /* res++; */
-  /* if (object == CAR(RPY_R_Precious)) { */
-  /*   RPY_R_Precious = CDR(RPY_R_Precious); */
-  /*   return res; */
-  /* } */
-  /* parentnode = RPY_R_Precious; */
-  /* node = CDR(RPY_R_Precious); */
-  /* while (!isNull(node)) { */
-  /*   res++; */
-  /*   if (object == CAR(node)) { */
-  /*     SETCDR(parentnode, CDR(node)); */
-  /*     return res; */
-  /*   } */
-  /*   parentnode = node; */
-  /*   node = CDR(node); */
-  /* } */
 
 PyDoc_STRVAR(Rpy_ProtectedIDs_doc,
              "Return a tuple of pairs with each: \n"
@@ -331,20 +343,27 @@ PyDoc_STRVAR(Rpy_ProtectedIDs_doc,
 	     "from an rpy2 object through the read-only attribute `rid`.");
 /* Return a tuple with IDs of R objects protected by rpy2 and counts */
 static PyObject* Rpy_ProtectedIDs(PyObject *self) {
-  PyObject *key, *capsule;
-  Py_ssize_t pos = 0;
-  PyObject *ids = PyTuple_New(PyDict_Size(Rpy_R_Precious));
+  PyObject *ids = PyTuple_New(Rpy_PreservedTable_used);
+  if (ids == NULL) {
+    return NULL;
+  }
   Py_ssize_t pos_ids = 0;
+  Py_ssize_t i;
   PyObject *id_count;
   SexpObject *sexpobject_ptr;
 
-  while (PyDict_Next(Rpy_R_Precious, &pos, &key, &capsule)) {
-    id_count = PyTuple_New(2);
-    Py_INCREF(key);
-    PyTuple_SET_ITEM(id_count, 0, key);
-    sexpobject_ptr = (SexpObject *)(PyCapsule_GetPointer(capsule,
-							 "rpy2.rinterface._rinterface.SEXPOBJ_C_API"));
-    PyTuple_SET_ITEM(id_count, 1, PyLong_FromLong(sexpobject_ptr->pycount));
+  for (i = 0; i < Rpy_PreservedTable_size; i++) {
+    sexpobject_ptr = Rpy_PreservedTable[i];
+    if (sexpobject_ptr == NULL) {
+      continue;
+    }
+    id_count = Py_BuildValue("(Nn)",
+			     PyLong_FromVoidPtr((void *)sexpobject_ptr->sexp),
+			     sexpobject_ptr->pycount);
+    if (id_count == NULL) {
+      Py_DECREF(ids);
+      return NULL;
+    }
     PyTuple_SET_ITEM(ids, pos_ids, id_count);
     pos_ids++;
   }
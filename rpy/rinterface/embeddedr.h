@@ -9,14 +9,15 @@ extern const unsigned int const RPY_R_BUSY;
 /* Representation of R objects (instances) as instances in Python.
  */
 
-static PyObject* Rpy_R_Precious;
-static SEXP RPY_R_PreciousEnv;
+static SEXP RPY_R_PreciousPool;
 static void embeddedR_setlock(void);
 static void embeddedR_freelock(void);
+static int embeddedR_setlock_nested(void);
+static void embeddedR_freelock_nested(int is_locked);
 static unsigned int rpy_has_status(unsigned int);
-static void SexpObject_clear(SexpObject *sexpobj);
-static void SexpObject_CObject_destroy(PyObject *rpycapsule);
 static unsigned int embeddedR_status;
+static PyThread_type_lock embeddedR_lock;
+static SexpObject* Rpy_FindPreserved(SEXP object);
 static SexpObject* Rpy_PreserveObject(SEXP object);
 static int Rpy_ReleaseObject(SEXP object);
 static inline int Rpy_ReplaceSexp(PySexpObject *pso, SEXP rObj);
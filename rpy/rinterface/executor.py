@@ -0,0 +1,242 @@
+"""
+Run the calls to the embedded R from one dedicated thread.
+
+R is single-threaded. An :class:`RExecutor` owns a thread that performs
+all the work with R submitted to it, in the order it was submitted
+(first in, first out), and returns :class:`concurrent.futures.Future`
+objects. Any Python thread can submit work.
+
+>>> import rpy2.rinterface as ri
+>>> ri.initr()
+>>> from rpy2.rinterface.executor import get_executor
+>>> executor = get_executor()
+>>> f = executor.call(ri.baseenv['sum'], ri.IntSexpVector((1, 2, 3)))
+>>> f.result()[0]
+6
+
+"""
+
+import collections
+import concurrent.futures
+import threading
+import time
+import queue
+
+try:
+    import contextvars
+except ImportError:
+    # Python < 3.7
+    contextvars = None
+
+import rpy2.rinterface as rinterface
+
+
+CallTiming = collections.namedtuple('CallTiming',
+                                    ('wait', 'run'))
+CallTiming.__doc__ = """Timing (in seconds) for a call made by an
+:class:`RExecutor`: time spent waiting in the queue, and time spent running.
+"""
+
+Counters = collections.namedtuple('Counters',
+                                  ('calls', 'errors', 'wait', 'run'))
+Counters.__doc__ = """Counters for an :class:`RExecutor`: number of calls
+completed, number of calls that raised an exception, and total time
+(in seconds) the calls spent waiting in the queue and running.
+"""
+
+
+class RFuture(concurrent.futures.Future):
+    """ Future for work with R submitted to an :class:`RExecutor`. """
+
+    def __init__(self):
+        super(RFuture, self).__init__()
+        self._submitted = time.perf_counter()
+        self._started = None
+        self._finished = None
+
+    @property
+    def timing(self):
+        """ :class:`CallTiming` for the call, or None if the call
+        is not completed. """
+        if self._finished is None:
+            return None
+        return CallTiming(self._started - self._submitted,
+                          self._finished - self._started)
+
+
+class _ThreadContext(object):
+    """ Stand-in for :class:`contextvars.Context` on Python < 3.7. """
+
+    @staticmethod
+    def run(fn, *args, **kwargs):
+        return fn(*args, **kwargs)
+
+
+def _copy_context():
+    if contextvars is None:
+        return _ThreadContext
+    return contextvars.copy_context()
+
+
+class _WorkItem(object):
+    __slots__ = ('future', 'fn', 'args', 'kwargs', 'context')
+
+    def __init__(self, future, fn, args, kwargs, context):
+        self.future = future
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.context = context
+
+
+class RExecutor(concurrent.futures.Executor):
+    """ Executor running the work submitted in one thread that
+    owns the embedded R, in the order it was submitted.
+
+    Work submitted from the executor's thread itself (for example from
+    a Python function called by R) is run immediately, as waiting for
+    it would dead-lock the thread.
+
+    The work is run in a copy of the context (:mod:`contextvars`) it was
+    submitted from, so that it uses the conversion rules active there
+    (see :func:`rpy2.robjects.conversion.localconverter`). With
+    Python < 3.7 it is run in the context of the executor's thread.
+    """
+
+    def __init__(self, name='rpy2_executor'):
+        self._queue = queue.Queue()
+        self._shutdown = False
+        self._shutdown_lock = threading.Lock()
+        self._counters_lock = threading.Lock()
+        self._counters = Counters(0, 0, 0.0, 0.0)
+        self._thread = threading.Thread(target=self._worker, name=name)
+        self._thread.daemon = True
+        self._thread.start()
+
+    thread = property(lambda self: self._thread, None, None,
+                      "Thread in which the work with R is done.")
+
+    @property
+    def counters(self):
+        """ :class:`Counters` for the calls completed so far. """
+        with self._counters_lock:
+            return self._counters
+
+    def reset_counters(self):
+        """ Reset the counters to zero. """
+        with self._counters_lock:
+            self._counters = Counters(0, 0, 0.0, 0.0)
+
+    def qsize(self):
+        """ Approximate number of calls waiting to be run. """
+        return self._queue.qsize()
+
+    def _run(self, item):
+        future = item.future
+        if not future.set_running_or_notify_cancel():
+            return
+        future._started = time.perf_counter()
+        error = None
+        try:
+            result = item.context.run(item.fn, *item.args, **item.kwargs)
+        except BaseException as exc:
+            error = exc
+        future._finished = time.perf_counter()
+        # The counters are updated before the future is resolved, so that
+        # they include the call for whoever is waiting on the future.
+        timing = future.timing
+        with self._counters_lock:
+            c = self._counters
+            self._counters = Counters(c.calls + 1,
+                                      c.errors + int(error is not None),
+                                      c.wait + timing.wait,
+                                      c.run + timing.run)
+        if error is None:
+            future.set_result(result)
+        else:
+            future.set_exception(error)
+
+    def _worker(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                # shutdown
+                break
+            self._run(item)
+            del item
+
+    def submit(self, fn, *args, **kwargs):
+        """ Submit the call fn(*args, **kwargs) and return
+        an :class:`RFuture`. """
+        with self._shutdown_lock:
+            if self._shutdown:
+                raise RuntimeError('Cannot submit after shutdown.')
+            future = RFuture()
+            item = _WorkItem(future, fn, args, kwargs, _copy_context())
+            in_worker = threading.current_thread() is self._thread
+            if not in_worker:
+                self._queue.put(item)
+        if in_worker:
+            self._run(item)
+        return future
+
+    def call(self, function, *args, **kwargs):
+        """ Submit a call to the R function `function`
+        (a :class:`SexpClosure`). """
+        return self.submit(function, *args, **kwargs)
+
+    def rcall(self, function, params, environment=None):
+        """ Submit a call to the R function `function` with
+        the parameters `params` (a sequence of (name, value) pairs,
+        see :meth:`SexpClosure.rcall`), evaluated in `environment`
+        (the global environment by default). """
+        if environment is None:
+            environment = rinterface.globalenv
+        return self.submit(function.rcall, params, environment)
+
+    def parse(self, text):
+        """ Submit the parsing of the R code in `text`. """
+        return self.submit(rinterface.parse, text)
+
+    def reval(self, text, environment=None):
+        """ Submit the evaluation of the R code in `text` in the
+        environment `environment` (the global environment by default). """
+        if environment is None:
+            environment = rinterface.globalenv
+        return self.submit(_reval, text, environment)
+
+    def shutdown(self, wait=True):
+        """ Stop the executor. Work already submitted is completed. """
+        with self._shutdown_lock:
+            if not self._shutdown:
+                self._shutdown = True
+                self._queue.put(None)
+        if wait and threading.current_thread() is not self._thread:
+            self._thread.join()
+
+
+def _reval(text, environment):
+    expr = rinterface.parse(text)
+    return rinterface.baseenv['eval'](expr, environment)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """ Return the default :class:`RExecutor` (created on first use). """
+    global _executor
+    with _executor_lock:
+        if _executor is None or _executor._shutdown:
+            _executor = RExecutor()
+        return _executor
+
+
+def asyncio_submit(fn, *args, **kwargs):
+    """ Submit the call fn(*args, **kwargs) to the default
+    :class:`RExecutor` and return an :class:`asyncio.Future` for it,
+    attached to the current event loop. The event loop is not blocked
+    while R is working. """
+    import asyncio
+    return asyncio.wrap_future(get_executor().submit(fn, *args, **kwargs))
@@ -38,7 +38,12 @@ R_PyObject_decref(SEXP s)
 {
   PyObject* pyo = (PyObject*)R_ExternalPtrAddr(s);
   if (pyo) {
+    /* R's garbage collection can run while the GIL is released */
+    const int is_threaded = PyEval_ThreadsInitialized();
+    PyGILState_STATE gstate;
+    RPY_GIL_ENSURE(is_threaded, gstate);
     Py_DECREF(pyo);
+    RPY_GIL_RELEASE(is_threaded, gstate);
     R_ClearExternalPtr(s);
   }
 }
@@ -77,10 +82,6 @@ ExtPtrSexp_init(PySexpObject *self, PyObject *args, PyObject *kwds)
     return -1;
   }
   
-  if (rpy_has_status(RPY_R_BUSY)) {
-    PyErr_Format(PyExc_RuntimeError, "Concurrent access to R is not allowed.");
-    return -1;
-  }
   embeddedR_setlock();
 
   /*FIXME: twist here - MakeExternalPtr will "preserve" the tag */
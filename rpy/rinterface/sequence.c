@@ -20,10 +20,6 @@
 /* len(x) or object.__len__() */
 static Py_ssize_t VectorSexp_len(PySexpObject* object)
 {
-  if (rpy_has_status(RPY_R_BUSY)) {
-    PyErr_Format(PyExc_RuntimeError, "Concurrent access to R is not allowed.");
-    return -1;
-  }
   embeddedR_setlock();
 
   Py_ssize_t len;
@@ -33,12 +29,213 @@ static Py_ssize_t VectorSexp_len(PySexpObject* object)
       PyErr_Format(PyExc_ValueError, "NULL SEXP.");
       return -1;
   }
-  len = (Py_ssize_t)GET_LENGTH(sexp);
+  len = (Py_ssize_t)xlength(sexp);
 
   embeddedR_freelock();
   return len;
 }
 
+/* Python str for the R string (CHARSXP) charsxp. ASCII strings
+ * (the most common case) are copied directly into a new compact
+ * Python str. */
+static PyObject *
+RPy_CharsxpToStr(SEXP charsxp)
+{
+  const char *vs = CHAR(charsxp);
+  const R_len_t len = LENGTH(charsxp);
+  R_len_t i;
+  PyObject *res;
+  for (i = 0; i < len; i++) {
+    if ((unsigned char)vs[i] > 127) {
+      break;
+    }
+  }
+  if (i == len) {
+    res = PyUnicode_New((Py_ssize_t)len, 127);
+    if (res == NULL) {
+      return NULL;
+    }
+    memcpy(PyUnicode_1BYTE_DATA(res), vs, (size_t)len);
+    return res;
+  }
+  if (Rf_getCharCE(charsxp) == CE_UTF8) {
+    vs = translateCharUTF8(charsxp);
+  }
+  return PyUnicode_FromString(vs);
+}
+
+/* R string (CHARSXP) for the Python str pystr, or NULL (with
+ * a Python exception set) on failure. The UTF-8 representation
+ * is obtained without an intermediate bytes object. */
+static SEXP
+RPy_StrToCharsxp(PyObject *pystr)
+{
+  const char *string;
+  Py_ssize_t len;
+  if (PyUnicode_READY(pystr) == -1) {
+    return NULL;
+  }
+  if (PyUnicode_IS_COMPACT_ASCII(pystr)) {
+    string = (const char *)PyUnicode_DATA(pystr);
+    len = PyUnicode_GET_LENGTH(pystr);
+  } else {
+    string = PyUnicode_AsUTF8AndSize(pystr, &len);
+    if (string == NULL) {
+      return NULL;
+    }
+  }
+  if (len > INT_MAX || memchr(string, '\0', (size_t)len) != NULL) {
+    /* R strings cannot contain NUL: the string ends at the first one
+       (or R reports that it is too long). */
+    return Rf_mkCharCE(string, CE_UTF8);
+  }
+  return Rf_mkCharLenCE(string, (int)len, CE_UTF8);
+}
+
+/* The caches of strings are meant to be used during one pass over
+ * a vector, with the lock on R held: the CHARSXPs are then kept alive
+ * by the R vector, and the cache holds a reference to the Python str
+ * objects, so that the addresses cannot be reused for other strings. */
+#define RPY_STRCACHE_SLOT(ptr)					\
+  ((size_t)(((uintptr_t)(ptr)) >> 4) % RPY_STRCACHE_SIZE)
+
+static void
+RPy_StrCache_init(RPy_StrCache *cache)
+{
+  memset(cache, 0, sizeof(RPy_StrCache));
+}
+
+static void
+RPy_StrCache_clear(RPy_StrCache *cache)
+{
+  size_t i;
+  for (i = 0; i < RPY_STRCACHE_SIZE; i++) {
+    Py_CLEAR(cache->str[i]);
+    cache->charsxp[i] = NULL;
+  }
+}
+
+static void
+RPy_StrCache_set(RPy_StrCache *cache, size_t slot,
+		 SEXP charsxp, PyObject *pystr)
+{
+  Py_INCREF(pystr);
+  Py_XDECREF(cache->str[slot]);
+  cache->str[slot] = pystr;
+  cache->charsxp[slot] = charsxp;
+}
+
+/* Python str (new reference) for the R string charsxp,
+ * with the cache (if not NULL) looked up first. */
+static PyObject *
+RPy_StrCache_tostr(RPy_StrCache *cache, SEXP charsxp)
+{
+  PyObject *res;
+  size_t slot;
+  if (cache == NULL) {
+    return RPy_CharsxpToStr(charsxp);
+  }
+  slot = RPY_STRCACHE_SLOT(charsxp);
+  if (cache->charsxp[slot] == charsxp && cache->str[slot] != NULL) {
+    res = cache->str[slot];
+    Py_INCREF(res);
+    return res;
+  }
+  res = RPy_CharsxpToStr(charsxp);
+  if (res != NULL) {
+    RPy_StrCache_set(cache, slot, charsxp, res);
+  }
+  return res;
+}
+
+/* R string for the Python str pystr, with the cache (if not NULL)
+ * looked up first. */
+static SEXP
+RPy_StrCache_tocharsxp(RPy_StrCache *cache, PyObject *pystr)
+{
+  SEXP res;
+  size_t slot;
+  if (cache == NULL) {
+    return RPy_StrToCharsxp(pystr);
+  }
+  slot = RPY_STRCACHE_SLOT(pystr);
+  if (cache->str[slot] == pystr) {
+    return cache->charsxp[slot];
+  }
+  res = RPy_StrToCharsxp(pystr);
+  if (res != NULL) {
+    RPy_StrCache_set(cache, slot, res, pystr);
+  }
+  return res;
+}
+
+/* Python object for the item i in the R vector sexp of an atomic type
+ * (LGLSXP, INTSXP, REALSXP, CPLXSXP, RAWSXP, or STRSXP). The index is not
+ * checked, and the caller must hold the lock on R. The cache of strings
+ * strcache can be NULL. */
+static PyObject *
+VectorSexp_atomic_item(SEXP sexp, R_xlen_t i_R, RPy_StrCache *strcache)
+{
+  PyObject *res;
+  double vd;
+  int vi;
+  Rcomplex vc;
+  char *vr;
+  SEXP sexp_item;
+  switch (TYPEOF(sexp)) {
+    case REALSXP:
+      vd = (NUMERIC_POINTER(sexp))[i_R];
+      if (R_IsNA(vd)) {
+        res = NAReal_New(1);
+      } else {
+        res = PyFloat_FromDouble(vd);
+      }
+      break;
+    case INTSXP:
+      vi = INTEGER_POINTER(sexp)[i_R];
+      if (vi == NA_INTEGER) {
+        res = NAInteger_New(1);
+      } else {
+	res = PyLong_FromLong((long)vi);
+      }
+      break;
+    case LGLSXP:
+      vi = LOGICAL_POINTER(sexp)[i_R];
+      if (vi == NA_LOGICAL) {
+        res = NALogical_New(1);
+      } else {
+        RPY_PY_FROM_RBOOL(res, vi);
+      }
+      break;
+    case CPLXSXP:
+      vc = COMPLEX_POINTER(sexp)[i_R];
+      if (vc.r == NAREAL_IEEE.value && vc.i == NAREAL_IEEE.value) {
+	res = NAComplex_New(1);
+      } else {
+	res = PyComplex_FromDoubles(vc.r, vc.i);
+      }
+      break;
+    case RAWSXP:
+      vr = ((char *)RAW_POINTER(sexp)) + i_R;
+      res = PyBytes_FromStringAndSize(vr, 1);
+      break;
+    case STRSXP:
+      sexp_item = STRING_ELT(sexp, i_R);
+      if (sexp_item == NA_STRING) {
+        res = NACharacter_New(1);
+      } else {
+	res = RPy_StrCache_tostr(strcache, sexp_item);
+      }
+      break;
+    default:
+      PyErr_Format(PyExc_ValueError, "Cannot handle type %d", 
+                   TYPEOF(sexp));
+      res = NULL;
+      break;
+  }
+  return res;
+}
+
 /* a[i] or object.__getitem__(i).
 This only considers the case where 'i' is an integer.
 R can also get item on names, but that's currently exposed at a higher level
@@ -48,11 +245,7 @@ static PyObject *
 VectorSexp_item(PySexpObject* object, Py_ssize_t i)
 {
   PyObject* res;
-  R_len_t i_R, len_R;
-  if (rpy_has_status(RPY_R_BUSY)) {
-    PyErr_Format(PyExc_RuntimeError, "Concurrent access to R is not allowed.");
-    return NULL;
-  }
+  R_xlen_t i_R, len_R;
   embeddedR_setlock();
   SEXP *sexp = &(RPY_SEXP(object));
 
@@ -62,7 +255,7 @@ VectorSexp_item(PySexpObject* object, Py_ssize_t i)
     return NULL;
   }
 
-  len_R = GET_LENGTH(*sexp);
+  len_R = xlength(*sexp);
   
   if (i < 0) {
     /*FIXME: check that unit tests are covering this properly */
@@ -71,7 +264,7 @@ VectorSexp_item(PySexpObject* object, Py_ssize_t i)
 
   /* On 64bits platforms, Python is apparently able to use larger integer
    * than R for indexing. */
-  if (i >= R_LEN_T_MAX) {
+  if (i >= R_XLEN_T_MAX) {
     PyErr_Format(PyExc_IndexError, "Index value exceeds what R can handle.");
     embeddedR_freelock();
     res = NULL;
@@ -85,73 +278,21 @@ VectorSexp_item(PySexpObject* object, Py_ssize_t i)
     embeddedR_freelock();
     return res;
   }
-  if ((i >= GET_LENGTH(*sexp))) {
+  if ((i >= xlength(*sexp))) {
     PyErr_Format(PyExc_IndexError, "Index out of range.");
     res = NULL;
   }
   else {
-    double vd;
-    int vi;
-    Rcomplex vc;
-    /* Rbyte vr; */
-    char *vr;
-    const char *vs;
     SEXP tmp, sexp_item, sexp_name; /* needed by LANGSXP and LISTSXP*/
-    i_R = (R_len_t)i;
+    i_R = (R_xlen_t)i;
     switch (TYPEOF(*sexp)) {
     case REALSXP:
-      vd = (NUMERIC_POINTER(*sexp))[i_R];
-      if (R_IsNA(vd)) {
-        res = NAReal_New(1);
-      } else {
-        res = PyFloat_FromDouble(vd);
-      }
-      break;
     case INTSXP:
-      vi = INTEGER_POINTER(*sexp)[i_R];
-      if (vi == NA_INTEGER) {
-        res = NAInteger_New(1);
-      } else {
-	res = PyLong_FromLong((long)vi);
-      }
-      break;
     case LGLSXP:
-      vi = LOGICAL_POINTER(*sexp)[i_R];
-      if (vi == NA_LOGICAL) {
-        res = NALogical_New(1);
-      } else {
-        RPY_PY_FROM_RBOOL(res, vi);
-      }
-      break;
     case CPLXSXP:
-      vc = COMPLEX_POINTER(*sexp)[i_R];
-      if (vc.r == NAREAL_IEEE.value && vc.i == NAREAL_IEEE.value) {
-	res = NAComplex_New(1);
-      } else {
-	res = PyComplex_FromDoubles(vc.r, vc.i);
-      }
-      break;
     case RAWSXP:
-      vr = ((char *)RAW_POINTER(*sexp)) + i_R;
-      res = PyBytes_FromStringAndSize(vr, 1);
-      break;
     case STRSXP:
-      sexp_item = STRING_ELT(*sexp, i_R);
-      if (sexp_item == NA_STRING) {
-        res = NACharacter_New(1);
-      } else {
-	cetype_t encoding = Rf_getCharCE(sexp_item);
-	switch (encoding) {
-	case CE_UTF8:
-	  vs = translateCharUTF8(sexp_item);
-	  res = PyUnicode_FromString(vs);
-	  break;
-	default:
-	  vs = CHAR(sexp_item);
-	  res = PyUnicode_FromString(vs);
-	  break;
-	}
-      }
+      res = VectorSexp_atomic_item(*sexp, i_R, NULL);
       break;
 /*     case CHARSXP: */
       /*       FIXME: implement handling of single char (if possible ?) */
@@ -165,7 +306,7 @@ VectorSexp_item(PySexpObject* object, Py_ssize_t i)
     case LISTSXP:
       /* R-exts says that it is converted to a VECSXP when subsetted */
       //tmp = nthcdr(*sexp, i_R);
-      tmp = nthcdr(*sexp, i_R);
+      tmp = nthcdr(*sexp, (int)i_R);
       PROTECT(sexp_item = allocVector(VECSXP,1));
       SET_VECTOR_ELT(sexp_item, 0, CAR(tmp));
       PROTECT(sexp_name = allocVector(STRSXP,1));
@@ -175,7 +316,7 @@ VectorSexp_item(PySexpObject* object, Py_ssize_t i)
       UNPROTECT(2);
       break;      
     case LANGSXP:
-      sexp_item = CAR(nthcdr(*sexp, i_R));
+      sexp_item = CAR(nthcdr(*sexp, (int)i_R));
       res = (PyObject *)newPySexpObject(sexp_item);
       break;
     default:
@@ -193,12 +334,8 @@ VectorSexp_item(PySexpObject* object, Py_ssize_t i)
 static PyObject *
 VectorSexp_slice(PySexpObject* object, Py_ssize_t ilow, Py_ssize_t ihigh)
 {
-  R_len_t len_R;
+  R_xlen_t len_R;
 
-  if (rpy_has_status(RPY_R_BUSY)) {
-    PyErr_Format(PyExc_RuntimeError, "Concurrent access to R is not allowed.");
-    return NULL;
-  }
   embeddedR_setlock();
   SEXP *sexp = &(RPY_SEXP(object));
   SEXP res_sexp, tmp, tmp2;
@@ -209,7 +346,7 @@ VectorSexp_slice(PySexpObject* object, Py_ssize_t ilow, Py_ssize_t ihigh)
     return NULL;
   }
 
-  len_R = GET_LENGTH(*sexp);
+  len_R = xlength(*sexp);
 
   if (ilow < 0)
     ilow = 0;
@@ -222,7 +359,7 @@ VectorSexp_slice(PySexpObject* object, Py_ssize_t ilow, Py_ssize_t ihigh)
 
   /* On 64bits, Python is apparently able to use larger integer
    * than R for indexing. */
-  if ((ilow >= (Py_ssize_t)R_LEN_T_MAX) | (ihigh >= (Py_ssize_t)R_LEN_T_MAX)) {
+  if ((ilow >= (Py_ssize_t)R_XLEN_T_MAX) | (ihigh >= (Py_ssize_t)R_XLEN_T_MAX)) {
     PyErr_Format(PyExc_IndexError, 
                  "Index values in the slice exceed what R can handle.");
     embeddedR_freelock();
@@ -235,7 +372,7 @@ VectorSexp_slice(PySexpObject* object, Py_ssize_t ilow, Py_ssize_t ihigh)
     embeddedR_freelock();
     return NULL;
   }
-  if ((ilow > GET_LENGTH(*sexp)) | (ihigh > GET_LENGTH(*sexp))) {
+  if ((ilow > xlength(*sexp)) | (ihigh > xlength(*sexp))) {
     PyErr_Format(PyExc_IndexError, "Index out of range.");
     return NULL;
   } else {
@@ -246,8 +383,8 @@ VectorSexp_slice(PySexpObject* object, Py_ssize_t ilow, Py_ssize_t ihigh)
       */
       ihigh = ilow;
     }
-    R_len_t slice_len = ihigh-ilow;
-    R_len_t slice_i;
+    R_xlen_t slice_len = ihigh-ilow;
+    R_xlen_t slice_i;
     //const char *vs;
     //SEXP tmp, sexp_item; /* tmp and sexp_item needed for case LANGSXP */
     switch (TYPEOF(*sexp)) {
@@ -347,7 +484,7 @@ VectorSexp_slice(PySexpObject* object, Py_ssize_t ilow, Py_ssize_t ihigh)
 static int
 VectorSexp_ass_item(PySexpObject* object, Py_ssize_t i, PyObject* val)
 {
-  R_len_t i_R, len_R;
+  R_xlen_t i_R, len_R;
   int self_typeof;
 
   if (val == NULL) {
@@ -356,13 +493,13 @@ VectorSexp_ass_item(PySexpObject* object, Py_ssize_t i, PyObject* val)
   }
 
   /* Check for 64 bits platforms */
-  if (i >= R_LEN_T_MAX) {
+  if (i >= R_XLEN_T_MAX) {
     PyErr_Format(PyExc_IndexError, "Index value exceeds what R can handle.");
     return -1;
   }
 
   SEXP *sexp = &(RPY_SEXP(object));
-  len_R = GET_LENGTH(*sexp);
+  len_R = xlength(*sexp);
   
   if (i < 0) {
     /* FIXME: Is this valid for Python < 3 ?*/
@@ -409,7 +546,8 @@ VectorSexp_ass_item(PySexpObject* object, Py_ssize_t i, PyObject* val)
   }
 
   SEXP sexp_copy;
-  i_R = (R_len_t)i;
+  i_R = (R_xlen_t)i;
+  int is_locked = embeddedR_setlock_nested();
   switch (self_typeof) {
   case REALSXP:
     (NUMERIC_POINTER(*sexp))[i_R] = (NUMERIC_POINTER(*sexp_val))[0];
@@ -435,14 +573,16 @@ VectorSexp_ass_item(PySexpObject* object, Py_ssize_t i, PyObject* val)
     UNPROTECT(1);
     break;
   case LANGSXP:
-    SETCAR(nthcdr(*sexp, i_R), *sexp_val);
+    SETCAR(nthcdr(*sexp, (int)i_R), *sexp_val);
     break;
   default:
     PyErr_Format(PyExc_ValueError, "Cannot handle typeof '%d'", 
                  self_typeof);
+    embeddedR_freelock_nested(is_locked);
     return -1;
     break;
   }
+  embeddedR_freelock_nested(is_locked);
   return 0;
 }
 
@@ -450,12 +590,8 @@ VectorSexp_ass_item(PySexpObject* object, Py_ssize_t i, PyObject* val)
 static int
 VectorSexp_ass_slice(PySexpObject* object, Py_ssize_t ilow, Py_ssize_t ihigh, PyObject *val)
 {
-  R_len_t len_R;
+  R_xlen_t len_R;
 
-  if (rpy_has_status(RPY_R_BUSY)) {
-    PyErr_Format(PyExc_RuntimeError, "Concurrent access to R is not allowed.");
-    return -1;
-  }
   embeddedR_setlock();
 
   if (! PyObject_TypeCheck(val, &Sexp_Type)) {
@@ -466,7 +602,7 @@ VectorSexp_ass_slice(PySexpObject* object, Py_ssize_t ilow, Py_ssize_t ihigh, Py
   }
 
   SEXP *sexp = &(RPY_SEXP(object));
-  len_R = GET_LENGTH(*sexp);
+  len_R = xlength(*sexp);
 
   if (! sexp) {
     PyErr_Format(PyExc_ValueError, "NULL SEXP.");
@@ -476,7 +612,7 @@ VectorSexp_ass_slice(PySexpObject* object, Py_ssize_t ilow, Py_ssize_t ihigh, Py
   
   /* On 64bits, Python is apparently able to use larger integer
    * than R for indexing. */
-  if ((ilow >= R_LEN_T_MAX) | (ihigh >= R_LEN_T_MAX)) {
+  if ((ilow >= R_XLEN_T_MAX) | (ihigh >= R_XLEN_T_MAX)) {
     PyErr_Format(PyExc_IndexError, 
                  "Index values in the slice exceed what R can handle.");
     embeddedR_freelock();
@@ -489,7 +625,7 @@ VectorSexp_ass_slice(PySexpObject* object, Py_ssize_t ilow, Py_ssize_t ihigh, Py
     embeddedR_freelock();
     return -1;
   }
-  if ((ilow > GET_LENGTH(*sexp)) | (ihigh > GET_LENGTH(*sexp))) {
+  if ((ilow > xlength(*sexp)) | (ihigh > xlength(*sexp))) {
     PyErr_Format(PyExc_IndexError, "Index out of range.");
     return -1;
   } else {
@@ -501,8 +637,8 @@ VectorSexp_ass_slice(PySexpObject* object, Py_ssize_t ilow, Py_ssize_t ihigh, Py
       ihigh = ilow;
     }
 
-    R_len_t slice_len = ihigh-ilow;
-    R_len_t slice_i;
+    R_xlen_t slice_len = ihigh-ilow;
+    R_xlen_t slice_i;
 
     SEXP sexp_val = RPY_SEXP((PySexpObject *)val);
     if (! sexp_val) {
@@ -511,7 +647,7 @@ VectorSexp_ass_slice(PySexpObject* object, Py_ssize_t ilow, Py_ssize_t ihigh, Py
       return -1;
     }
 
-    if (slice_len != GET_LENGTH(sexp_val)) {
+    if (slice_len != xlength(sexp_val)) {
       PyErr_Format(PyExc_ValueError, "The length of the replacement value differs from the length of the slice.");
       embeddedR_freelock();
       return -1;
@@ -583,6 +719,127 @@ static PySequenceMethods VectorSexp_sequenceMethods = {
   0                               /* sq_inplace_repeat */
 };
 
+/* a[indices], with 'indices' a Python object exporting the buffer
+ * protocol with integers (e.g., an array.array or a numpy array):
+ * the R vector with the items at these (zero-based) indices. */
+static PyObject *
+VectorSexp_gather(PySexpObject *object, PyObject *indices)
+{
+  Py_buffer view;
+  RPy_BufferKind kind;
+  Py_ssize_t ii, n, stride;
+  const char *src;
+  R_xlen_t len_R, *index;
+  SEXP sexp, res_sexp;
+  PyObject *res;
+
+  if (PyObject_GetBuffer(indices, &view, PyBUF_STRIDES | PyBUF_FORMAT) == -1) {
+    return NULL;
+  }
+  kind = rpy_buffer_kind(view.format, view.itemsize);
+  if (view.ndim != 1 || kind < RPY_BUF_INT8 || kind > RPY_BUF_UINT64) {
+    PyErr_Format(PyExc_TypeError,
+		 "Indexing with a buffer requires a one-dimensional buffer of integers.");
+    PyBuffer_Release(&view);
+    return NULL;
+  }
+
+  embeddedR_setlock();
+  sexp = RPY_SEXP(object);
+  if (! sexp) {
+    PyErr_Format(PyExc_ValueError, "NULL SEXP.");
+    embeddedR_freelock();
+    PyBuffer_Release(&view);
+    return NULL;
+  }
+  len_R = xlength(sexp);
+
+  n = view.shape[0];
+  stride = view.strides[0];
+  src = (const char *)view.buf;
+  index = (R_xlen_t *)PyMem_Malloc(sizeof(R_xlen_t) * (n > 0 ? n : 1));
+  if (index == NULL) {
+    embeddedR_freelock();
+    PyBuffer_Release(&view);
+    return PyErr_NoMemory();
+  }
+  /* Negative indices are from the end of the vector, as for Python
+   * sequences (out-of-range unsigned integers become -1). */
+  RPY_BUFFER_RUN_ALLKINDS({ R_xlen_t v = (R_xlen_t)value;
+			    if (v < 0) v += len_R;
+			    index[ii] = v; },
+			  index[ii] = (value > (uint64_t)R_XLEN_T_MAX) ?
+			  -1 : (R_xlen_t)value,
+			  index[ii] = -1)
+  PyBuffer_Release(&view);
+  for (ii = 0; ii < n; ii++) {
+    if (index[ii] < 0 || index[ii] >= len_R) {
+      PyErr_Format(PyExc_IndexError, "Index out of range (item %zd).", ii);
+      PyMem_Free(index);
+      embeddedR_freelock();
+      return NULL;
+    }
+  }
+
+  switch (TYPEOF(sexp)) {
+  case REALSXP:
+    PROTECT(res_sexp = allocVector(REALSXP, n));
+    for (ii = 0; ii < n; ii++) {
+      NUMERIC_POINTER(res_sexp)[ii] = NUMERIC_POINTER(sexp)[index[ii]];
+    }
+    break;
+  case INTSXP:
+    PROTECT(res_sexp = allocVector(INTSXP, n));
+    for (ii = 0; ii < n; ii++) {
+      INTEGER_POINTER(res_sexp)[ii] = INTEGER_POINTER(sexp)[index[ii]];
+    }
+    break;
+  case LGLSXP:
+    PROTECT(res_sexp = allocVector(LGLSXP, n));
+    for (ii = 0; ii < n; ii++) {
+      LOGICAL_POINTER(res_sexp)[ii] = LOGICAL_POINTER(sexp)[index[ii]];
+    }
+    break;
+  case CPLXSXP:
+    PROTECT(res_sexp = allocVector(CPLXSXP, n));
+    for (ii = 0; ii < n; ii++) {
+      COMPLEX_POINTER(res_sexp)[ii] = COMPLEX_POINTER(sexp)[index[ii]];
+    }
+    break;
+  case RAWSXP:
+    PROTECT(res_sexp = allocVector(RAWSXP, n));
+    for (ii = 0; ii < n; ii++) {
+      RAW_POINTER(res_sexp)[ii] = RAW_POINTER(sexp)[index[ii]];
+    }
+    break;
+  case STRSXP:
+    PROTECT(res_sexp = allocVector(STRSXP, n));
+    for (ii = 0; ii < n; ii++) {
+      SET_STRING_ELT(res_sexp, ii, STRING_ELT(sexp, index[ii]));
+    }
+    break;
+  case VECSXP:
+  case EXPRSXP:
+    PROTECT(res_sexp = allocVector(VECSXP, n));
+    for (ii = 0; ii < n; ii++) {
+      SET_VECTOR_ELT(res_sexp, ii, VECTOR_ELT(sexp, index[ii]));
+    }
+    break;
+  default:
+    PyErr_Format(PyExc_TypeError, 
+		 "Indexing with a buffer is not possible for R type %d.",
+		 TYPEOF(sexp));
+    PyMem_Free(index);
+    embeddedR_freelock();
+    return NULL;
+  }
+  PyMem_Free(index);
+  res = (PyObject *)newPySexpObject(res_sexp);
+  UNPROTECT(1);
+  embeddedR_freelock();
+  return res;
+}
+
 /* generic a[i] for Python3 */
 static PyObject*
 VectorSexp_subscript(PySexpObject *object, PyObject* item)
@@ -628,6 +885,10 @@ VectorSexp_subscript(PySexpObject *object, PyObject* item)
       }
     }
   }
+  else if (PyObject_CheckBuffer(item) && 
+	   ! (PyBytes_Check(item) || PyByteArray_Check(item))) {
+    return VectorSexp_gather(object, item);
+  }
   else {
     PyErr_Format(PyExc_TypeError,
 		 "SexpVector indices must be integers, not %.200s",
@@ -681,6 +942,182 @@ static PyMappingMethods VectorSexp_as_mapping = {
 };
 
 
+/* Iterator over the items of an R vector. The items are made
+ * by chunks of RPY_ITER_CHUNKSIZE, with the lock on R taken once for
+ * each chunk. */
+typedef struct {
+  PyObject_HEAD
+  PySexpObject *vector; /* NULL once the iterator is exhausted */
+  R_xlen_t pos; /* index of the next item to make */
+  Py_ssize_t chunk_i, chunk_n;
+  PyObject *chunk[RPY_ITER_CHUNKSIZE];
+} VectorSexpIterObject;
+
+static PyTypeObject VectorSexpIter_Type;
+
+static void
+VectorSexpIter_dealloc(VectorSexpIterObject *self)
+{
+  Py_ssize_t i;
+  for (i = self->chunk_i; i < self->chunk_n; i++) {
+    Py_DECREF(self->chunk[i]);
+  }
+  Py_XDECREF(self->vector);
+  PyObject_Del(self);
+}
+
+static PyObject *
+VectorSexpIter_next(VectorSexpIterObject *self)
+{
+  if (self->chunk_i < self->chunk_n) {
+    /* the reference is handed over to the caller */
+    return self->chunk[self->chunk_i++];
+  }
+  if (self->vector == NULL) {
+    return NULL;
+  }
+  embeddedR_setlock();
+  SEXP sexp = RPY_SEXP(self->vector);
+  if (! sexp) {
+    PyErr_Format(PyExc_ValueError, "NULL SEXP.");
+    embeddedR_freelock();
+    return NULL;
+  }
+  /* the length is checked for each chunk because the R object
+   * for the vector can be replaced (through __sexp__) */
+  R_xlen_t len_R = xlength(sexp);
+  Py_ssize_t n = 0;
+  PyObject *item;
+  int is_atomic = TYPEOF(sexp) != VECSXP && TYPEOF(sexp) != EXPRSXP;
+  /* repeated strings in the chunk are the same Python str */
+  RPy_StrCache cache;
+  RPy_StrCache *strcache = NULL;
+  if (TYPEOF(sexp) == STRSXP) {
+    strcache = &cache;
+    RPy_StrCache_init(strcache);
+  }
+  while (n < RPY_ITER_CHUNKSIZE && self->pos < len_R) {
+    if (is_atomic) {
+      item = VectorSexp_atomic_item(sexp, self->pos, strcache);
+    } else {
+      item = (PyObject *)newPySexpObject(VECTOR_ELT(sexp, self->pos));
+    }
+    if (item == NULL) {
+      if (strcache != NULL) {
+	RPy_StrCache_clear(strcache);
+      }
+      embeddedR_freelock();
+      while (n > 0) {
+	Py_DECREF(self->chunk[--n]);
+      }
+      return NULL;
+    }
+    self->chunk[n++] = item;
+    self->pos++;
+  }
+  if (strcache != NULL) {
+    RPy_StrCache_clear(strcache);
+  }
+  embeddedR_freelock();
+  if (n == 0) {
+    Py_CLEAR(self->vector);
+    return NULL;
+  }
+  self->chunk_i = 1;
+  self->chunk_n = n;
+  return self->chunk[0];
+}
+
+static PyTypeObject VectorSexpIter_Type = {
+        /* The ob_type field must be initialized in the module init function
+         * to be portable to Windows without using C++. */
+	PyVarObject_HEAD_INIT(NULL, 0)
+        "rpy2.rinterface.SexpVectorIterator",        /*tp_name*/
+        sizeof(VectorSexpIterObject),   /*tp_basicsize*/
+        0,                      /*tp_itemsize*/
+        /* methods */
+        (destructor)VectorSexpIter_dealloc, /*tp_dealloc*/
+        0,                      /*tp_print*/
+        0,                      /*tp_getattr*/
+        0,                      /*tp_setattr*/
+        0,                      /*tp_compare*/
+        0,                      /*tp_repr*/
+        0,                      /*tp_as_number*/
+        0,                      /*tp_as_sequence*/
+        0,                      /*tp_as_mapping*/
+        0,                      /*tp_hash*/
+        0,              /*tp_call*/
+        0,              /*tp_str*/
+        PyObject_GenericGetAttr, /*tp_getattro*/
+        0,                      /*tp_setattro*/
+        0,                      /*tp_as_buffer*/
+        Py_TPFLAGS_DEFAULT,  /*tp_flags*/
+        0,                      /*tp_doc*/
+        0,                      /*tp_traverse*/
+        0,                      /*tp_clear*/
+        0,                      /*tp_richcompare*/
+        0,                      /*tp_weaklistoffset*/
+        PyObject_SelfIter,      /*tp_iter*/
+        (iternextfunc)VectorSexpIter_next, /*tp_iternext*/
+        0,           /*tp_methods*/
+        0,                      /*tp_members*/
+        0,            /*tp_getset*/
+        0,             /*tp_base*/
+        0,                      /*tp_dict*/
+        0,                      /*tp_descr_get*/
+        0,                      /*tp_descr_set*/
+        0,                      /*tp_dictoffset*/
+        0,                      /*tp_init*/
+        0,                      /*tp_alloc*/
+        0,               /*tp_new*/
+        0,                      /*tp_free*/
+        0                      /*tp_is_gc*/
+};
+
+/* iter(a) or object.__iter__() */
+static PyObject *
+VectorSexp_iter(PySexpObject *object)
+{
+  SEXP sexp = RPY_SEXP(object);
+  if (! sexp) {
+    PyErr_Format(PyExc_ValueError, "NULL SEXP.");
+    return NULL;
+  }
+  switch (TYPEOF(sexp)) {
+  case REALSXP:
+  case INTSXP:
+  case LGLSXP:
+  case CPLXSXP:
+  case RAWSXP:
+  case STRSXP:
+    break;
+  case VECSXP:
+  case EXPRSXP:
+    /* Subclasses can make their own items out of the R objects in
+     * the vector (e.g., with conversion): keep using their __getitem__. */
+    if (Py_TYPE(object)->tp_as_mapping == NULL ||
+	Py_TYPE(object)->tp_as_mapping->mp_subscript != 
+	(binaryfunc)VectorSexp_subscript) {
+      return PySeqIter_New((PyObject *)object);
+    }
+    break;
+  default:
+    return PySeqIter_New((PyObject *)object);
+  }
+  VectorSexpIterObject *it = PyObject_New(VectorSexpIterObject,
+					  &VectorSexpIter_Type);
+  if (it == NULL) {
+    return NULL;
+  }
+  Py_INCREF(object);
+  it->vector = object;
+  it->pos = 0;
+  it->chunk_i = 0;
+  it->chunk_n = 0;
+  return (PyObject *)it;
+}
+
+
 
 static PyObject *
 VectorSexp_index(PySexpObject *self, PyObject *args)
@@ -695,23 +1132,23 @@ VectorSexp_index(PySexpObject *self, PyObject *args)
     return NULL;
   }
   start = 0;
-  stop = (Py_ssize_t)(GET_LENGTH(sexp));
+  stop = (Py_ssize_t)(xlength(sexp));
 
   if (!PyArg_ParseTuple(args, "O|O&O&:index", &v,
 			_PyEval_SliceIndex, &start,
 			_PyEval_SliceIndex, &stop))
     return NULL;
   if (start < 0) {
-    start += (Py_ssize_t)(GET_LENGTH(sexp));
+    start += (Py_ssize_t)(xlength(sexp));
     if (start < 0)
       start = 0;
   }
   if (stop < 0) {
-    stop += (Py_ssize_t)(GET_LENGTH(sexp));
+    stop += (Py_ssize_t)(xlength(sexp));
     if (stop < 0)
       stop = 0;
   }
-  for (i = start; i < stop && i < (Py_ssize_t)(GET_LENGTH(sexp)); i++) {
+  for (i = start; i < stop && i < (Py_ssize_t)(xlength(sexp)); i++) {
     item = VectorSexp_item(self, i);
     int cmp = PyObject_RichCompareBool(item, v, Py_EQ);
     Py_DECREF(item);
@@ -729,8 +1166,188 @@ PyDoc_STRVAR(VectorSexp_index_doc,
              "V.index(value, [start, [stop]]) -> integer -- return first index of value."
              "Raises ValueError if the value is not present.");
 
+static PyObject *
+VectorSexp_tolist(PySexpObject *self, PyObject *args, PyObject *kwds)
+{
+  Py_ssize_t start = 0;
+  Py_ssize_t stop = PY_SSIZE_T_MAX;
+  Py_ssize_t i;
+  int is_atomic;
+  PyObject *res, *item;
+  static char *kwlist[] = {"start", "stop", NULL};
+  if (! PyArg_ParseTupleAndKeywords(args, kwds, "|nn", 
+				    kwlist,
+				    &start, &stop)) {
+    return NULL;
+  }
+
+  embeddedR_setlock();
+  SEXP sexp = RPY_SEXP(self);
+  if (! sexp) {
+    PyErr_Format(PyExc_ValueError, "NULL SEXP.");
+    embeddedR_freelock();
+    return NULL;
+  }
+  switch (TYPEOF(sexp)) {
+  case REALSXP:
+  case INTSXP:
+  case LGLSXP:
+  case CPLXSXP:
+  case RAWSXP:
+  case STRSXP:
+    is_atomic = 1;
+    break;
+  case VECSXP:
+  case EXPRSXP:
+    is_atomic = 0;
+    break;
+  default:
+    PyErr_Format(PyExc_TypeError, "Cannot make a list from R type %d.",
+		 TYPEOF(sexp));
+    embeddedR_freelock();
+    return NULL;
+  }
+
+  /* start and stop as for slices of Python lists */
+  Py_ssize_t len = (Py_ssize_t)xlength(sexp);
+  if (start < 0) {
+    start += len;
+    if (start < 0)
+      start = 0;
+  } else if (start > len) {
+    start = len;
+  }
+  if (stop < 0) {
+    stop += len;
+    if (stop < 0)
+      stop = 0;
+  } else if (stop > len) {
+    stop = len;
+  }
+  if (stop < start) {
+    stop = start;
+  }
+
+  res = PyList_New(stop - start);
+  if (res == NULL) {
+    embeddedR_freelock();
+    return NULL;
+  }
+  /* repeated strings are the same Python str */
+  RPy_StrCache cache;
+  RPy_StrCache *strcache = NULL;
+  if (TYPEOF(sexp) == STRSXP) {
+    strcache = &cache;
+    RPy_StrCache_init(strcache);
+  }
+  for (i = start; i < stop; i++) {
+    if (is_atomic) {
+      item = VectorSexp_atomic_item(sexp, i, strcache);
+    } else {
+      item = (PyObject *)newPySexpObject(VECTOR_ELT(sexp, i));
+    }
+    if (item == NULL) {
+      Py_DECREF(res);
+      res = NULL;
+      break;
+    }
+    PyList_SET_ITEM(res, i - start, item);
+  }
+  if (strcache != NULL) {
+    RPy_StrCache_clear(strcache);
+  }
+  embeddedR_freelock();
+  return res;
+}
+
+PyDoc_STRVAR(VectorSexp_tolist_doc,
+             "V.tolist(start=0, stop=len(V)) -> list\n\n"
+	     "Return a list with the items from start to stop (excluded)"
+	     " in the vector, made in one pass over the R vector.");
+
+static PyObject *
+VectorSexp_to_array(PySexpObject *self, PyObject *args, PyObject *kwds)
+{
+  PyObject *typecode = Py_None;
+  PyObject *array_module, *res, *tmp;
+  const char *native;
+  static char *kwlist[] = {"typecode", NULL};
+  if (! PyArg_ParseTupleAndKeywords(args, kwds, "|O", 
+				    kwlist,
+				    &typecode)) {
+    return NULL;
+  }
+  SEXP sexp = RPY_SEXP(self);
+  if (! sexp) {
+    PyErr_Format(PyExc_ValueError, "NULL SEXP.");
+    return NULL;
+  }
+  /* type codes for the array.array with the same items as in R */
+  switch (TYPEOF(sexp)) {
+  case REALSXP:
+    native = "d";
+    break;
+  case INTSXP:
+  case LGLSXP:
+    native = "i";
+    break;
+  case RAWSXP:
+    native = "B";
+    break;
+  default:
+    PyErr_Format(PyExc_TypeError, 
+		 "Cannot make an array.array from R type %d.",
+		 TYPEOF(sexp));
+    return NULL;
+  }
+
+  array_module = PyImport_ImportModule("array");
+  if (array_module == NULL) {
+    return NULL;
+  }
+  if (typecode == Py_None ||
+      (PyUnicode_Check(typecode) && 
+       PyUnicode_CompareWithASCIIString(typecode, native) == 0)) {
+    /* the data are copied at once from the R vector (buffer protocol) */
+    res = PyObject_CallMethod(array_module, "array", "s", native);
+    if (res != NULL) {
+      embeddedR_setlock();
+      tmp = PyObject_CallMethod(res, "frombytes", "O", (PyObject *)self);
+      embeddedR_freelock();
+      if (tmp == NULL) {
+	Py_CLEAR(res);
+      }
+      Py_XDECREF(tmp);
+    }
+  } else {
+    /* conversion to an other type is left to array.array */
+    tmp = PyObject_CallMethod((PyObject *)self, "tolist", NULL);
+    if (tmp == NULL) {
+      res = NULL;
+    } else {
+      res = PyObject_CallMethod(array_module, "array", "OO", typecode, tmp);
+      Py_DECREF(tmp);
+    }
+  }
+  Py_DECREF(array_module);
+  return res;
+}
+
+PyDoc_STRVAR(VectorSexp_to_array_doc,
+             "V.to_array(typecode=None) -> array.array\n\n"
+	     "Return an array.array with the items in the vector"
+	     " (of type REALSXP, INTSXP, LGLSXP, or RAWSXP)."
+	     " Without typecode, the array has the same C type as R ('d', 'i',"
+	     " or 'B') and the items are copied at once. Missing values"
+	     " are the values R uses to represent them.");
+
+
 static PyMethodDef VectorSexp_methods[] = {
   {"index", (PyCFunction)VectorSexp_index, METH_VARARGS, VectorSexp_index_doc},
+  {"tolist", (PyCFunction)VectorSexp_tolist, METH_VARARGS | METH_KEYWORDS,
+   VectorSexp_tolist_doc},
+  {"to_array", (PyCFunction)VectorSexp_to_array, METH_VARARGS | METH_KEYWORDS,
+   VectorSexp_to_array_doc},
   {NULL, NULL}
 };
   
@@ -785,7 +1402,7 @@ static PyTypeObject VectorSexp_Type = {
         0,                      /*tp_clear*/
         0,                      /*tp_richcompare*/
         0,                      /*tp_weaklistoffset*/
-        0,                      /*tp_iter*/
+        (getiterfunc)VectorSexp_iter, /*tp_iter*/
         0,                      /*tp_iternext*/
         VectorSexp_methods,           /*tp_methods*/
         0,                      /*tp_members*/
@@ -829,10 +1446,6 @@ VectorSexp_init(PyObject *self, PyObject *args, PyObject *kwds)
     return -1;
   }
 
-  if (rpy_has_status(RPY_R_BUSY)) {
-    PyErr_Format(PyExc_RuntimeError, "Concurrent access to R is not allowed.");
-    return -1;
-  }
   embeddedR_setlock();
 
   if (PyObject_IsInstance(object, 
@@ -913,10 +1526,6 @@ VectorSexp_init_private(PyObject *self, PyObject *args, PyObject *kwds,
     return -1;
   }
 
-  if (rpy_has_status(RPY_R_BUSY)) {
-    PyErr_Format(PyExc_RuntimeError, "Concurrent access to R is not allowed.");
-    return -1;
-  }
   embeddedR_setlock();
   SEXP sexp = R_NilValue;
   if (PyObject_IsInstance(object, 
@@ -1065,6 +1674,14 @@ RPy_SeqToINTSXP(PyObject *object, SEXP *sexpp)
   PyObject *seq_object, *item, *item_tmp;
   SEXP new_sexp;
  
+  /* Objects exporting a buffer of compatible items (array.array,
+   * memoryview, ...) are copied in one block.
+   */
+  int status = RPy_BufferToSEXP(object, INTSXP, RPY_BUFFER_STRICT, sexpp);
+  if (status != 1) {
+    return status;
+  }
+
   seq_object = PySequence_Fast(object,
 			       "Cannot create R object from non-sequence object.");
   if (! seq_object) {
@@ -1073,7 +1690,7 @@ RPy_SeqToINTSXP(PyObject *object, SEXP *sexpp)
 
   const Py_ssize_t length = PySequence_Fast_GET_SIZE(seq_object);
 
-  if (length > R_LEN_T_MAX) {
+  if (length > R_XLEN_T_MAX) {
     PyErr_Format(PyExc_ValueError,
 		 "The Python sequence is longer than the longuest possible vector in R");
     Py_XDECREF(seq_object);
@@ -1083,9 +1700,6 @@ RPy_SeqToINTSXP(PyObject *object, SEXP *sexpp)
   PROTECT(new_sexp = NEW_INTEGER(length));
   int *integer_ptr = INTEGER(new_sexp);
 
-  /*FIXME: Optimization possible for array.array by using memcpy().
-   * With Python >= 2.7, this could be extended to memoryviews.
-   */
   for (ii = 0; ii < length; ++ii) {
     item = PySequence_Fast_GET_ITEM(seq_object, ii);
     item_tmp = PyNumber_Long(item);
@@ -1133,9 +1747,10 @@ RPy_IterToINTSXP(PyObject *object, const Py_ssize_t length, SEXP *sexpp)
   SEXP new_sexp;
 
 
-  if (length > R_LEN_T_MAX) {
+  if (length > R_XLEN_T_MAX) {
     PyErr_Format(PyExc_ValueError,
 		 "The length exceeds what the longuest possible R vector can be.");
+    return -1;
   }
 
   PROTECT(new_sexp = NEW_INTEGER(length));
@@ -1286,6 +1901,14 @@ RPy_SeqToREALSXP(PyObject *object, SEXP *sexpp)
   PyObject *seq_object, *item, *item_tmp;
   SEXP new_sexp;
  
+  /* Objects exporting a buffer of compatible items (array.array,
+   * memoryview, ...) are copied in one block.
+   */
+  int status = RPy_BufferToSEXP(object, REALSXP, RPY_BUFFER_STRICT, sexpp);
+  if (status != 1) {
+    return status;
+  }
+
   seq_object = PySequence_Fast(object,
 			       "Cannot create R object from non-sequence object.");
   if (! seq_object) {
@@ -1294,7 +1917,7 @@ RPy_SeqToREALSXP(PyObject *object, SEXP *sexpp)
 
   const Py_ssize_t length = PySequence_Fast_GET_SIZE(seq_object);
 
-  if (length > R_LEN_T_MAX) {
+  if (length > R_XLEN_T_MAX) {
     PyErr_Format(PyExc_ValueError,
 		 "The Python sequence is longer than the longuest possible vector in R");
     Py_XDECREF(seq_object);
@@ -1303,9 +1926,6 @@ RPy_SeqToREALSXP(PyObject *object, SEXP *sexpp)
 
   PROTECT(new_sexp = NEW_NUMERIC(length));
   double *double_ptr = NUMERIC_POINTER(new_sexp);
-  /*FIXME: Optimization possible for array.array by using memcpy().
-   * With Python >= 2.7, this could be extended to memoryviews.
-   */
   for (ii = 0; ii < length; ++ii) {
     item = PySequence_Fast_GET_ITEM(seq_object, ii);
     item_tmp = PyNumber_Float(item);
@@ -1341,9 +1961,10 @@ RPy_IterToREALSXP(PyObject *object, Py_ssize_t length, SEXP *sexpp)
   PyObject *item, *item_tmp;
   SEXP new_sexp;
  
-  if (length > R_LEN_T_MAX) {
+  if (length > R_XLEN_T_MAX) {
     PyErr_Format(PyExc_ValueError,
 		 "The Python sequence is longer than the longuest possible vector in R");
+    return -1;
   }
   
   PROTECT(new_sexp = NEW_NUMERIC(length));
@@ -1479,6 +2100,8 @@ RPy_SeqToSTRSXP(PyObject *object, SEXP *sexpp)
   Py_ssize_t ii;
   PyObject *seq_object, *item, *item_tmp;
   SEXP new_sexp, str_R;
+  /* repeated Python str objects give the same R string at once */
+  RPy_StrCache strcache;
  
   seq_object = PySequence_Fast(object,
 			       "Cannot create R object from non-sequence object.");
@@ -1488,7 +2111,7 @@ RPy_SeqToSTRSXP(PyObject *object, SEXP *sexpp)
 
   const Py_ssize_t length = PySequence_Fast_GET_SIZE(seq_object);
 
-  if (length > R_LEN_T_MAX) {
+  if (length > R_XLEN_T_MAX) {
     PyErr_Format(PyExc_ValueError,
 		 "The Python sequence is longer than the longuest possible vector in R");
     Py_XDECREF(seq_object);
@@ -1496,6 +2119,7 @@ RPy_SeqToSTRSXP(PyObject *object, SEXP *sexpp)
   }
 
   PROTECT(new_sexp = NEW_CHARACTER(length));
+  RPy_StrCache_init(&strcache);
 
   for (ii = 0; ii < length; ++ii) {
     item = PySequence_Fast_GET_ITEM(seq_object, ii);
@@ -1505,50 +2129,46 @@ RPy_SeqToSTRSXP(PyObject *object, SEXP *sexpp)
       continue;
     }
     
-    /* Only difference with Python < 3.1 is that PyString case is dropped. 
-       Technically a macro would avoid code duplication.
-    */
     if (PyUnicode_Check(item)) {
-      item_tmp = PyUnicode_AsUTF8String(item);
-      if (item_tmp == NULL) {
+      str_R = RPy_StrCache_tocharsxp(&strcache, item);
+      if (str_R == NULL) {
 	UNPROTECT(1);
+	RPy_StrCache_clear(&strcache);
 	PyErr_Format(PyExc_ValueError,
 		     "Error raised by codec for element %zd.",
 		     ii);
 	Py_XDECREF(seq_object);
 	return -1;	
       }
-      const char *string = PyBytes_AsString(item_tmp);
-      str_R = Rf_mkCharCE(string, CE_UTF8);
     }
     else {
       /* Last option: try to call str() on the object. */
       item_tmp = PyObject_Str(item);
       if (item_tmp == NULL) {
 	UNPROTECT(1);
+	RPy_StrCache_clear(&strcache);
 	PyErr_Format(PyExc_ValueError,
 		     "Error raised when calling str() for element %zd.",
 		     ii);
 	Py_XDECREF(seq_object);
 	return -1;	
       }
-      PyObject *item_tmp2 = PyUnicode_AsUTF8String(item_tmp);
-      if (item_tmp2 == NULL) {
+      str_R = RPy_StrToCharsxp(item_tmp);
+      Py_DECREF(item_tmp);
+      if (str_R == NULL) {
 	UNPROTECT(1);
+	RPy_StrCache_clear(&strcache);
 	PyErr_Format(PyExc_ValueError,
 		     "Error raised by codec for str(element %zd).",
 		     ii);
 	Py_XDECREF(seq_object);
 	return -1;	
       }
-      const char *string = PyBytes_AsString(item_tmp2);
-      str_R = Rf_mkCharCE(string, CE_UTF8);
-      Py_DECREF(item_tmp2);
     }
     
     SET_STRING_ELT(new_sexp, ii, str_R);
-    Py_XDECREF(item_tmp);
   }
+  RPy_StrCache_clear(&strcache);
   UNPROTECT(1);
   *sexpp = new_sexp;
   Py_XDECREF(seq_object);
@@ -1654,6 +2274,14 @@ RPy_SeqToLGLSXP(PyObject *object, SEXP *sexpp)
   PyObject *seq_object, *item;
   SEXP new_sexp;
  
+  /* Objects exporting a buffer of compatible items (array.array,
+   * memoryview, ...) are copied in one block.
+   */
+  int status = RPy_BufferToSEXP(object, LGLSXP, RPY_BUFFER_STRICT, sexpp);
+  if (status != 1) {
+    return status;
+  }
+
   seq_object = PySequence_Fast(object,
 			       "Cannot create R object from non-sequence object.");
   if (! seq_object) {
@@ -1662,7 +2290,7 @@ RPy_SeqToLGLSXP(PyObject *object, SEXP *sexpp)
 
   const Py_ssize_t length = PySequence_Fast_GET_SIZE(seq_object);
 
-  if (length > R_LEN_T_MAX) {
+  if (length > R_XLEN_T_MAX) {
     PyErr_Format(PyExc_ValueError,
 		 "The Python sequence is longer than the longuest possible vector in R");
     Py_XDECREF(seq_object);
@@ -1671,9 +2299,6 @@ RPy_SeqToLGLSXP(PyObject *object, SEXP *sexpp)
 
   PROTECT(new_sexp = NEW_LOGICAL(length));
   int *int_ptr = LOGICAL_POINTER(new_sexp);
-  /*FIXME: Optimization possible for array.array by using memcpy().
-   * With Python >= 2.7, this could be extended to memoryviews.
-   */
   for (ii = 0; ii < length; ++ii) {
     item = PySequence_Fast_GET_ITEM(seq_object, ii);
 
@@ -1815,7 +2440,7 @@ RPy_SeqToRAWSXP(PyObject *object, SEXP *sexpp)
 
   const Py_ssize_t length = PySequence_Fast_GET_SIZE(seq_object);
 
-  if (length > R_LEN_T_MAX) {
+  if (length > R_XLEN_T_MAX) {
     PyErr_Format(PyExc_ValueError,
 		 "The Python sequence is longer than the longuest possible vector in R");
     Py_XDECREF(seq_object);
@@ -1824,9 +2449,6 @@ RPy_SeqToRAWSXP(PyObject *object, SEXP *sexpp)
 
   PROTECT(new_sexp = NEW_RAW(length));
   char *raw_ptr = (char *)RAW_POINTER(new_sexp);
-  /*FIXME: Optimization possible for array.array by using memcpy().
-   * With Python >= 2.7, this could be extended to memoryviews.
-   */
   for (ii = 0; ii < length; ++ii) {
     item = PySequence_Fast_GET_ITEM(seq_object, ii);
     Py_ssize_t size_tmp;
@@ -1938,6 +2560,14 @@ RPy_SeqToCPLXSXP(PyObject *object, SEXP *sexpp)
   PyObject *seq_object, *item;
   SEXP new_sexp;
  
+  /* Objects exporting a buffer of compatible items (array.array,
+   * memoryview, ...) are copied in one block.
+   */
+  int status = RPy_BufferToSEXP(object, CPLXSXP, RPY_BUFFER_STRICT, sexpp);
+  if (status != 1) {
+    return status;
+  }
+
   seq_object = PySequence_Fast(object,
 			       "Cannot create R object from non-sequence object.");
   if (! seq_object) {
@@ -1946,7 +2576,7 @@ RPy_SeqToCPLXSXP(PyObject *object, SEXP *sexpp)
 
   const Py_ssize_t length = PySequence_Fast_GET_SIZE(seq_object);
 
-  if (length > R_LEN_T_MAX) {
+  if (length > R_XLEN_T_MAX) {
     PyErr_Format(PyExc_ValueError,
 		 "The Python sequence is longer than the longuest possible vector in R");
     Py_XDECREF(seq_object);
@@ -1954,9 +2584,6 @@ RPy_SeqToCPLXSXP(PyObject *object, SEXP *sexpp)
   }
 
   PROTECT(new_sexp = NEW_COMPLEX(length));
-  /*FIXME: Optimization possible for array.array by using memcpy().
-   * With Python >= 2.7, this could be extended to memoryviews.
-   */
   for (ii = 0; ii < length; ++ii) {
     item = PySequence_Fast_GET_ITEM(seq_object, ii);
     if (item == NAComplex_New(0)) {
@@ -2087,7 +2714,7 @@ RPy_SeqToVECSXP(PyObject *object, SEXP *sexpp)
 
   const Py_ssize_t length = PySequence_Fast_GET_SIZE(seq_object);
 
-  if (length > R_LEN_T_MAX) {
+  if (length > R_XLEN_T_MAX) {
     PyErr_Format(PyExc_ValueError,
 		 "The Python sequence is longer than the longuest possible vector in R");
     Py_XDECREF(seq_object);
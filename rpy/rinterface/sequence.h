@@ -7,6 +7,26 @@
 
 static PySequenceMethods VectorSexp_sequenceMethods;
 
+/* Number of items made at once (with the lock on R taken once)
+ * when iterating over R vectors. */
+#define RPY_ITER_CHUNKSIZE 256
+
+/* Number of slots in the caches of strings used while converting
+ * R vectors of strings to Python (or the reverse). */
+#define RPY_STRCACHE_SIZE 1024
+
+/* Pairs of an R string (CHARSXP) and the Python str with the same
+ * content, in slots given by the address of either. */
+typedef struct {
+  SEXP charsxp[RPY_STRCACHE_SIZE];
+  PyObject *str[RPY_STRCACHE_SIZE];
+} RPy_StrCache;
+
+static void RPy_StrCache_init(RPy_StrCache *cache);
+static void RPy_StrCache_clear(RPy_StrCache *cache);
+static PyObject *RPy_StrCache_tostr(RPy_StrCache *cache, SEXP charsxp);
+static SEXP RPy_StrCache_tocharsxp(RPy_StrCache *cache, PyObject *pystr);
+
 
 typedef int (* RPy_seqobjtosexpproc)(PyObject *, SEXP *);
 typedef int (* RPy_iterobjtosexpproc)(PyObject *, Py_ssize_t, SEXP *);
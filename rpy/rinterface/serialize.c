@@ -0,0 +1,574 @@
+/*
+ ***** BEGIN LICENSE BLOCK *****
+ * Version: MPL 1.1/GPL 2.0/LGPL 2.1
+ *
+ * The contents of this file are subject to the Mozilla Public License Version
+ * 1.1 (the "License"); you may not use this file except in compliance with
+ * the License. You may obtain a copy of the License at
+ * http://www.mozilla.org/MPL/
+ *
+ * Software distributed under the License is distributed on an "AS IS" basis,
+ * WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License
+ * for the specific language governing rights and limitations under the
+ * License.
+ *
+ * Copyright (C) 2008-2017 Laurent Gautier
+ *
+ * Alternatively, the contents of this file may be used under the terms of
+ * either the GNU General Public License Version 2 or later (the "GPL"), or
+ * the GNU Lesser General Public License Version 2.1 or later (the "LGPL"),
+ * in which case the provisions of the GPL or the LGPL are applicable instead
+ * of those above. If you wish to allow use of your version of this file only
+ * under the terms of either the GPL or the LGPL, and not to allow others to
+ * use your version of this file under the terms of the MPL, indicate your
+ * decision by deleting the provisions above and replace them with the notice
+ * and other provisions required by the GPL or the LGPL. If you do not delete
+ * the provisions above, a recipient may use your version of this file under
+ * the terms of any one of the MPL, the GPL or the LGPL.
+ *
+ * ***** END LICENSE BLOCK ***** */
+
+/* Serialization of R objects with R_Serialize()/R_Unserialize(),
+ * streamed to and from Python file-like objects (or read from a
+ * Python buffer) without building the complete serialized object
+ * in memory first.
+ */
+
+#include <Python.h>
+#include <Rinternals.h>
+#include <Rversion.h>
+
+#include "serialize.h"
+
+#if defined(R_VERSION) && (R_VERSION >= R_Version(3, 5, 0))
+#define RPY_SERIALIZE_VERSION 3
+#else
+#define RPY_SERIALIZE_VERSION 2
+#endif
+
+typedef struct {
+  PyObject *fileobj;  /* Python file-like object (NULL for a buffer) */
+  PyObject *chunk;    /* bytes object being filled (writing) */
+  char *buf;          /* chunk of data read (reading) */
+  Py_ssize_t size;    /* size of a chunk */
+  Py_ssize_t pos;     /* current position in the chunk */
+  Py_ssize_t end;     /* end of the data in the chunk (reading) */
+  int buffered;       /* read ahead by chunks (reading) */
+  int readinto;       /* the file object has a method readinto() */
+  int error;          /* a Python exception is set */
+} RPy_Stream;
+
+
+/* --- Writing --- */
+
+static int
+rpy_stream_write(RPy_Stream *stream)
+{
+  /* Write the bytes in the current chunk to the file object,
+   * and drop the chunk. Return 0 on success, -1 on error. */
+  PyObject *data, *view, *res;
+  Py_ssize_t written = 0;
+  Py_ssize_t n;
+
+  while (written < stream->pos) {
+    if ((written == 0) && (stream->pos == stream->size)) {
+      data = stream->chunk;
+      Py_INCREF(data);
+    } else {
+      view = PyMemoryView_FromObject(stream->chunk);
+      if (view == NULL) {
+	goto fail;
+      }
+      data = PySequence_GetSlice(view, written, stream->pos);
+      Py_DECREF(view);
+      if (data == NULL) {
+	goto fail;
+      }
+    }
+    res = PyObject_CallMethod(stream->fileobj, "write", "O", data);
+    Py_DECREF(data);
+    if (res == NULL) {
+      goto fail;
+    }
+    if (res == Py_None) {
+      /* the whole data was written */
+      n = stream->pos - written;
+    } else {
+      n = PyLong_AsSsize_t(res);
+    }
+    Py_DECREF(res);
+    if (n == -1 && PyErr_Occurred()) {
+      goto fail;
+    }
+    if (n <= 0) {
+      PyErr_SetString(PyExc_IOError,
+		      "The file object did not write any byte.");
+      goto fail;
+    }
+    written += n;
+  }
+  Py_CLEAR(stream->chunk);
+  stream->pos = 0;
+  return 0;
+
+ fail:
+  Py_CLEAR(stream->chunk);
+  stream->error = 1;
+  return -1;
+}
+
+static void
+rpy_stream_outbytes(R_outpstream_t ostream, void *buf, int length)
+{
+  RPy_Stream *stream = (RPy_Stream *)ostream->data;
+  const char *src = (const char *)buf;
+  Py_ssize_t n;
+
+  while (length > 0) {
+    if (stream->error) {
+      /* stop the serialization (the Python exception is kept) */
+      error("Error while writing to the Python file object.");
+    }
+    if (stream->chunk == NULL) {
+      stream->chunk = PyBytes_FromStringAndSize(NULL, stream->size);
+      stream->pos = 0;
+      if (stream->chunk == NULL) {
+	stream->error = 1;
+	continue;
+      }
+    }
+    n = stream->size - stream->pos;
+    if (n > length) {
+      n = length;
+    }
+    memcpy(PyBytes_AS_STRING(stream->chunk) + stream->pos, src, n);
+    stream->pos += n;
+    src += n;
+    length -= (int)n;
+    if (stream->pos == stream->size) {
+      rpy_stream_write(stream);
+    }
+  }
+}
+
+static void
+rpy_stream_outchar(R_outpstream_t ostream, int c)
+{
+  char ch = (char)c;
+  rpy_stream_outbytes(ostream, &ch, 1);
+}
+
+typedef struct {
+  SEXP sexp;
+  R_outpstream_t ostream;
+} RPy_SerializeData;
+
+static void
+rpy_serialize_toplevel(void *data)
+{
+  RPy_SerializeData *sdata = (RPy_SerializeData *)data;
+  R_Serialize(sdata->sexp, sdata->ostream);
+}
+
+
+/* --- Reading --- */
+
+static Py_ssize_t
+rpy_stream_read(RPy_Stream *stream, char *dst, Py_ssize_t n)
+{
+  /* Read at most n bytes from the file object into dst.
+   * Return the number of bytes read (0 at the end of the file),
+   * or -1 on error. */
+  PyObject *view, *res;
+  Py_buffer data;
+  Py_ssize_t nread;
+
+  if (stream->fileobj == NULL) {
+    return 0;
+  }
+  if (stream->readinto) {
+    view = PyMemoryView_FromMemory(dst, n, PyBUF_WRITE);
+    if (view == NULL) {
+      return -1;
+    }
+    res = PyObject_CallMethod(stream->fileobj, "readinto", "O", view);
+    Py_DECREF(view);
+    if (res == NULL) {
+      return -1;
+    }
+    if (res == Py_None) {
+      Py_DECREF(res);
+      PyErr_SetString(PyExc_IOError, "No data available from the file object.");
+      return -1;
+    }
+    nread = PyLong_AsSsize_t(res);
+    Py_DECREF(res);
+  } else {
+    res = PyObject_CallMethod(stream->fileobj, "read", "n", n);
+    if (res == NULL) {
+      return -1;
+    }
+    if (PyObject_GetBuffer(res, &data, PyBUF_SIMPLE) == -1) {
+      Py_DECREF(res);
+      return -1;
+    }
+    nread = data.len;
+    if (nread <= n) {
+      memcpy(dst, data.buf, nread);
+    }
+    PyBuffer_Release(&data);
+    Py_DECREF(res);
+  }
+  if (nread > n) {
+    PyErr_SetString(PyExc_IOError,
+		    "The file object returned more bytes than requested.");
+    return -1;
+  }
+  return nread;
+}
+
+static void
+rpy_stream_inbytes(R_inpstream_t istream, void *buf, int length)
+{
+  RPy_Stream *stream = (RPy_Stream *)istream->data;
+  char *dst = (char *)buf;
+  Py_ssize_t n;
+
+  while (length > 0) {
+    if (stream->pos == stream->end) {
+      if (stream->buffered) {
+	n = rpy_stream_read(stream, stream->buf, stream->size);
+	if (n > 0) {
+	  stream->pos = 0;
+	  stream->end = n;
+	}
+      } else {
+	/* read exactly what is needed, straight into R's buffer */
+	n = rpy_stream_read(stream, dst, length);
+	if (n > 0) {
+	  dst += n;
+	  length -= (int)n;
+	  continue;
+	}
+      }
+      if (n == 0) {
+	PyErr_SetString(PyExc_EOFError,
+			"Unexpected end of the serialized R object.");
+      }
+      if (n <= 0) {
+	stream->error = 1;
+	error("Error while reading from the Python file object.");
+      }
+    }
+    n = stream->end - stream->pos;
+    if (n > length) {
+      n = length;
+    }
+    memcpy(dst, stream->buf + stream->pos, n);
+    stream->pos += n;
+    dst += n;
+    length -= (int)n;
+  }
+}
+
+static int
+rpy_stream_inchar(R_inpstream_t istream)
+{
+  unsigned char c;
+  rpy_stream_inbytes(istream, &c, 1);
+  return (int)c;
+}
+
+typedef struct {
+  R_inpstream_t istream;
+  SEXP res;
+} RPy_UnserializeData;
+
+static void
+rpy_unserialize_toplevel(void *data)
+{
+  RPy_UnserializeData *udata = (RPy_UnserializeData *)data;
+  /* R_ToplevelExec() resets the protection stack when returning */
+  udata->res = R_Unserialize(udata->istream);
+  R_PreserveObject(udata->res);
+}
+
+static SEXP
+rpy_unserialize_stream(RPy_Stream *stream)
+{
+  /* Unserialize an R object from the stream. The object returned
+   * is preserved (R_ReleaseObject() must be called on it), or NULL
+   * is returned with a Python exception set. */
+  struct R_inpstream_st istream;
+  RPy_UnserializeData udata;
+
+  R_InitInPStream(&istream, (R_pstream_data_t)stream,
+		  R_pstream_any_format,
+		  rpy_stream_inchar, rpy_stream_inbytes,
+		  NULL, R_NilValue);
+  udata.istream = &istream;
+  udata.res = NULL;
+  if (! R_ToplevelExec(rpy_unserialize_toplevel, &udata)) {
+    if (! stream->error) {
+      PyErr_Format(PyExc_RuntimeError,
+		   "Error while unserializing the R object.");
+    }
+    return NULL;
+  }
+  return udata.res;
+}
+
+static SEXP
+rpy_unserialize_buffer(const char *buf, Py_ssize_t len)
+{
+  /* Unserialize an R object from a block of memory
+   * (see rpy_unserialize_stream()). */
+  RPy_Stream stream;
+  stream.fileobj = NULL;
+  stream.chunk = NULL;
+  stream.buf = (char *)buf;
+  stream.size = len;
+  stream.pos = 0;
+  stream.end = len;
+  stream.buffered = 1;
+  stream.readinto = 0;
+  stream.error = 0;
+  return rpy_unserialize_stream(&stream);
+}
+
+
+/* --- Python-level functions and methods --- */
+
+PyDoc_STRVAR(Sexp_dump_doc,
+	     "dump(fileobj)\n\n"
+	     "Serialize the R object into the Python file-like object\n"
+	     "fileobj (an object with a method write()), in chunks of\n"
+	     "fixed size rather than building the serialized object in\n"
+	     "memory first. The format is the one of R's serialize(), and\n"
+	     "the object can be read back with rpy2.rinterface.load()\n"
+	     "(or R's unserialize()).");
+
+static PyObject*
+Sexp_dump(PyObject *self, PyObject *args, PyObject *kwds)
+{
+  PyObject *fileobj;
+  struct R_outpstream_st ostream;
+  RPy_Stream stream;
+  RPy_SerializeData sdata;
+  Rboolean ok;
+  static char *kwlist[] = {"fileobj", NULL};
+
+  if (! PyArg_ParseTupleAndKeywords(args, kwds, "O", kwlist, &fileobj)) {
+    return NULL;
+  }
+
+  SEXP sexp = RPY_SEXP((PySexpObject *)self);
+  if (! sexp) {
+    PyErr_Format(PyExc_ValueError, "NULL SEXP.");
+    return NULL;
+  }
+  if (! PyObject_HasAttrString(fileobj, "write")) {
+    PyErr_Format(PyExc_TypeError,
+		 "The file object must have a method write().");
+    return NULL;
+  }
+
+  embeddedR_setlock();
+
+  stream.fileobj = fileobj;
+  stream.chunk = NULL;
+  stream.buf = NULL;
+  stream.size = RPY_STREAM_CHUNKSIZE;
+  stream.pos = 0;
+  stream.end = 0;
+  stream.buffered = 1;
+  stream.readinto = 0;
+  stream.error = 0;
+  R_InitOutPStream(&ostream, (R_pstream_data_t)&stream,
+		   R_pstream_xdr_format, RPY_SERIALIZE_VERSION,
+		   rpy_stream_outchar, rpy_stream_outbytes,
+		   NULL, R_NilValue);
+  sdata.sexp = sexp;
+  sdata.ostream = &ostream;
+  ok = R_ToplevelExec(rpy_serialize_toplevel, &sdata);
+  if (ok && (! stream.error) && (stream.chunk != NULL)) {
+    /* last (partial) chunk */
+    rpy_stream_write(&stream);
+  }
+  Py_XDECREF(stream.chunk);
+  embeddedR_freelock();
+
+  if (stream.error) {
+    return NULL;
+  }
+  if (! ok) {
+    PyErr_Format(PyExc_RuntimeError, "Error while serializing the R object.");
+    return NULL;
+  }
+  Py_INCREF(Py_None);
+  return Py_None;
+}
+
+PyDoc_STRVAR(EmbeddedR_load_doc,
+	     "load(fileobj)\n\n"
+	     "Unserialize an R object from the Python file-like object\n"
+	     "fileobj (an object with a method readinto() or read()),\n"
+	     "as written by Sexp.dump() or R's serialize().\n"
+	     "When fileobj can seek, it is read by chunks and left right\n"
+	     "after the serialized object; otherwise only the bytes needed\n"
+	     "are read as the unserialization proceeds.");
+
+static PyObject*
+EmbeddedR_load(PyObject *self, PyObject *args, PyObject *kwds)
+{
+  PyObject *fileobj, *res, *seekable;
+  RPy_Stream stream;
+  SEXP sexp;
+  static char *kwlist[] = {"fileobj", NULL};
+
+  if (! PyArg_ParseTupleAndKeywords(args, kwds, "O", kwlist, &fileobj)) {
+    return NULL;
+  }
+
+  if (! (rpy_has_status(RPY_R_INITIALIZED))) {
+    PyErr_Format(PyExc_RuntimeError,
+                 "R cannot evaluate code before being initialized.");
+    return NULL;
+  }
+
+  stream.fileobj = fileobj;
+  stream.chunk = NULL;
+  stream.buf = NULL;
+  stream.size = RPY_STREAM_CHUNKSIZE;
+  stream.pos = 0;
+  stream.end = 0;
+  stream.error = 0;
+  stream.readinto = PyObject_HasAttrString(fileobj, "readinto");
+  if ((! stream.readinto) && (! PyObject_HasAttrString(fileobj, "read"))) {
+    PyErr_Format(PyExc_TypeError,
+		 "The file object must have a method readinto() or read().");
+    return NULL;
+  }
+  seekable = PyObject_CallMethod(fileobj, "seekable", NULL);
+  if (seekable == NULL) {
+    PyErr_Clear();
+    stream.buffered = 0;
+  } else {
+    stream.buffered = PyObject_IsTrue(seekable);
+    Py_DECREF(seekable);
+    if (stream.buffered == -1) {
+      return NULL;
+    }
+  }
+  if (stream.buffered) {
+    stream.buf = (char *)PyMem_Malloc(stream.size);
+    if (stream.buf == NULL) {
+      return PyErr_NoMemory();
+    }
+  }
+
+  embeddedR_setlock();
+  res = NULL;
+  sexp = rpy_unserialize_stream(&stream);
+  if (sexp != NULL) {
+    res = (PyObject *)newPySexpObject(sexp);
+    R_ReleaseObject(sexp);
+  }
+  embeddedR_freelock();
+
+  if ((res != NULL) && (stream.end > stream.pos)) {
+    /* give back the bytes read past the end of the object */
+    seekable = PyObject_CallMethod(fileobj, "seek", "ni",
+				   stream.pos - stream.end, 1);
+    if (seekable == NULL) {
+      Py_CLEAR(res);
+    } else {
+      Py_DECREF(seekable);
+    }
+  }
+  PyMem_Free(stream.buf);
+  return res;
+}
+
+
+#if PY_VERSION_HEX >= 0x03080000
+static PyObject*
+Sexp_reduce_outofband(PyObject *self)
+{
+  /* Like Sexp.__reduce__(), but the serialized object is an R raw
+   * vector exposed through a pickle.PickleBuffer, and is not copied
+   * into Python bytes (pickle protocol 5 and out-of-band buffers). */
+  PyObject *dict, *raw, *state;
+  SEXP sexp_ser;
+
+  if (! (rpy_has_status(RPY_R_INITIALIZED))) {
+    PyErr_Format(PyExc_RuntimeError,
+                 "R cannot evaluate code before being initialized.");
+    return NULL;
+  }
+  SEXP sexp = RPY_SEXP((PySexpObject *)self);
+  if (! sexp) {
+    PyErr_Format(PyExc_ValueError, "NULL SEXP.");
+    return NULL;
+  }
+
+  dict = PyObject_GetAttrString((PyObject *)self, "__dict__");
+  if (dict == NULL) {
+    PyErr_Clear();
+    dict = Py_None;
+    Py_INCREF(dict);
+  }
+
+  embeddedR_setlock();
+  PROTECT(sexp_ser = rpy2_serialize(sexp, R_GlobalEnv));
+  if (TYPEOF(sexp_ser) != RAWSXP) {
+    UNPROTECT(1);
+    embeddedR_freelock();
+    Py_DECREF(dict);
+    PyErr_Format(PyExc_RuntimeError,
+                 "R's serialize did not return a raw vector.");
+    return NULL;
+  }
+  raw = (PyObject *)newPySexpObject(sexp_ser);
+  UNPROTECT(1);
+  embeddedR_freelock();
+  if (raw == NULL) {
+    Py_DECREF(dict);
+    return NULL;
+  }
+
+  state = PyPickleBuffer_FromObject(raw);
+  Py_DECREF(raw);
+  if (state == NULL) {
+    Py_DECREF(dict);
+    return NULL;
+  }
+  return Py_BuildValue("O(Ni)N",
+		       rinterface_unserialize, /* constructor */
+		       state,
+		       TYPEOF(sexp),
+		       dict);
+}
+#endif
+
+PyDoc_STRVAR(Sexp___reduce_ex___doc,
+             "Prepare an instance for serialization with the pickle\n"
+	     "protocol `protocol`. With protocol 5 or higher, the\n"
+	     "serialized R object is exposed as a buffer that pickle can\n"
+	     "handle out-of-band, without copying it into Python bytes.\n"
+	     "Otherwise, this is the same as __reduce__().");
+
+static PyObject*
+Sexp___reduce_ex__(PyObject *self, PyObject *args)
+{
+  int protocol;
+  if (! PyArg_ParseTuple(args, "i", &protocol)) {
+    return NULL;
+  }
+#if PY_VERSION_HEX >= 0x03080000
+  if (protocol >= 5) {
+    return Sexp_reduce_outofband(self);
+  }
+#endif
+  return PyObject_CallMethod(self, "__reduce__", NULL);
+}
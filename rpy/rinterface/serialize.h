@@ -0,0 +1,20 @@
+#ifndef _RPY_PRIVATE_SERIALIZE_H_
+#define _RPY_PRIVATE_SERIALIZE_H_
+
+#ifndef _RPY_RINTERFACE_MODULE_
+#error serialize.h should not be included directly
+#endif
+
+#include <Python.h>
+#include <Rinternals.h>
+
+/* Size (in bytes) of the chunks written to or read from
+ * Python file-like objects. */
+#define RPY_STREAM_CHUNKSIZE 65536
+
+static PyObject* Sexp_dump(PyObject *self, PyObject *args, PyObject *kwds);
+static PyObject* EmbeddedR_load(PyObject *self, PyObject *args, PyObject *kwds);
+static PyObject* Sexp___reduce_ex__(PyObject *self, PyObject *args);
+static SEXP rpy_unserialize_buffer(const char *buf, Py_ssize_t len);
+
+#endif
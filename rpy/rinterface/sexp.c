@@ -94,12 +94,52 @@ Sexp_list_attr(PyObject *self)
     return NULL;
   }
   SEXP res_R;
+  int is_locked = embeddedR_setlock_nested();
   PROTECT(res_R = rpy2_list_attr(sexp));
   PyObject *res = (PyObject *)newPySexpObject(res_R);
   UNPROTECT(1);
+  embeddedR_freelock_nested(is_locked);
   return res;
 }
 
+PyDoc_STRVAR(Sexp_typeinfo_doc,
+             "Returns a tuple (typeof, rclass, ndim) with the R internal\n"
+             "SEXPREC type, the class attribute (a tuple of strings, empty\n"
+             "when the object has no such attribute), and the length of\n"
+             "the dim attribute (0 when the object has no such attribute)\n"
+             "for the R object. No exception is raised for missing\n"
+             "attributes.");
+static PyObject*
+Sexp_typeinfo(PyObject *self)
+{
+  SEXP sexp = RPY_SEXP(((PySexpObject*)self));
+  if (! sexp) {
+    PyErr_Format(PyExc_ValueError, "NULL SEXP.");
+    return NULL;
+  }
+  int is_locked = embeddedR_setlock_nested();
+  SEXP rclass_R = getAttrib(sexp, R_ClassSymbol);
+  SEXP dim_R = getAttrib(sexp, R_DimSymbol);
+  R_len_t i, nclass = isString(rclass_R) ? LENGTH(rclass_R) : 0;
+  R_len_t ndim = (dim_R == R_NilValue) ? 0 : LENGTH(dim_R);
+  PyObject *rclass = PyTuple_New(nclass);
+  if (rclass == NULL) {
+    embeddedR_freelock_nested(is_locked);
+    return NULL;
+  }
+  for (i = 0; i < nclass; i++) {
+    PyObject *item = PyUnicode_FromString(translateCharUTF8(STRING_ELT(rclass_R, i)));
+    if (item == NULL) {
+      Py_DECREF(rclass);
+      embeddedR_freelock_nested(is_locked);
+      return NULL;
+    }
+    PyTuple_SET_ITEM(rclass, i, item);
+  }
+  embeddedR_freelock_nested(is_locked);
+  return Py_BuildValue("iNn", TYPEOF(sexp), rclass, (Py_ssize_t)ndim);
+}
+
 static PyObject*
 Sexp_do_slot(PyObject *self, PyObject *name)
 {
@@ -119,14 +159,17 @@ Sexp_do_slot(PyObject *self, PyObject *name)
 
   PyObject *pybytes = PyUnicode_AsLatin1String(name);
   char *name_str = PyBytes_AsString(pybytes);
+  int is_locked = embeddedR_setlock_nested();
   if (! R_has_slot(sexp, install(name_str))) {
     PyErr_SetString(PyExc_LookupError, "The object has no such attribute.");
     Py_DECREF(pybytes);
+    embeddedR_freelock_nested(is_locked);
     return NULL;
   }
   SEXP res_R = GET_SLOT(sexp, install(name_str));
-    Py_DECREF(pybytes);
+  Py_DECREF(pybytes);
   PyObject *res = (PyObject *)newPySexpObject(res_R);
+  embeddedR_freelock_nested(is_locked);
   return res;
 }
 PyDoc_STRVAR(Sexp_do_slot_doc,
@@ -173,7 +216,9 @@ Sexp_do_slot_assign(PyObject *self, PyObject *args)
     return NULL;;
   }
 
+  int is_locked = embeddedR_setlock_nested();
   SET_SLOT(sexp, install(name_str), value_sexp);
+  embeddedR_freelock_nested(is_locked);
   Py_INCREF(Py_None);
   return Py_None;
 }
@@ -215,15 +260,19 @@ Sexp_sexp_get(PyObject *self, void *closure)
     return NULL;;
   }
 
-  PyObject *key = PyLong_FromVoidPtr((void *)(rpyobj->sObj->sexp));
-  PyObject *capsule = PyDict_GetItem(Rpy_R_Precious, key);
+  /* The capsule does not own a reference to the SexpObject. The SEXP is
+     stored as the context of the capsule in order to check that the
+     SexpObject is still tracked when the capsule is used. */
+  PyObject *capsule = PyCapsule_New((void *)(rpyobj->sObj),
+				    "rpy2.rinterface._rinterface.SEXPOBJ_C_API",
+				    NULL);
   if (capsule == NULL) {
-    printf("Error: Could not get the capsule for the SEXP. This means trouble.\n");
     return NULL;
   }
-  Py_DECREF(key);
-  /* capsule is a borrowed reference: INCREF */
-  Py_INCREF(capsule);
+  if (PyCapsule_SetContext(capsule, (void *)(rpyobj->sObj->sexp)) != 0) {
+    Py_DECREF(capsule);
+    return NULL;
+  }
   return capsule;
 }
 
@@ -246,6 +295,13 @@ Sexp_sexp_set(PyObject *self, PyObject *obj, void *closure)
     return -1;
   }
 
+  SEXP sexp_capsule = (SEXP)PyCapsule_GetContext(obj);
+  if (Rpy_FindPreserved(sexp_capsule) != sexpobj_new) {
+    PyErr_SetString(PyExc_ValueError, 
+		    "The capsule is referring to an R object no longer tracked by rpy2.");
+    return -1;
+  }
+
   SexpObject *sexpobj_orig = ((PySexpObject*)self)->sObj;
   #ifdef RPY_DEBUG_COBJECT
   printf("Setting %p (count: %i) to %p (count: %i)\n", 
@@ -288,6 +344,7 @@ Sexp_rclass_get(PyObject *self, void *closure)
    We are getting the R class by ourselves. This
    is problematic since we are now exposed to changes
    in the behaviour of R_data_class. */
+  int is_locked = embeddedR_setlock_nested();
   SEXP res_R = getAttrib(sexp, R_ClassSymbol);
   int nclasses = length(res_R);
   if (nclasses == 0) {
@@ -330,6 +387,7 @@ Sexp_rclass_get(PyObject *self, void *closure)
   SEXP class_Rstring = ScalarString(res_R);
   UNPROTECT(1);
   PyObject *res = (PyObject *)newPySexpObject(class_Rstring);
+  embeddedR_freelock_nested(is_locked);
   return res;
 }
 
@@ -350,7 +408,9 @@ Sexp_rclass_set(PyObject *self, PyObject *value, void *closure)
     return -1;
   }
   SEXP sexp_class = RPY_SEXP((PySexpObject*)value);
+  int is_locked = embeddedR_setlock_nested();
   SET_CLASS(sexp, sexp_class);
+  embeddedR_freelock_nested(is_locked);
   return 0;
 }
 PyDoc_STRVAR(Sexp_rclass_doc,
@@ -429,9 +489,11 @@ Sexp_duplicate(PyObject *self, PyObject *kwargs)
     PyErr_Format(PyExc_ValueError, "NULL SEXP.");
     return NULL;;
   }
+  int is_locked = embeddedR_setlock_nested();
   PROTECT(sexp_copy = Rf_duplicate(sexp_self));
   res = (PyObject *) newPySexpObject(sexp_copy);
   UNPROTECT(1);
+  embeddedR_freelock_nested(is_locked);
   return res;
 }
 PyDoc_STRVAR(Sexp_duplicate_doc,
@@ -450,9 +512,11 @@ Sexp___getstate__(PyObject *self)
   }
 
   SEXP sexp_ser;
+  int is_locked = embeddedR_setlock_nested();
   PROTECT(sexp_ser = rpy2_serialize(sexp, R_GlobalEnv));
   if (TYPEOF(sexp_ser) != RAWSXP) {
     UNPROTECT(1);
+    embeddedR_freelock_nested(is_locked);
     PyErr_Format(PyExc_RuntimeError, 
                  "R's serialize did not return a raw vector.");
     return NULL;
@@ -462,8 +526,9 @@ Sexp___getstate__(PyObject *self)
 
   /*FIXME: is this working on 64bit archs ? */
   res_string = PyBytes_FromStringAndSize((void *)RAW_POINTER(sexp_ser), 
-					 (Py_ssize_t)LENGTH(sexp_ser));
+					 (Py_ssize_t)XLENGTH(sexp_ser));
   UNPROTECT(1);
+  embeddedR_freelock_nested(is_locked);
   return res_string;
 }
 
@@ -496,47 +561,37 @@ EmbeddedR_unserialize(PyObject* self, PyObject* args)
   }
   
 
-  char *raw;
-  Py_ssize_t raw_size;
+  Py_buffer raw;
   int rtype;
-  if (! PyArg_ParseTuple(args, "s#i",
-                         &raw, &raw_size,
+  if (! PyArg_ParseTuple(args, "s*i",
+                         &raw,
                          &rtype)) {
     return NULL;
   }
 
-  if (rpy_has_status(RPY_R_BUSY)) {
-    PyErr_Format(PyExc_RuntimeError, "Concurrent access to R is not allowed.");
-    return NULL;
-  }
   embeddedR_setlock();
 
-  /* Not the most memory-efficient; an other option would
-  * be to create a dummy RAW and rebind "raw" as its content
-  * (wich seems clearly off the charts).
-  */
-  SEXP raw_sexp, sexp_ser;
-  PROTECT(raw_sexp = NEW_RAW((int)raw_size));
-
-  /*FIXME: use of the memcpy seems to point in the direction of
-  * using the option mentioned above anyway. */
-  Py_ssize_t raw_i;
-  for (raw_i = 0; raw_i < raw_size; raw_i++) {
-    RAW_POINTER(raw_sexp)[raw_i] = raw[raw_i];
+  /* The object is unserialized straight from the Python buffer
+   * (no copy into an R raw vector first). */
+  SEXP sexp_ser = rpy_unserialize_buffer((const char *)raw.buf, raw.len);
+  PyBuffer_Release(&raw);
+  if (sexp_ser == NULL) {
+    embeddedR_freelock();
+    return NULL;
   }
-  PROTECT(sexp_ser = rpy2_unserialize(raw_sexp, R_GlobalEnv));
 
   if (TYPEOF(sexp_ser) != rtype) {
-    UNPROTECT(3);
     PyErr_Format(PyExc_ValueError, 
                  "Mismatch between the serialized object"
                  " and the expected R type"
-                 " (expected %i but got %i)", rtype, TYPEOF(raw_sexp));
+                 " (expected %i but got %i)", rtype, TYPEOF(sexp_ser));
+    R_ReleaseObject(sexp_ser);
+    embeddedR_freelock();
     return NULL;
   }
   res = (PyObject*)newPySexpObject(sexp_ser);
   
-  UNPROTECT(3);
+  R_ReleaseObject(sexp_ser);
   embeddedR_freelock();
   return res;
 }
@@ -560,13 +615,9 @@ Sexp___reduce__(PyObject* self)
     Py_INCREF(dict);
   }
 
-  if (rpy_has_status(RPY_R_BUSY)) {
-    PyErr_Format(PyExc_RuntimeError, "Concurrent access to R is not allowed.");
-    return NULL;
-  }
   embeddedR_setlock();
 
-  result = Py_BuildValue("O(Oi)O",
+  result = Py_BuildValue("O(Ni)O",
                          rinterface_unserialize, /* constructor */
                          Sexp___getstate__(self),
                          TYPEOF(RPY_SEXP((PySexpObject *)self)),
@@ -591,6 +642,8 @@ static PyMethodDef Sexp_methods[] = {
    Sexp_list_attr_doc},
   {"do_slot", (PyCFunction)Sexp_do_slot, METH_O,
    Sexp_do_slot_doc},
+  {"typeinfo", (PyCFunction)Sexp_typeinfo, METH_NOARGS,
+   Sexp_typeinfo_doc},
   {"do_slot_assign", (PyCFunction)Sexp_do_slot_assign, METH_VARARGS,
    Sexp_do_slot_assign_doc},
   {"rsame", (PyCFunction)Sexp_rsame, METH_O,
@@ -603,6 +656,10 @@ static PyMethodDef Sexp_methods[] = {
    Sexp___setstate___doc},
   {"__reduce__", (PyCFunction)Sexp___reduce__, METH_NOARGS,
    Sexp___reduce___doc},
+  {"__reduce_ex__", (PyCFunction)Sexp___reduce_ex__, METH_VARARGS,
+   Sexp___reduce_ex___doc},
+  {"dump", (PyCFunction)Sexp_dump, METH_VARARGS | METH_KEYWORDS,
+   Sexp_dump_doc},
   {NULL, NULL}          /* sentinel */
 };
 
@@ -708,15 +765,19 @@ Sexp_init(PyObject *self, PyObject *args, PyObject *kwds)
   /*   return -1; */
   /* } */
   
+  int is_locked = embeddedR_setlock_nested();
   SexpObject *oldSexpObject = ((PySexpObject *)self)->sObj;
   SexpObject *newSexpObject = Rpy_PreserveObject(((PySexpObject *)sourceObject)->sObj->sexp);
   if (newSexpObject == NULL) {
+    embeddedR_freelock_nested(is_locked);
     return -1;
   }
   ((PySexpObject *)self)->sObj = newSexpObject;
   if (Rpy_ReleaseObject(oldSexpObject->sexp) == -1) {
+    embeddedR_freelock_nested(is_locked);
     return -1;
   }
+  embeddedR_freelock_nested(is_locked);
   
   //RPY_INCREF((PySexpObject *)self);
 #ifdef RPY_VERBOSE
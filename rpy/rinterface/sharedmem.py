@@ -0,0 +1,147 @@
+"""
+Shared-memory transport for R vectors between processes.
+
+Pickling an R vector uses R's serialization, which builds a serialized
+copy of the vector in R and then copies it into Python bytes.
+A :class:`SharedVector` holds the items of a vector of type REALSXP,
+INTSXP, or LGLSXP in a block of shared memory
+(:mod:`multiprocessing.shared_memory`), and only the name of that block,
+the type and length of the vector, and its attributes (`dim`, `names`,
+`class`, ...) in a small header pickled with it. The vector is rebuilt in
+the receiving process with one copy.
+
+>>> import pickle
+>>> import rpy2.rinterface as ri
+>>> ri.initr()
+>>> from rpy2.rinterface.sharedmem import SharedVector
+>>> v = ri.FloatSexpVector((1.0, 2.0, 3.0))
+>>> shared = SharedVector.from_vector(v)
+>>> payload = pickle.dumps(shared)  # a small header
+>>> # in an other process
+>>> v_again = pickle.loads(payload).to_vector()
+
+The block of shared memory is freed once the vector was rebuilt with
+:meth:`SharedVector.to_vector` (unless `unlink=False`), or with
+:meth:`SharedVector.unlink`.
+"""
+
+import struct
+from multiprocessing import shared_memory
+
+import rpy2.rinterface as rinterface
+
+
+# struct-module format for the items of each R type
+_FORMATS = {rinterface.REALSXP: 'd',
+            rinterface.INTSXP: 'i',
+            rinterface.LGLSXP: 'i'}
+
+SEXPTYPES = tuple(_FORMATS.keys())
+
+
+def _itemsize(sexptype):
+    return struct.calcsize(_FORMATS[sexptype])
+
+
+class SharedVector(object):
+    """ R vector whose items are in a named block of shared memory.
+    Instances are built with :meth:`from_vector`, and pickle to a small
+    header (the items are not pickled). """
+
+    def __init__(self, name, sexptype, length, attributes=()):
+        if sexptype not in _FORMATS:
+            raise ValueError("Invalid SEXP type '%i'." % sexptype)
+        self._name = name
+        self._sexptype = sexptype
+        self._length = length
+        self._attributes = tuple(attributes)
+
+    name = property(lambda self: self._name, None, None,
+                    "Name of the block of shared memory.")
+
+    typeof = property(lambda self: self._sexptype, None, None,
+                      "R type for the vector.")
+
+    attributes = property(lambda self: self._attributes, None, None,
+                          "Attributes for the vector, as a tuple of "
+                          "(name, value) pairs.")
+
+    def __len__(self):
+        return self._length
+
+    @property
+    def nbytes(self):
+        """ Size of the items, in bytes. """
+        return self._length * _itemsize(self._sexptype)
+
+    @classmethod
+    def from_vector(cls, vector):
+        """ Copy the items of the R vector `vector` (of type REALSXP,
+        INTSXP, or LGLSXP) into a new block of shared memory. """
+        sexptype = vector.typeof
+        if sexptype not in _FORMATS:
+            raise ValueError("Only R vectors of type REALSXP, INTSXP, "
+                             "or LGLSXP can be shared.")
+        length = len(vector)
+        nbytes = length * _itemsize(sexptype)
+        shm = shared_memory.SharedMemory(create=True, size=max(nbytes, 1))
+        try:
+            rinterface.vector_tobuffer(vector, shm.buf)
+            attributes = tuple((name, vector.do_slot(name))
+                               for name in vector.list_attrs())
+        except:
+            shm.close()
+            shm.unlink()
+            raise
+        shm.close()
+        return cls(shm.name, sexptype, length, attributes)
+
+    def to_vector(self, unlink=True):
+        """ Build the R vector from the block of shared memory (copying
+        the items once), and free the block unless `unlink` is False. """
+        shm = shared_memory.SharedMemory(name=self._name)
+        try:
+            buf = shm.buf[:self.nbytes]
+            view = buf.cast(_FORMATS[self._sexptype])
+            try:
+                res = rinterface.vector_frombuffer(view, self._sexptype)
+            finally:
+                view.release()
+                buf.release()
+        finally:
+            shm.close()
+            if unlink:
+                shm.unlink()
+        for name, value in self._attributes:
+            res.do_slot_assign(name, value)
+        return res
+
+    def unlink(self):
+        """ Free the block of shared memory. """
+        shm = shared_memory.SharedMemory(name=self._name)
+        shm.close()
+        shm.unlink()
+
+    def __repr__(self):
+        return '<%s %s of length %i in %s>' % \
+            (type(self).__name__, rinterface.str_typeint(self._sexptype),
+             self._length, self._name)
+
+
+def share(obj, minlength=0):
+    """ Return a :class:`SharedVector` for `obj` if it is an R vector
+    of type REALSXP, INTSXP, or LGLSXP with at least `minlength` items,
+    or `obj` otherwise. """
+    if (isinstance(obj, rinterface.SexpVector) and
+        obj.typeof in _FORMATS and
+        len(obj) >= minlength):
+        return SharedVector.from_vector(obj)
+    return obj
+
+
+def unshare(obj):
+    """ Return the R vector for `obj` if it is a :class:`SharedVector`
+    (freeing the shared memory), or `obj` otherwise. """
+    if isinstance(obj, SharedVector):
+        return obj.to_vector()
+    return obj
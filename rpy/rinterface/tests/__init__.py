@@ -9,6 +9,8 @@ from . import test_SexpClosure
 from . import test_SexpVectorNumeric
 from . import test_Device
 from . import test_SexpExtPtr
+from . import test_Executor
+from . import test_SharedMem
 
 from . import test_EmbeddedR
 #import test_EmbeddedR_multithreaded
@@ -28,6 +30,8 @@ def load_tests(loader, standard_tests, pattern):
     suite_EmbeddedR = test_EmbeddedR.suite()
     suite_Device = test_Device.suite()
     suite_SexpExtPtr = test_SexpExtPtr.suite()
+    suite_Executor = test_Executor.suite()
+    suite_SharedMem = test_SharedMem.suite()
     #suite_EmbeddedR_multithreaded = test_EmbeddedR_multithreaded.suite()
     alltests = unittest.TestSuite([
         suite_EmbeddedR
@@ -40,6 +44,8 @@ def load_tests(loader, standard_tests, pattern):
         #,suite_Device
         #,suite_EmbeddedR_multithreaded
         ,suite_SexpExtPtr
+        ,suite_Executor
+        ,suite_SharedMem
         ])
     return alltests
 
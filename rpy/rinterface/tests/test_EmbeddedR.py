@@ -220,6 +220,19 @@ except Exception as e:
         gc.collect(); gc.collect()
         self.assertFalse(x_rid in set(z[0] for z in rinterface.protected_rids()))
 
+    def testRpyMemoryManyObjects(self):
+        # more objects than the initial size of the pool of preserved objects
+        xs = [rinterface.IntSexpVector([i, ]) for i in range(5000)]
+        x_rids = set(x.rid for x in xs)
+        protected = dict(rinterface.protected_rids())
+        self.assertTrue(all(protected.get(rid) == 1 for rid in x_rids))
+        for i, x in enumerate(xs):
+            self.assertEqual(i, x[0])
+        del(xs, x)
+        gc.collect(); gc.collect()
+        protected = dict(rinterface.protected_rids())
+        self.assertFalse(any(rid in protected for rid in x_rids))
+
 class CallbacksTestCase(unittest.TestCase):
     def tearDown(self):
         rinterface.set_writeconsole_regular(rinterface.consolePrint)
@@ -472,12 +485,225 @@ class SerializeTestCase(unittest.TestCase):
         identical = rinterface.baseenv["identical"]
         self.assertTrue(identical(x, x_again)[0])
 
+    def testUnserializeBuffer(self):
+        x = rinterface.IntSexpVector([1,2,3])
+        x_serialized = bytearray(x.__getstate__())
+        x_again = rinterface.unserialize(memoryview(x_serialized), x.typeof)
+        identical = rinterface.baseenv["identical"]
+        self.assertTrue(identical(x, x_again)[0])
+
+    def testUnserializeInvalid(self):
+        self.assertRaises(RuntimeError, rinterface.unserialize,
+                          b'foo', rinterface.INTSXP)
+        x = rinterface.IntSexpVector([1,2,3])
+        self.assertRaises(ValueError, rinterface.unserialize,
+                          x.__getstate__(), rinterface.REALSXP)
+
+    @unittest.skipIf(sys.version_info < (3, 8), 'pickle protocol 5 is missing')
+    def testPickleOutOfBand(self):
+        x = rinterface.FloatSexpVector(range(1000))
+        buffers = []
+        x_pickled = pickle.dumps(x, protocol=5,
+                                 buffer_callback=buffers.append)
+        self.assertEqual(1, len(buffers))
+        self.assertTrue(len(x_pickled) < 1000)
+        x_again = pickle.loads(x_pickled, buffers=buffers)
+        identical = rinterface.baseenv["identical"]
+        self.assertTrue(identical(x, x_again)[0])
+        # in-band
+        x_again = pickle.loads(pickle.dumps(x, protocol=5))
+        self.assertTrue(identical(x, x_again)[0])
+
+    def testDumpLoad(self):
+        x = rinterface.IntSexpVector([1,2,3])
+        f = io.BytesIO()
+        x.dump(f)
+        f.seek(0)
+        x_again = rinterface.load(f)
+        identical = rinterface.baseenv["identical"]
+        self.assertTrue(identical(x, x_again)[0])
+        # compatible with R's serialize()
+        x_again = rinterface.load(io.BytesIO(x.__getstate__()))
+        self.assertTrue(identical(x, x_again)[0])
+        x_again = rinterface.unserialize(f.getvalue(), x.typeof)
+        self.assertTrue(identical(x, x_again)[0])
+
+    def testDumpLoadLarge(self):
+        # several chunks
+        x = rinterface.baseenv['runif'](rinterface.IntSexpVector((100000, )))
+        with tempfile.TemporaryFile() as f:
+            x.dump(f)
+            f.seek(0)
+            x_again = rinterface.load(f)
+        identical = rinterface.baseenv["identical"]
+        self.assertTrue(identical(x, x_again)[0])
+
+    def testLoadSequence(self):
+        x = rinterface.IntSexpVector([1,2,3])
+        y = rinterface.StrSexpVector(['a', 'b'])
+        f = io.BytesIO()
+        x.dump(f)
+        y.dump(f)
+        f.write(b'end')
+        f.seek(0)
+        identical = rinterface.baseenv["identical"]
+        self.assertTrue(identical(x, rinterface.load(f))[0])
+        self.assertTrue(identical(y, rinterface.load(f))[0])
+        self.assertEqual(b'end', f.read())
+
+    def testLoadNotSeekable(self):
+        class Reader(object):
+            def __init__(self, data):
+                self._f = io.BytesIO(data)
+            def read(self, n):
+                return self._f.read(n)
+        x = rinterface.IntSexpVector([1,2,3])
+        x_again = rinterface.load(Reader(x.__getstate__() + b'end'))
+        identical = rinterface.baseenv["identical"]
+        self.assertTrue(identical(x, x_again)[0])
+
+    def testLoadTruncated(self):
+        x = rinterface.IntSexpVector(range(100))
+        f = io.BytesIO(x.__getstate__()[:-10])
+        self.assertRaises(EOFError, rinterface.load, f)
+
+    def testDumpLoadInvalid(self):
+        x = rinterface.IntSexpVector([1,2,3])
+        self.assertRaises(TypeError, x.dump, 'foo')
+        self.assertRaises(TypeError, rinterface.load, 'foo')
+
+    def testDumpError(self):
+        class Writer(object):
+            def write(self, data):
+                raise CustomException('boom')
+        x = rinterface.IntSexpVector([1,2,3])
+        self.assertRaises(CustomException, x.dump, Writer())
+
+
+class ReleaseGILTestCase(unittest.TestCase):
+
+    def setUp(self):
+        rinterface.set_release_gil(True)
+
+    def tearDown(self):
+        rinterface.set_release_gil(False)
+        rinterface.set_writeconsole_regular(rinterface.consolePrint)
+
+    def testGetSetReleaseGIL(self):
+        self.assertTrue(rinterface.get_release_gil())
+        rinterface.set_release_gil(False)
+        self.assertFalse(rinterface.get_release_gil())
+        self.assertRaises(ValueError, rinterface.set_release_gil, 1)
+
+    def testOtherThreadRuns(self):
+        import threading
+        ticks = []
+        done = threading.Event()
+        def tick():
+            while not done.is_set():
+                ticks.append(1)
+                time.sleep(0.01)
+        t = threading.Thread(target=tick)
+        t.start()
+        try:
+            rinterface.baseenv['Sys.sleep'](rinterface.FloatSexpVector((0.5,)))
+            n_ticks = len(ticks)
+        finally:
+            done.set()
+            t.join()
+        self.assertTrue(n_ticks > 10)
+
+    def testConcurrentCallsWait(self):
+        import threading
+        errors = []
+        results = []
+        def f():
+            try:
+                res = rinterface.baseenv['Sys.sleep'](
+                    rinterface.FloatSexpVector((0.1,)))
+                results.append(res)
+            except Exception as e:
+                errors.append(e)
+        threads = [threading.Thread(target=f) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual([], errors)
+        self.assertEqual(4, len(results))
+
+    def testObjectsDuringEvaluation(self):
+        import threading
+        errors = []
+        started = threading.Event()
+        def f():
+            try:
+                started.set()
+                rinterface.baseenv['Sys.sleep'](
+                    rinterface.FloatSexpVector((0.5,)))
+            except Exception as e:
+                errors.append(e)
+        x = rinterface.baseenv['c'](a=rinterface.IntSexpVector((1, )),
+                                    b=rinterface.IntSexpVector((2, )))
+        t = threading.Thread(target=f)
+        t.start()
+        started.wait()
+        try:
+            for i in range(1000):
+                v = rinterface.IntSexpVector(range(i % 10 + 1))
+                self.assertEqual(i % 10 + 1, len(v))
+                x.do_slot_assign('foo', v)
+                self.assertEqual(('a', 'b'), tuple(x.do_slot('names')))
+                self.assertEqual(tuple(range(i % 10 + 1)),
+                                 tuple(x.do_slot('foo')))
+                self.assertEqual(rinterface.INTSXP, x.typeinfo()[0])
+        finally:
+            t.join()
+        self.assertEqual([], errors)
+
+    def testCallbacks(self):
+        buf = []
+        def f(x):
+            buf.append(x)
+        rinterface.set_writeconsole_regular(f)
+        rinterface.baseenv["print"](rinterface.StrSexpVector(("3", )))
+        self.assertEqual('[1] "3"\n', str.join('', buf))
+
+        rfun = rinterface.rternalize(lambda x, y: x[0] + y[0])
+        self.assertEqual(3, rfun(1, 2)[0])
+
+    def testCallbackKeepsLock(self):
+        import threading
+        events = []
+        threads = []
+        def other():
+            rinterface.baseenv['sum'](rinterface.IntSexpVector((1, )))
+            events.append('other')
+        def f(x):
+            # R can be used again from the callback
+            res = rinterface.baseenv['sum'](x)
+            t = threading.Thread(target=other)
+            threads.append(t)
+            t.start()
+            time.sleep(0.2)
+            res = rinterface.baseenv['sum'](res)
+            events.append('callback')
+            return res
+        rfun = rinterface.rternalize(f)
+        try:
+            self.assertEqual(3, rfun(rinterface.IntSexpVector((1, 2)))[0])
+        finally:
+            for t in threads:
+                t.join()
+        self.assertEqual(['callback', 'other'], events)
+
 
 def suite():
     suite = unittest.TestLoader().loadTestsFromTestCase(EmbeddedRTestCase)
     suite.addTest(unittest.TestLoader().loadTestsFromTestCase(CallbacksTestCase))
     suite.addTest(unittest.TestLoader().loadTestsFromTestCase(ObjectDispatchTestCase))
     suite.addTest(unittest.TestLoader().loadTestsFromTestCase(SerializeTestCase))
+    suite.addTest(unittest.TestLoader().loadTestsFromTestCase(ReleaseGILTestCase))
     return suite
 
 if __name__ == '__main__':
@@ -0,0 +1,112 @@
+import unittest
+import threading
+try:
+    import contextvars
+except ImportError:
+    contextvars = None
+import rpy2.rinterface as rinterface
+from rpy2.rinterface import executor
+
+rinterface.initr()
+
+
+class ExecutorTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.executor = executor.RExecutor()
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def testCall(self):
+        r_sum = rinterface.baseenv['sum']
+        f = self.executor.call(r_sum, rinterface.IntSexpVector((1, 2, 3)))
+        self.assertEqual(6, f.result()[0])
+
+    def testRcall(self):
+        r_rep = rinterface.baseenv['rep']
+        f = self.executor.rcall(r_rep,
+                                (('x', rinterface.IntSexpVector((1, ))),
+                                 ('times', rinterface.IntSexpVector((3, )))))
+        self.assertEqual((1, 1, 1), tuple(f.result()))
+
+    def testParse(self):
+        f = self.executor.parse('1 + 2')
+        self.assertEqual(rinterface.EXPRSXP, f.result().typeof)
+
+    def testReval(self):
+        f = self.executor.reval('x <- 1:3; sum(x)')
+        self.assertEqual(6, f.result()[0])
+
+    def testException(self):
+        f = self.executor.reval('stop("boom")')
+        self.assertRaises(rinterface.RRuntimeError, f.result)
+        self.assertEqual(1, self.executor.counters.errors)
+
+    def testFIFO(self):
+        order = []
+        futures = [self.executor.submit(order.append, i) for i in range(20)]
+        for f in futures:
+            f.result()
+        self.assertEqual(list(range(20)), order)
+
+    def testManyThreads(self):
+        r_sum = rinterface.baseenv['sum']
+        results = []
+        def f(i):
+            res = self.executor.call(r_sum,
+                                     rinterface.IntSexpVector((i, i))).result()
+            results.append(res[0])
+        threads = [threading.Thread(target=f, args=(i, )) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(sorted(2*i for i in range(8)), sorted(results))
+
+    def testThread(self):
+        f = self.executor.submit(threading.current_thread)
+        self.assertTrue(f.result() is self.executor.thread)
+
+    def testSubmitFromWorker(self):
+        def nested():
+            return self.executor.submit(lambda: 3).result()
+        f = self.executor.submit(nested)
+        self.assertEqual(3, f.result(timeout=5))
+
+    @unittest.skipIf(contextvars is None, 'contextvars requires Python >= 3.7')
+    def testContext(self):
+        var = contextvars.ContextVar('var', default='default')
+        var.set('submitter')
+        f = self.executor.submit(var.get)
+        self.assertEqual('submitter', f.result())
+
+    def testCounters(self):
+        self.executor.reset_counters()
+        futures = [self.executor.reval('1') for i in range(3)]
+        for f in futures:
+            f.result()
+            self.assertTrue(f.timing.wait >= 0)
+            self.assertTrue(f.timing.run >= 0)
+        counters = self.executor.counters
+        self.assertEqual(3, counters.calls)
+        self.assertEqual(0, counters.errors)
+        self.assertTrue(counters.run >= 0)
+
+    def testShutdown(self):
+        self.executor.shutdown()
+        self.assertFalse(self.executor.thread.is_alive())
+        self.assertRaises(RuntimeError, self.executor.submit, int)
+
+    def testGetExecutor(self):
+        e = executor.get_executor()
+        self.assertTrue(e is executor.get_executor())
+
+
+def suite():
+    suite = unittest.TestLoader().loadTestsFromTestCase(ExecutorTestCase)
+    return suite
+
+if __name__ == '__main__':
+    tr = unittest.TextTestRunner(verbosity = 2)
+    tr.run(suite())
@@ -56,6 +56,13 @@ class SexpTestCase(unittest.TestCase):
 
         self.assertRaises(LookupError, sexp.do_slot, "foo")
 
+    def testTypeinfo(self):
+        sexp = rinterface.baseenv.get('pi')
+        self.assertEqual((rinterface.REALSXP, (), 0), sexp.typeinfo())
+        sexp = rinterface.baseenv['eval'](rinterface.parse(
+            'structure(1:6, dim=c(1L, 2L, 3L), class=c("a", "b"))'))
+        self.assertEqual((rinterface.INTSXP, ('a', 'b'), 3), sexp.typeinfo())
+
     def testDo_slot_emptyString(self):
         sexp = rinterface.baseenv.get('pi')
         self.assertRaises(ValueError, sexp.do_slot, "")
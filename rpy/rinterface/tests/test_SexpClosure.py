@@ -103,6 +103,65 @@ class SexpClosureTestCase(unittest.TestCase):
                                                  env_b)
         self.assertEqual(15, sum_b[0])        
         
+    def testPrepare(self):
+        mylist = rinterface.baseenv['list']
+        call = mylist.prepare(('a', None, 'c'))
+        self.assertTrue(isinstance(call, rinterface.SexpPreparedCall))
+        for i in range(3):
+            res = call(rinterface.IntSexpVector((i, )),
+                       rinterface.StrSexpVector(('x', )), True)
+            self.assertEqual(('a', '', 'c'), tuple(res.do_slot('names')))
+            self.assertEqual(i, res[0][0])
+            self.assertEqual('x', res[1][0])
+            self.assertEqual(True, res[2][0])
+
+    def testPrepareInvalid(self):
+        mylist = rinterface.baseenv['list']
+        self.assertRaises(TypeError, mylist.prepare, ('', ))
+        self.assertRaises(TypeError, mylist.prepare, (1, ))
+        call = mylist.prepare((None, ))
+        self.assertRaises(TypeError, call)
+        self.assertRaises(TypeError, call, 1, 2)
+        self.assertRaises(TypeError, call, x=1)
+        self.assertRaises(ValueError, call, object())
+
+    def testPreparedCallNotLang(self):
+        call = rinterface.SexpPreparedCall(rinterface.baseenv['list'])
+        self.assertRaises(TypeError, call)
+        call = rinterface.SexpPreparedCall(rinterface.IntSexpVector((1, 2)))
+        self.assertRaises(TypeError, call, 3)
+
+    def testPrepareRError(self):
+        call = rinterface.baseenv['sum'].prepare((None, ))
+        self.assertRaises(rinterface.RRuntimeError, call,
+                          rinterface.baseenv['letters'])
+        # the call can still be used after an error
+        self.assertEqual(6, call(rinterface.IntSexpVector((1, 2, 3)))[0])
+
+    def testPreparedCallSysCall(self):
+        f = rinterface.baseenv['eval'](
+            rinterface.parse('function(x) sys.call()[[2]]'))
+        call = f.prepare((None, ))
+        self.assertEqual(1, call(rinterface.IntSexpVector((1, )))[0])
+        f = rinterface.baseenv['eval'](
+            rinterface.parse('function(x) sys.call()'))
+        call = f.prepare((None, ))
+        c1 = call(rinterface.IntSexpVector((1, )))
+        c2 = call(rinterface.IntSexpVector((2, )))
+        aslist = rinterface.baseenv['as.list']
+        self.assertEqual(1, aslist(c1)[1][0])
+        self.assertEqual(2, aslist(c2)[1][0])
+
+    def testPreparedCallReentrant(self):
+        f = rinterface.baseenv['eval'](
+            rinterface.parse('function(x, g) { g(); sys.call()[[2]] }'))
+        call = f.prepare((None, None))
+        def g():
+            return call(rinterface.IntSexpVector((2, )),
+                        rinterface.baseenv['invisible'])
+        res = call(rinterface.IntSexpVector((1, )), rinterface.rternalize(g))
+        self.assertEqual(1, res[0])
+
     def testErrorInCall(self):
         mylist = rinterface.baseenv['list']
         
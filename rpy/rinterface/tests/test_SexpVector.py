@@ -1,7 +1,15 @@
 import unittest
-import sys, struct
+import os, sys, struct
+import array
+import gc, mmap, pickle, weakref
 import rpy2.rinterface as ri
 
+try:
+    import numpy
+    has_numpy = True
+except ImportError:
+    has_numpy = False
+
 ri.initr()
 def evalr(string):
     res = ri.parse(string)
@@ -176,6 +184,19 @@ class IntSexpVectorTestCase(unittest.TestCase):
             self.assertRaises(OverflowError, 
                               ri.IntSexpVector, (ri.R_LEN_T_MAX+1, ))
 
+    def testInitFromBuffer(self):
+        a = array.array('i', [1, 2, 3])
+        v = ri.IntSexpVector(a)
+        self.assertEqual((1, 2, 3), tuple(v))
+        v = ri.IntSexpVector(memoryview(a))
+        self.assertEqual((1, 2, 3), tuple(v))
+        v = ri.IntSexpVector(bytes((1, 2, 3)))
+        self.assertEqual((1, 2, 3), tuple(v))
+
+    def testInitFromBufferOverflow(self):
+        a = array.array('q', [1, 2**40])
+        self.assertRaises(OverflowError, ri.IntSexpVector, a)
+
 class FloatSexpVectorTestCase(unittest.TestCase):
     def testInitFromSeq(self):
         seq = (1.0, 2.0, 3.0)
@@ -195,6 +216,31 @@ class FloatSexpVectorTestCase(unittest.TestCase):
         seq = (1.0, 'b', 3.0)
         self.assertRaises(ValueError, ri.FloatSexpVector, seq)
 
+    def testInitFromBuffer(self):
+        a = array.array('d', [1.0, 2.5, 3.0])
+        v = ri.FloatSexpVector(a)
+        self.assertEqual((1.0, 2.5, 3.0), tuple(v))
+        v = ri.FloatSexpVector(memoryview(a)[::2])
+        self.assertEqual((1.0, 3.0), tuple(v))
+        v = ri.FloatSexpVector(array.array('h', [1, 2]))
+        self.assertEqual((1.0, 2.0), tuple(v))
+
+
+class BoolSexpVectorTestCase(unittest.TestCase):
+
+    def testInitFromBuffer(self):
+        a = array.array('b', [0, 1, 2])
+        v = ri.BoolSexpVector(a)
+        self.assertEqual((False, True, True), tuple(v))
+
+
+class ComplexSexpVectorTestCase(unittest.TestCase):
+
+    def testInitFromBufferOfFloats(self):
+        # like for a sequence of floats, floats are not complex numbers
+        a = array.array('d', [1.0, 2.0])
+        self.assertRaises(ValueError, ri.ComplexSexpVector, a)
+
 
 class ByteSexpVectorTestCase(unittest.TestCase):
 
@@ -339,6 +385,23 @@ class SexpVectorTestCase(unittest.TestCase):
         #       myself what is happening on drone.io.
         self.assertTrue(u'\u21a7' in (u_char, b_char))
         
+    def testNewStringRepeated(self):
+        values = ('abc', u'\u21a7', 'abc', NotImplemented, u'\u21a7')
+        sexp = ri.StrSexpVector(values)
+        self.assertEqual(('abc', u'\u21a7', 'abc', 'NotImplemented', u'\u21a7'),
+                         tuple(sexp))
+        sexp = ri.SexpVector(values[:3], ri.STRSXP)
+        self.assertEqual(('abc', u'\u21a7', 'abc'), tuple(sexp))
+
+    def testStringsCached(self):
+        sexp = evalr('rep(c("abc", "\\u21a7"), 3)')
+        res = sexp.tolist()
+        self.assertEqual(['abc', u'\u21a7'] * 3, res)
+        self.assertTrue(res[0] is res[2])
+        self.assertTrue(res[1] is res[5])
+        res = list(sexp)
+        self.assertTrue(res[0] is res[4])
+
     def testNewList(self):
         vec = ri.ListSexpVector([1,'b',3,'d',5])
         ok = ri.baseenv["is.list"](vec)[0]
@@ -436,6 +499,142 @@ class SexpVectorTestCase(unittest.TestCase):
             self.assertRaises(IndexError, myVec.__getitem__, 
                               ri.R_LEN_T_MAX+1)
 
+    def testIter(self):
+        # more items than made at once by the iterator
+        values = list(range(1000))
+        for i in (0, 500, 999):
+            values[i] = ri.NA_Integer
+        vec = ri.IntSexpVector(values)
+        res = list(vec)
+        self.assertEqual(values, res)
+        self.assertTrue(res[500] is ri.NA_Integer)
+        self.assertEqual(vec[-1], res[-1])
+
+    def testIterTypes(self):
+        for values, cls in (((True, ri.NA_Logical, False), ri.BoolSexpVector),
+                            ((1.5, ri.NA_Real), ri.FloatSexpVector),
+                            ((1+2j, ri.NA_Complex), ri.ComplexSexpVector),
+                            ((b'a', b'b'), ri.ByteSexpVector),
+                            ((u'\u00e9', ri.NA_Character, 'b'), ri.StrSexpVector)):
+            vec = cls(values)
+            res = tuple(vec)
+            self.assertEqual(len(values), len(res))
+            for x, y in zip(values, res):
+                self.assertTrue(x is y or x == y)
+            self.assertEqual(tuple(vec[i] for i in range(len(vec))), res)
+
+    def testIterList(self):
+        vec = ri.ListSexpVector((ri.IntSexpVector((1, )),
+                                 ri.StrSexpVector(('a', ))))
+        res = list(vec)
+        self.assertEqual(2, len(res))
+        self.assertEqual(ri.INTSXP, res[0].typeof)
+        self.assertEqual('a', res[1][0])
+
+    def testIterEmpty(self):
+        self.assertEqual([], list(ri.FloatSexpVector(())))
+
+    def testIterExhausted(self):
+        it = iter(ri.IntSexpVector((1, 2)))
+        self.assertEqual([1, 2], list(it))
+        self.assertRaises(StopIteration, next, it)
+
+    def testTolist(self):
+        vec = ri.IntSexpVector((1, 2, 3, 4))
+        self.assertEqual([1, 2, 3, 4], vec.tolist())
+        self.assertEqual([2, 3], vec.tolist(1, 3))
+        self.assertEqual([3, 4], vec.tolist(start=-2))
+        self.assertEqual([1, 2, 3], vec.tolist(stop=-1))
+        self.assertEqual([], vec.tolist(3, 1))
+        self.assertEqual([], vec.tolist(10))
+
+    def testTolistNA(self):
+        vec = evalr('c("a", NA)')
+        res = vec.tolist()
+        self.assertEqual('a', res[0])
+        self.assertTrue(res[1] is ri.NA_Character)
+
+    def testTolistList(self):
+        vec = ri.ListSexpVector((ri.IntSexpVector((1, )),
+                                 ri.StrSexpVector(('a', ))))
+        res = vec.tolist()
+        self.assertEqual(2, len(res))
+        self.assertEqual(ri.INTSXP, res[0].typeof)
+        self.assertEqual('a', res[1][0])
+
+    def testTolistInvalidType(self):
+        # R objects of these types are SexpVector instances, but their
+        # items cannot be listed
+        for code, sexptype in (('pairlist(a=1)', ri.LISTSXP),
+                               ('quote(f(x))', ri.LANGSXP)):
+            vec = evalr(code)
+            self.assertTrue(isinstance(vec, ri.SexpVector))
+            self.assertEqual(sexptype, vec.typeof)
+            self.assertRaises(TypeError, vec.tolist)
+
+    def testToArray(self):
+        res = ri.FloatSexpVector((1.5, 2.5)).to_array()
+        self.assertTrue(isinstance(res, array.array))
+        self.assertEqual('d', res.typecode)
+        self.assertEqual([1.5, 2.5], res.tolist())
+        res = ri.IntSexpVector((1, 2)).to_array()
+        self.assertEqual('i', res.typecode)
+        self.assertEqual([1, 2], res.tolist())
+        res = ri.BoolSexpVector((True, False)).to_array()
+        self.assertEqual([1, 0], res.tolist())
+
+    def testToArrayTypecode(self):
+        res = ri.IntSexpVector((1, 2)).to_array('q')
+        self.assertEqual('q', res.typecode)
+        self.assertEqual([1, 2], res.tolist())
+
+    def testToArrayInvalidType(self):
+        vec = ri.StrSexpVector(('a', ))
+        self.assertRaises(TypeError, vec.to_array)
+
+    def testGatherFloat(self):
+        vec = ri.FloatSexpVector((1.0, 2.0, 3.0, 4.0))
+        res = vec[array.array('i', (3, 0, 0))]
+        self.assertEqual(ri.REALSXP, res.typeof)
+        self.assertEqual([4.0, 1.0, 1.0], list(res))
+
+    def testGatherIntegerTypes(self):
+        vec = ri.IntSexpVector((1, 2, 3))
+        for typecode in ('b', 'h', 'i', 'q', 'B', 'Q'):
+            res = vec[array.array(typecode, (2, 1))]
+            self.assertEqual([3, 2], list(res))
+
+    def testGatherNegative(self):
+        vec = ri.IntSexpVector((1, 2, 3))
+        res = vec[array.array('i', (-1, -3))]
+        self.assertEqual([3, 1], list(res))
+
+    def testGatherOutOfRange(self):
+        vec = ri.IntSexpVector((1, 2, 3))
+        self.assertRaises(IndexError, vec.__getitem__,
+                          array.array('i', (0, 3)))
+        self.assertRaises(IndexError, vec.__getitem__,
+                          array.array('i', (-4, )))
+
+    def testGatherNotIntegers(self):
+        vec = ri.IntSexpVector((1, 2, 3))
+        self.assertRaises(TypeError, vec.__getitem__,
+                          array.array('d', (0.0, )))
+
+    def testGatherStr(self):
+        vec = ri.StrSexpVector(('a', 'b', 'c'))
+        res = vec[array.array('q', (1, 1, 2))]
+        self.assertEqual(ri.STRSXP, res.typeof)
+        self.assertEqual(('b', 'b', 'c'), tuple(res))
+
+    def testGatherList(self):
+        vec = ri.ListSexpVector((ri.IntSexpVector((1, )),
+                                 ri.StrSexpVector(('a', ))))
+        res = vec[array.array('i', (1, ))]
+        self.assertEqual(ri.VECSXP, res.typeof)
+        self.assertEqual(1, len(res))
+        self.assertEqual('a', res[0][0])
+
     def testGetSliceFloat(self):
         vec = ri.FloatSexpVector([1.0,2.0,3.0])
         vec = vec[0:2]
@@ -657,6 +856,268 @@ class SexpVectorTestCase(unittest.TestCase):
         self.assertEqual(2, x.index('c'))
 
 
+class VectorFromBufferTestCase(unittest.TestCase):
+
+    def testFloat(self):
+        a = array.array('d', [1.0, 2.5, 3.0])
+        v = ri.vector_frombuffer(a, ri.REALSXP)
+        self.assertEqual(ri.REALSXP, v.typeof)
+        self.assertEqual((1.0, 2.5, 3.0), tuple(v))
+        self.assertEqual(ri.NULL.rid, v.do_slot('dim').rid)
+
+    def testIntToFloat(self):
+        a = array.array('i', [1, 2, 3])
+        v = ri.vector_frombuffer(a, ri.REALSXP)
+        self.assertEqual(ri.REALSXP, v.typeof)
+        self.assertEqual((1.0, 2.0, 3.0), tuple(v))
+
+    def testInt(self):
+        a = array.array('q', [1, 2, 3])
+        v = ri.vector_frombuffer(a, ri.INTSXP)
+        self.assertEqual(ri.INTSXP, v.typeof)
+        self.assertEqual((1, 2, 3), tuple(v))
+
+    def testIntOverflow(self):
+        a = array.array('q', [1, 2, 2**40])
+        self.assertRaises(OverflowError, ri.vector_frombuffer, a, ri.INTSXP)
+        a = array.array('Q', [1, 2**63])
+        self.assertRaises(OverflowError, ri.vector_frombuffer, a, ri.INTSXP)
+
+    def testBool(self):
+        m = memoryview(bytes((0, 1, 2))).cast('?')
+        v = ri.vector_frombuffer(m, ri.LGLSXP)
+        self.assertEqual(ri.LGLSXP, v.typeof)
+        self.assertEqual((False, True, True), tuple(v))
+
+    def testFloatToComplex(self):
+        a = array.array('d', [1.0, 2.0])
+        v = ri.vector_frombuffer(a, ri.CPLXSXP)
+        self.assertEqual(ri.CPLXSXP, v.typeof)
+        self.assertEqual((1+0j, 2+0j), tuple(v))
+
+    def testSetdim(self):
+        # the buffer is in C order (rows first)
+        a = array.array('d', range(6))
+        m = memoryview(a).cast('B').cast('d', (2, 3))
+        v = ri.vector_frombuffer(m, ri.REALSXP, setdim=True)
+        self.assertEqual((2, 3), tuple(v.do_slot('dim')))
+        self.assertEqual((0.0, 3.0, 1.0, 4.0, 2.0, 5.0), tuple(v))
+
+    def testInvalidFormat(self):
+        a = array.array('d', [1.0, 2.0])
+        self.assertRaises(TypeError, ri.vector_frombuffer, a, ri.INTSXP)
+        self.assertRaises(TypeError, ri.vector_frombuffer, [1, 2], ri.INTSXP)
+
+    def testInvalidType(self):
+        a = array.array('d', [1.0, 2.0])
+        self.assertRaises(ValueError, ri.vector_frombuffer, a, ri.STRSXP)
+
+
+class VectorToBufferTestCase(unittest.TestCase):
+
+    def testFloat(self):
+        v = ri.FloatSexpVector((1.0, 2.5, 3.0))
+        a = array.array('d', [0.0] * 4)
+        self.assertEqual(3 * a.itemsize, ri.vector_tobuffer(v, a))
+        self.assertEqual([1.0, 2.5, 3.0, 0.0], a.tolist())
+
+    def testMatrix(self):
+        v = ri.IntSexpVector(range(6))
+        v.do_slot_assign('dim', ri.IntSexpVector((2, 3)))
+        b = bytearray(6 * array.array('i').itemsize)
+        ri.vector_tobuffer(v, b)
+        self.assertEqual(list(range(6)),
+                         memoryview(b).cast('i').tolist())
+
+    def testBool(self):
+        v = ri.BoolSexpVector((True, False, ri.NA_Logical))
+        b = bytearray(3 * array.array('i').itemsize)
+        ri.vector_tobuffer(v, b)
+        res = memoryview(b).cast('i').tolist()
+        # NA_LOGICAL is INT_MIN
+        self.assertEqual([1, 0, -2**31], res)
+
+    def testTooSmall(self):
+        v = ri.FloatSexpVector((1.0, 2.0))
+        b = bytearray(1)
+        self.assertRaises(ValueError, ri.vector_tobuffer, v, b)
+
+    def testNotWritable(self):
+        v = ri.FloatSexpVector((1.0, 2.0))
+        self.assertRaises(TypeError, ri.vector_tobuffer, v, bytes(16))
+
+    def testInvalidType(self):
+        v = ri.StrSexpVector(('a', ))
+        self.assertRaises(ValueError, ri.vector_tobuffer, v, bytearray(8))
+
+@unittest.skipUnless(evalr('getRversion() >= "3.5.0"')[0],
+                     'ALTREP requires R >= 3.5.0.')
+class VectorWrapBufferTestCase(unittest.TestCase):
+
+    def testFloat(self):
+        a = array.array('d', [1.0, 2.5, 3.0])
+        v = ri.vector_wrapbuffer(a, ri.REALSXP)
+        self.assertEqual(ri.REALSXP, v.typeof)
+        self.assertEqual(3, len(v))
+        self.assertEqual((1.0, 2.5, 3.0), tuple(v))
+        self.assertEqual(6.5, ri.baseenv['sum'](v)[0])
+
+    def testInt(self):
+        a = array.array('i', [1, 2, ri.NA_Integer])
+        v = ri.vector_wrapbuffer(a, ri.INTSXP)
+        self.assertEqual(ri.INTSXP, v.typeof)
+        self.assertEqual(1, v[0])
+        self.assertTrue(v[2] is ri.NA_Integer)
+
+    def testBool(self):
+        a = array.array('i', [1, 0])
+        v = ri.vector_wrapbuffer(a, ri.LGLSXP)
+        self.assertEqual(ri.LGLSXP, v.typeof)
+        self.assertEqual((True, False), tuple(v))
+
+    def testBoolBytes(self):
+        m = memoryview(bytes([1, 0, 1])).cast('?')
+        v = ri.vector_wrapbuffer(m, ri.LGLSXP)
+        self.assertEqual(ri.LGLSXP, v.typeof)
+        self.assertEqual((True, False, True), tuple(v))
+        self.assertEqual(2, ri.baseenv['sum'](v)[0])
+        v = ri.vector_wrapbuffer(array.array('B', [0, 2]), ri.LGLSXP)
+        self.assertEqual((False, True), tuple(v))
+
+    @unittest.skipUnless(has_numpy, 'Package numpy is not installed.')
+    def testStrBytes(self):
+        a = numpy.array([b'ab', b'c', b''], dtype='S2')
+        v = ri.vector_wrapbuffer(a, ri.STRSXP)
+        self.assertEqual(ri.STRSXP, v.typeof)
+        self.assertEqual(('ab', 'c', ''), tuple(v))
+        self.assertEqual((2, 1, 0), tuple(ri.baseenv['nchar'](v)))
+
+    @unittest.skipUnless(has_numpy, 'Package numpy is not installed.')
+    def testStrUnicode(self):
+        a = numpy.array(['abc', 'd\u00e9', '\u20ac'])
+        v = ri.vector_wrapbuffer(a, ri.STRSXP)
+        self.assertEqual(('abc', 'd\u00e9', '\u20ac'), tuple(v))
+        v[0] = ri.StrSexpVector(('x', ))
+        self.assertEqual(('x', 'd\u00e9', '\u20ac'), tuple(v))
+        # strings set by R are not written to the buffer
+        self.assertEqual('abc', a[0])
+
+    def testShared(self):
+        a = array.array('d', [1.0, 2.0, 3.0])
+        v = ri.vector_wrapbuffer(a, ri.REALSXP)
+        a[1] = 10.0
+        self.assertEqual(10.0, v[1])
+        self.assertEqual(14.0, ri.baseenv['sum'](v)[0])
+        v[0] = ri.FloatSexpVector((5.0, ))
+        self.assertEqual(5.0, a[0])
+
+    def testMaterialize(self):
+        data = array.array('d', [1.0, 2.0, 3.0]).tobytes()
+        m = memoryview(data).cast('d')
+        v = ri.vector_wrapbuffer(m, ri.REALSXP)
+        self.assertEqual(1.0, v[0])
+        # the buffer is read-only: R writes in a copy
+        v[0] = ri.FloatSexpVector((5.0, ))
+        self.assertEqual((5.0, 2.0, 3.0), tuple(v))
+        self.assertEqual(1.0, m[0])
+
+    def testMmap(self):
+        mm = mmap.mmap(-1, 3 * struct.calcsize('d'))
+        v = ri.vector_wrapbuffer(memoryview(mm).cast('d'), ri.REALSXP)
+        struct.pack_into('d', mm, struct.calcsize('d'), 2.5)
+        self.assertEqual((0.0, 2.5, 0.0), tuple(v))
+
+    def testKeepAlive(self):
+        a = array.array('d', [1.0, 2.0])
+        a_ref = weakref.ref(a)
+        v = ri.vector_wrapbuffer(a, ri.REALSXP)
+        del(a)
+        gc.collect()
+        ri.baseenv['gc']()
+        self.assertFalse(a_ref() is None)
+        self.assertEqual((1.0, 2.0), tuple(v))
+
+    def testSetdim(self):
+        a = array.array('i', range(6))
+        v = ri.vector_wrapbuffer(a, ri.INTSXP, setdim=True)
+        self.assertEqual((6, ), tuple(v.do_slot('dim')))
+
+    def testPickle(self):
+        v = ri.vector_wrapbuffer(array.array('d', [1.0, 2.0]), ri.REALSXP)
+        v_b = pickle.loads(pickle.dumps(v))
+        self.assertEqual((1.0, 2.0), tuple(v_b))
+
+    def testInvalidFormat(self):
+        self.assertRaises(TypeError, ri.vector_wrapbuffer,
+                          array.array('f', [1.0]), ri.REALSXP)
+        self.assertRaises(TypeError, ri.vector_wrapbuffer,
+                          array.array('d', [1.0]), ri.INTSXP)
+        self.assertRaises(TypeError, ri.vector_wrapbuffer,
+                          [1.0, 2.0], ri.REALSXP)
+        self.assertRaises(TypeError, ri.vector_wrapbuffer,
+                          array.array('d', [1.0]), ri.STRSXP)
+        self.assertRaises(TypeError, ri.vector_wrapbuffer,
+                          array.array('h', [1]), ri.LGLSXP)
+
+    def testNotContiguous(self):
+        m = memoryview(array.array('d', range(4)))[::2]
+        self.assertRaises(TypeError, ri.vector_wrapbuffer, m, ri.REALSXP)
+        # C-ordered matrix
+        m = memoryview(array.array('d', range(6))).cast('B').cast('d', (2, 3))
+        self.assertRaises(TypeError, ri.vector_wrapbuffer, m, ri.REALSXP)
+
+    def testInvalidType(self):
+        self.assertRaises(ValueError, ri.vector_wrapbuffer,
+                          array.array('d', [1.0]), ri.CPLXSXP)
+
+@unittest.skipUnless(ri.R_XLEN_T_MAX > ri.R_LEN_T_MAX,
+                     'R does not support long vectors on this platform.')
+@unittest.skipUnless(os.environ.get('RPY2_TEST_LARGE_MEMORY'),
+                     'Set RPY2_TEST_LARGE_MEMORY to run tests using '
+                     'about 2GB of memory.')
+class LongVectorTestCase(unittest.TestCase):
+    # about 2GB of memory for an R raw vector
+    length = 2 ** 31 + 10
+
+    @classmethod
+    def setUpClass(cls):
+        cls.vector = evalr('raw(%i)' % cls.length)
+
+    @classmethod
+    def tearDownClass(cls):
+        del(cls.vector)
+
+    def testLen(self):
+        self.assertEqual(self.length, len(self.vector))
+
+    def testItem(self):
+        i = self.length - 5
+        self.vector[i] = ri.ByteSexpVector((b'\x07', ))
+        self.assertEqual(b'\x07', self.vector[i])
+        self.assertEqual(b'\x07', self.vector[-5])
+        self.assertEqual(b'\x00', self.vector[-1])
+        self.assertRaises(IndexError, self.vector.__getitem__, self.length)
+
+    def testSlice(self):
+        self.vector[-3:] = ri.ByteSexpVector((b'\x01', b'\x02', b'\x03'))
+        res = self.vector[(self.length - 4):]
+        self.assertEqual(4, len(res))
+        self.assertEqual((b'\x00', b'\x01', b'\x02', b'\x03'), tuple(res))
+
+    def testBuffer(self):
+        view = memoryview(self.vector)
+        self.assertEqual((self.length, ), view.shape)
+        self.assertEqual(self.length, view.nbytes)
+        self.vector[-2] = ri.ByteSexpVector((b'\x09', ))
+        self.assertEqual(9, view[self.length - 2])
+        view.release()
+
+    def testRLength(self):
+        # R's length() returns a double for long vectors
+        res = ri.baseenv['length'](self.vector)
+        self.assertEqual(float(self.length), res[0])
+
+
 def suite():
     suite = unittest.TestLoader().loadTestsFromTestCase(SexpVectorTestCase)
     suite.addTest(unittest.TestLoader().\
@@ -665,8 +1126,20 @@ def suite():
                       loadTestsFromTestCase(IntSexpVectorTestCase))
     suite.addTest(unittest.TestLoader().\
                       loadTestsFromTestCase(FloatSexpVectorTestCase))
+    suite.addTest(unittest.TestLoader().\
+                      loadTestsFromTestCase(BoolSexpVectorTestCase))
+    suite.addTest(unittest.TestLoader().\
+                      loadTestsFromTestCase(ComplexSexpVectorTestCase))
     suite.addTest(unittest.TestLoader().\
                       loadTestsFromTestCase(ByteSexpVectorTestCase))
+    suite.addTest(unittest.TestLoader().\
+                      loadTestsFromTestCase(VectorFromBufferTestCase))
+    suite.addTest(unittest.TestLoader().\
+                      loadTestsFromTestCase(VectorToBufferTestCase))
+    suite.addTest(unittest.TestLoader().\
+                      loadTestsFromTestCase(VectorWrapBufferTestCase))
+    suite.addTest(unittest.TestLoader().\
+                      loadTestsFromTestCase(LongVectorTestCase))
     suite.addTest(unittest.TestLoader().loadTestsFromTestCase(NAValuesTestCase))
     return suite
 
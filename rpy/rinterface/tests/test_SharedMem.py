@@ -0,0 +1,94 @@
+import unittest
+import pickle
+import rpy2.rinterface as rinterface
+
+rinterface.initr()
+
+try:
+    from rpy2.rinterface import sharedmem
+    has_sharedmem = True
+except ImportError:
+    has_sharedmem = False
+
+
+@unittest.skipUnless(has_sharedmem, 'multiprocessing.shared_memory is missing')
+class SharedVectorTestCase(unittest.TestCase):
+
+    def testFloat(self):
+        v = rinterface.FloatSexpVector((1.0, 2.5, rinterface.NA_Real))
+        shared = sharedmem.SharedVector.from_vector(v)
+        self.assertEqual(3, len(shared))
+        self.assertEqual(rinterface.REALSXP, shared.typeof)
+        res = pickle.loads(pickle.dumps(shared)).to_vector()
+        self.assertEqual(rinterface.REALSXP, res.typeof)
+        self.assertEqual((1.0, 2.5), tuple(res)[:2])
+        self.assertTrue(res[2] is rinterface.NA_Real)
+
+    def testInt(self):
+        v = rinterface.IntSexpVector(range(100))
+        res = sharedmem.SharedVector.from_vector(v).to_vector()
+        self.assertEqual(tuple(range(100)), tuple(res))
+
+    def testBool(self):
+        v = rinterface.BoolSexpVector((True, False, rinterface.NA_Logical))
+        res = sharedmem.SharedVector.from_vector(v).to_vector()
+        self.assertEqual(rinterface.LGLSXP, res.typeof)
+        self.assertEqual((True, False), tuple(res)[:2])
+        self.assertTrue(res[2] is rinterface.NA_Logical)
+
+    def testEmpty(self):
+        v = rinterface.FloatSexpVector(())
+        res = sharedmem.SharedVector.from_vector(v).to_vector()
+        self.assertEqual(0, len(res))
+
+    def testAttributes(self):
+        m = rinterface.baseenv['matrix'](rinterface.IntSexpVector(range(6)),
+                                         nrow=rinterface.IntSexpVector((2, )))
+        m.do_slot_assign('class', rinterface.StrSexpVector(('foo', 'matrix')))
+        shared = sharedmem.SharedVector.from_vector(m)
+        self.assertEqual(('dim', 'class'),
+                         tuple(name for name, value in shared.attributes))
+        res = shared.to_vector()
+        self.assertEqual((2, 3), tuple(res.do_slot('dim')))
+        self.assertEqual(('foo', 'matrix'), tuple(res.do_slot('class')))
+        self.assertEqual(tuple(range(6)), tuple(res))
+
+    def testNames(self):
+        v = rinterface.FloatSexpVector((1.0, 2.0))
+        v.do_slot_assign('names', rinterface.StrSexpVector(('a', 'b')))
+        res = sharedmem.SharedVector.from_vector(v).to_vector()
+        self.assertEqual(('a', 'b'), tuple(res.do_slot('names')))
+
+    def testKeep(self):
+        v = rinterface.FloatSexpVector((1.0, 2.0))
+        shared = sharedmem.SharedVector.from_vector(v)
+        res = shared.to_vector(unlink=False)
+        self.assertEqual((1.0, 2.0), tuple(res))
+        res = shared.to_vector()
+        self.assertEqual((1.0, 2.0), tuple(res))
+        self.assertRaises(FileNotFoundError, shared.to_vector)
+
+    def testInvalidType(self):
+        v = rinterface.StrSexpVector(('a', ))
+        self.assertRaises(ValueError, sharedmem.SharedVector.from_vector, v)
+        self.assertRaises(ValueError, sharedmem.SharedVector,
+                          'foo', rinterface.STRSXP, 1)
+
+    def testShare(self):
+        v = rinterface.FloatSexpVector((1.0, 2.0))
+        self.assertTrue(sharedmem.share(v, 3) is v)
+        self.assertTrue(sharedmem.share('a') == 'a')
+        shared = sharedmem.share(v, 2)
+        self.assertTrue(isinstance(shared, sharedmem.SharedVector))
+        res = sharedmem.unshare(shared)
+        self.assertEqual((1.0, 2.0), tuple(res))
+        self.assertTrue(sharedmem.unshare(v) is v)
+
+
+def suite():
+    suite = unittest.TestLoader().loadTestsFromTestCase(SharedVectorTestCase)
+    return suite
+
+if __name__ == '__main__':
+    tr = unittest.TextTestRunner(verbosity = 2)
+    tr.run(suite())
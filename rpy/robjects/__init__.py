@@ -14,6 +14,7 @@ import array
 import itertools
 from datetime import datetime
 import rpy2.rinterface as rinterface
+from rpy2.rinterface import executor
 import rpy2.rlike.container as rlc
 
 from rpy2.robjects.robject import RObjectMixin, RObject
@@ -67,6 +68,14 @@ def reval(string, envir = _globalenv):
     res = _reval(p, envir = envir)
     return res
 
+def areval(string, envir = _globalenv):
+    """ Evaluate a string as R code without blocking an asyncio event
+    loop (see :func:`reval`). The evaluation is done in the thread of the
+    default :class:`rpy2.rinterface.executor.RExecutor`, and an
+    :class:`asyncio.Future` for the result is returned.
+    """
+    return executor.asyncio_submit(reval, string, envir = envir)
+
 default_converter = conversion.Converter('base empty converter')
 
 @default_converter.ri2ro.register(RObject)
@@ -75,41 +84,37 @@ def _(obj):
 
 
 def sexpvector_to_ro(obj):
-    try:
-        rcls = obj.do_slot("class")
-    except LookupError as le:
-        rcls = [None]
+    # type, class attribute, and number of dimensions in one call
+    # (no exception raised for missing attributes)
+    typeof, rcls, ndim = obj.typeinfo()
 
     if 'data.frame' in rcls:
         res = vectors.DataFrame(obj)
         return res
-    try:
-        dim = obj.do_slot("dim")
-        if len(dim) == 2:
-            res = vectors.Matrix(obj)
+    if ndim == 2:
+        res = vectors.Matrix(obj)
+    elif ndim > 0:
+        res = vectors.Array(obj)
+    elif typeof == rinterface.INTSXP:
+        if 'factor' in rcls:
+            res = vectors.FactorVector(obj)
         else:
-            res = vectors.Array(obj)
-    except LookupError as le:
-        if obj.typeof == rinterface.INTSXP:
-            if 'factor' in rcls:
-                res = vectors.FactorVector(obj)
-            else:
-                res = vectors.IntVector(obj)
-        elif obj.typeof == rinterface.REALSXP:
-            if obj.rclass[0] == 'POSIXct':
-                res = vectors.POSIXct(obj)
-            else:
-                res = vectors.FloatVector(obj)
-        elif obj.typeof == rinterface.LGLSXP:
-            res = vectors.BoolVector(obj)
-        elif obj.typeof == rinterface.STRSXP:
-            res = vectors.StrVector(obj)
-        elif obj.typeof == rinterface.VECSXP:
-            res = vectors.ListVector(obj)
-        elif obj.typeof == rinterface.LANGSXP and 'formula' in rcls:
-            res = Formula(obj)
+            res = vectors.IntVector(obj)
+    elif typeof == rinterface.REALSXP:
+        if rcls[:1] == ('POSIXct', ):
+            res = vectors.POSIXct(obj)
         else:
-            res = vectors.Vector(obj)
+            res = vectors.FloatVector(obj)
+    elif typeof == rinterface.LGLSXP:
+        res = vectors.BoolVector(obj)
+    elif typeof == rinterface.STRSXP:
+        res = vectors.StrVector(obj)
+    elif typeof == rinterface.VECSXP:
+        res = vectors.ListVector(obj)
+    elif typeof == rinterface.LANGSXP and 'formula' in rcls:
+        res = Formula(obj)
+    else:
+        res = vectors.Vector(obj)
     return res
 
 default_converter.ri2ro.register(SexpVector, sexpvector_to_ro)
@@ -352,11 +357,18 @@ class R(object):
         res = self.eval(p)
         return conversion.ri2py(res)
 
+    def acall(self, string):
+        """ Awaitable version of calling the instance: evaluate the
+        R code in `string` in the thread of the default
+        :class:`rpy2.rinterface.executor.RExecutor` and return an
+        :class:`asyncio.Future` for the result. """
+        return executor.asyncio_submit(self, string)
+
 r = R()
 
 conversion.set_conversion(default_converter)
 
-globalenv = conversion.converter.ri2ro(_globalenv)
-baseenv = conversion.converter.ri2ro(rinterface.baseenv)
-emptyenv = conversion.converter.ri2ro(rinterface.emptyenv)
+globalenv = conversion.ri2ro(_globalenv)
+baseenv = conversion.ri2ro(rinterface.baseenv)
+emptyenv = conversion.ri2ro(rinterface.emptyenv)
 
@@ -0,0 +1,294 @@
+"""
+Conversion between Apache Arrow (:mod:`pyarrow`) tables and arrays,
+and R data frames and vectors.
+
+The items are copied between the Arrow buffers and the R vectors with
+:mod:`numpy` operations on whole chunks: the validity bitmaps give R's
+missing values (`NA`), dictionary arrays give R factors, and timestamps
+give R `POSIXct` vectors (and back).
+
+>>> import pyarrow
+>>> from rpy2.robjects import default_converter
+>>> from rpy2.robjects.conversion import localconverter
+>>> from rpy2.robjects import arrow2ri
+>>> table = pyarrow.table({'x': [1.5, None, 3.0]})
+>>> with localconverter(default_converter + arrow2ri.converter):
+...     robjects.globalenv['dataf'] = table
+
+"""
+
+import pyarrow
+import pyarrow.types
+import numpy
+
+import rpy2.robjects as ro
+import rpy2.robjects.conversion as conversion
+import rpy2.rinterface as rinterface
+from rpy2.rinterface import (StrSexpVector,
+                             IntSexpVector,
+                             FloatSexpVector,
+                             BoolSexpVector,
+                             ListSexpVector,
+                             LGLSXP, INTSXP, REALSXP,
+                             NA_Integer, NA_Real,
+                             NA_Character)
+from rpy2.robjects.vectors import DataFrame
+
+converter = conversion.Converter('arrow conversion')
+py2ri = converter.py2ri
+ri2py = converter.ri2py
+
+# R modes for the vectors allocated with R's vector()
+_modes = {LGLSXP: 'logical',
+          INTSXP: 'integer',
+          REALSXP: 'double'}
+
+# NA for R's logical vectors is the same 32-bit integer as for integer vectors
+_NA = {LGLSXP: NA_Integer,
+       INTSXP: NA_Integer,
+       REALSXP: NA_Real}
+
+# number of Arrow timestamp units in a second
+_timestamp_units = {'s': 1,
+                    'ms': 1000,
+                    'us': 1000000,
+                    'ns': 1000000000}
+
+_r_vector = rinterface.baseenv['vector']
+
+def _new_vector(sexptype, length):
+    return _r_vector(StrSexpVector((_modes[sexptype], )),
+                     FloatSexpVector((length, )))
+
+
+def _null_mask(chunk):
+    """ Return a numpy array of booleans (True for the null items)
+    from the validity bitmap of the Arrow array `chunk`, or None
+    if there are no null items. """
+    if chunk.null_count == 0:
+        return None
+    bitmap = chunk.buffers()[0]
+    if bitmap is None:
+        # all items are null (Arrow type "null")
+        return numpy.ones(len(chunk), dtype=bool)
+    bits = numpy.unpackbits(numpy.frombuffer(bitmap, dtype=numpy.uint8),
+                            bitorder='little')
+    return bits[chunk.offset:(chunk.offset + len(chunk))] == 0
+
+
+def _values(chunk, dtype):
+    """ Return a numpy array that is a view on the values buffer
+    of the fixed-width Arrow array `chunk`. """
+    dtype = numpy.dtype(dtype)
+    return numpy.frombuffer(chunk.buffers()[1], dtype=dtype,
+                            count=len(chunk),
+                            offset=chunk.offset * dtype.itemsize)
+
+
+def _boolean_values(chunk):
+    bits = numpy.unpackbits(numpy.frombuffer(chunk.buffers()[1],
+                                             dtype=numpy.uint8),
+                            bitorder='little')
+    return bits[chunk.offset:(chunk.offset + len(chunk))]
+
+
+def _chunks(obj):
+    if isinstance(obj, pyarrow.ChunkedArray):
+        return obj.chunks
+    return (obj, )
+
+
+def _fill(sexptype, chunks, length, values):
+    """ Allocate an R vector of type `sexptype` and copy into it
+    the values of the Arrow arrays in `chunks` (one after the other),
+    as returned by the function `values`. Null items are R's NA. """
+    res = _new_vector(sexptype, length)
+    view = numpy.asarray(res)
+    offset = 0
+    for chunk in chunks:
+        n = len(chunk)
+        if n == 0:
+            continue
+        dest = view[offset:(offset + n)]
+        dest[:] = values(chunk)
+        mask = _null_mask(chunk)
+        if mask is not None:
+            dest[mask] = _NA[sexptype]
+        offset += n
+    return res
+
+
+def _py2ri_dictionary(chunks, length, arrow_type):
+    # The chunks can have different dictionaries. The levels of the factor
+    # are all the values in them, in the order they are met.
+    levels = list()
+    positions = dict()
+    res = _new_vector(INTSXP, length)
+    view = numpy.asarray(res)
+    offset = 0
+    for chunk in chunks:
+        dictionary = chunk.dictionary.to_pylist()
+        remap = numpy.zeros(max(len(dictionary), 1), dtype='i4')
+        for i, level in enumerate(dictionary):
+            if not isinstance(level, str):
+                raise ValueError('Converting Arrow dictionary arrays to R '
+                                 'factors is only possible when the '
+                                 'dictionary values are strings.')
+            if level not in positions:
+                positions[level] = len(levels)
+                levels.append(level)
+            remap[i] = positions[level] + 1
+        n = len(chunk)
+        if n == 0:
+            continue
+        indices = chunk.indices
+        codes = _values(indices, indices.type.to_pandas_dtype())
+        mask = _null_mask(indices)
+        dest = view[offset:(offset + n)]
+        if mask is None:
+            dest[:] = remap[codes]
+        else:
+            # the indices for null items can be anything
+            dest[:] = remap[numpy.where(mask, 0, codes)]
+            dest[mask] = NA_Integer
+        offset += n
+    res.do_slot_assign('levels', StrSexpVector(levels))
+    if arrow_type.ordered:
+        res.do_slot_assign('class', StrSexpVector(('ordered', 'factor')))
+    else:
+        res.do_slot_assign('class', StrSexpVector(('factor', )))
+    return res
+
+
+@py2ri.register(pyarrow.Array)
+@py2ri.register(pyarrow.ChunkedArray)
+def py2ri_array(obj):
+    """ Return an R vector for the Arrow array `obj`. """
+    arrow_type = obj.type
+    chunks = _chunks(obj)
+    length = len(obj)
+    if pyarrow.types.is_dictionary(arrow_type):
+        return _py2ri_dictionary(chunks, length, arrow_type)
+    if (pyarrow.types.is_string(arrow_type) or
+        pyarrow.types.is_large_string(arrow_type)):
+        # one R string for each item: done item by item
+        return StrSexpVector(tuple(NA_Character if x is None else x
+                                   for chunk in chunks
+                                   for x in chunk.to_pylist()))
+    if pyarrow.types.is_boolean(arrow_type):
+        return _fill(LGLSXP, chunks, length, _boolean_values)
+    if pyarrow.types.is_timestamp(arrow_type):
+        units = _timestamp_units[arrow_type.unit]
+        res = _fill(REALSXP, chunks, length,
+                    lambda chunk: _values(chunk, 'i8') / units)
+        res.do_slot_assign('class', StrSexpVector(('POSIXct', 'POSIXt')))
+        res.do_slot_assign('tzone',
+                           StrSexpVector((arrow_type.tz or 'UTC', )))
+        return res
+    if pyarrow.types.is_date32(arrow_type):
+        res = _fill(REALSXP, chunks, length,
+                    lambda chunk: _values(chunk, 'i4'))
+        res.do_slot_assign('class', StrSexpVector(('Date', )))
+        return res
+    if pyarrow.types.is_integer(arrow_type):
+        dtype = numpy.dtype(arrow_type.to_pandas_dtype())
+        # R's integers are signed 32-bit integers
+        if (dtype.itemsize < 4 or
+            (dtype.itemsize == 4 and dtype.kind == 'i')):
+            sexptype = INTSXP
+        else:
+            sexptype = REALSXP
+        return _fill(sexptype, chunks, length,
+                     lambda chunk: _values(chunk, dtype))
+    if pyarrow.types.is_floating(arrow_type):
+        dtype = numpy.dtype(arrow_type.to_pandas_dtype())
+        return _fill(REALSXP, chunks, length,
+                     lambda chunk: _values(chunk, dtype))
+    raise ValueError('Cannot convert Arrow arrays of type %s '
+                     'to R vectors.' % str(arrow_type))
+
+
+def _py2ri_columns(names, columns):
+    # The columns all have as many items as there are rows,
+    # and R's data.frame() (copying them) is not needed.
+    return DataFrame.from_columns(tuple((name, py2ri_array(column))
+                                        for name, column in
+                                        zip(names, columns)),
+                                  validate=False)
+
+@py2ri.register(pyarrow.Table)
+def py2ri_table(obj):
+    return _py2ri_columns(obj.column_names,
+                          (obj.column(i) for i in range(obj.num_columns)))
+
+@py2ri.register(pyarrow.RecordBatch)
+def py2ri_recordbatch(obj):
+    return _py2ri_columns(obj.schema.names, obj.columns)
+
+
+def _is_na_real(values):
+    # R's NA is a NaN with the value 1954 in its lower word
+    # (other NaN values are not missing values in R).
+    return (numpy.isnan(values) &
+            ((values.view('u8') & 0xFFFFFFFF) == 1954))
+
+def _mask_or_none(mask):
+    return mask if mask.any() else None
+
+@ri2py.register(FloatSexpVector)
+def ri2py_floatvector(obj):
+    values = numpy.asarray(obj)
+    mask = _is_na_real(values)
+    if 'POSIXct' in obj.rclass:
+        try:
+            tzone = obj.do_slot('tzone')[0]
+        except LookupError:
+            tzone = ''
+        microseconds = numpy.round(numpy.where(mask, 0, values) * 1e6)
+        return pyarrow.array(microseconds.astype('i8').view('M8[us]'),
+                             type=pyarrow.timestamp('us', tzone or None),
+                             mask=_mask_or_none(mask))
+    if 'Date' in obj.rclass:
+        days = numpy.where(mask, 0, values).astype('i4')
+        return pyarrow.array(days.view('M8[D]'),
+                             type=pyarrow.date32(),
+                             mask=_mask_or_none(mask))
+    return pyarrow.array(values, type=pyarrow.float64(),
+                         mask=_mask_or_none(mask))
+
+@ri2py.register(IntSexpVector)
+def ri2py_intvector(obj):
+    values = numpy.asarray(obj)
+    mask = values == NA_Integer
+    if 'factor' in obj.rclass:
+        codes = pyarrow.array(numpy.where(mask, 1, values) - 1,
+                              type=pyarrow.int32(),
+                              mask=_mask_or_none(mask))
+        levels = pyarrow.array(tuple(obj.do_slot('levels')),
+                               type=pyarrow.string())
+        return pyarrow.DictionaryArray.from_arrays(
+            codes, levels, ordered='ordered' in obj.rclass)
+    return pyarrow.array(values, type=pyarrow.int32(),
+                         mask=_mask_or_none(mask))
+
+@ri2py.register(BoolSexpVector)
+def ri2py_boolvector(obj):
+    values = numpy.asarray(obj)
+    mask = values == NA_Integer
+    return pyarrow.array(values != 0, type=pyarrow.bool_(),
+                         mask=_mask_or_none(mask))
+
+@ri2py.register(StrSexpVector)
+def ri2py_strvector(obj):
+    return pyarrow.array(tuple(None if x is NA_Character else x
+                               for x in obj),
+                         type=pyarrow.string())
+
+@ri2py.register(ListSexpVector)
+def ri2py_listvector(obj):
+    if 'data.frame' in obj.rclass:
+        names = obj.do_slot('names')
+        return pyarrow.Table.from_arrays(
+            [ri2py(column) for column in ListSexpVector(obj)],
+            names=list(names))
+    return ro.default_converter.ri2py(obj)
@@ -7,13 +7,23 @@ raising a NotImplementedError exception.
 """
 
 import sys
+import threading
+import weakref
 from collections import namedtuple
+from operator import attrgetter
+from types import MappingProxyType
 
 if sys.version_info[0] < 3 or (sys.version_info[0] == 3 and sys.version_info[1] < 4):
     from singledispatch import singledispatch
 else:
     from functools import singledispatch
 
+try:
+    import contextvars
+except ImportError:
+    # Python < 3.7
+    contextvars = None
+
 def overlay_converter(src, target):
     """
     :param src: source of additional conversion rules
@@ -75,6 +85,101 @@ def _ri2py(obj):
     raise NotImplementedError("Conversion 'ri2py' not defined for objects of type '%s'" % str(type(obj)))
 
 
+class _CachedDispatch(object):
+    """
+    Single-dispatch generic function (see :func:`functools.singledispatch`)
+    with a cache of the implementation for each exact type of
+    object.
+
+    The generic function can be layered on other ones (`bases`): its
+    rules are the rules of the bases (in order, a later base taking
+    precedence over an earlier one), then its own rules. Nothing is copied
+    when layering; a generic function without rules of its own and with one
+    base delegates to it (sharing its cache). The caches are cleared
+    whenever an implementation is registered in a layer below.
+
+    Looking up an implementation missing from the cache, and
+    registering one, are done while holding a lock shared by all the
+    generic functions (the layers of a generic function can be shared).
+    """
+
+    _lock = threading.RLock()
+
+    def __init__(self, func, bases=()):
+        self._func = func
+        self._bases = tuple(bases)
+        self._registry = dict()
+        self._dispatch = None
+        self._cache = dict()
+        self._dependents = weakref.WeakSet()
+        for base in self._bases:
+            base._dependents.add(self)
+        self.__doc__ = func.__doc__
+        self.__name__ = func.__name__
+
+    @property
+    def registry(self):
+        """ Mapping class -> implementation (the rules in all layers). """
+        res = {object: self._func}
+        for base in self._bases:
+            for k, v in base.registry.items():
+                # skip the root dispatch
+                if k is object and v is self._func:
+                    continue
+                res[k] = v
+        res.update(self._registry)
+        return MappingProxyType(res)
+
+    def _invalidate(self):
+        self._dispatch = None
+        self._cache.clear()
+        for dependent in tuple(self._dependents):
+            dependent._invalidate()
+
+    def register(self, cls, func=None):
+        """ Register `func` as the implementation for `cls` (can be used
+        as a decorator when `func` is omitted). """
+        if func is None:
+            return lambda f: self.register(cls, f)
+        with self._lock:
+            self._registry[cls] = func
+            self._invalidate()
+        return func
+
+    def _build(self):
+        registry = self.registry
+        res = singledispatch(registry[object])
+        for k, v in registry.items():
+            if k is not object:
+                res.register(k, v)
+        return res
+
+    def dispatch(self, cls):
+        """ Return the implementation for the type `cls`. """
+        try:
+            return self._cache[cls]
+        except KeyError:
+            pass
+        with self._lock:
+            if len(self._bases) == 1 and len(self._registry) == 0:
+                func = self._bases[0].dispatch(cls)
+            else:
+                dispatcher = self._dispatch
+                if dispatcher is None:
+                    dispatcher = self._build()
+                    self._dispatch = dispatcher
+                func = dispatcher.dispatch(cls)
+            self._cache[cls] = func
+        return func
+
+    def __call__(self, obj, *args, **kwargs):
+        try:
+            func = self._cache[obj.__class__]
+        except KeyError:
+            func = self.dispatch(obj.__class__)
+        return func(obj, *args, **kwargs)
+
+
 class Converter(object):
     """
     Conversion between rpy2's low-level and high-level proxy objects
@@ -83,6 +188,13 @@ class Converter(object):
     Converter objects can be added, the result being
     a Converter objects combining the translation rules from the
     different converters.
+
+    A converter created from a template, or by adding converters,
+    is layered on them rather than a copy: rules registered later in
+    the template (or in the converters added) are visible through it.
+    The sum of two converters is memoized (the same converter is
+    returned for `a + b` while `b` exists), unless rules were registered
+    in the sum itself.
     """
     name = property(lambda self: self._name)
     ri2ro = property(lambda self: self._ri2ro)
@@ -93,36 +205,68 @@ class Converter(object):
     
     def __init__(self, name,
                  template=None):
-        (ri2ro, py2ri, py2ro, ri2py) = Converter.make_dispatch_functions()
-        self._name = name
-        self._ri2ro = ri2ro
-        self._py2ri = py2ri
-        self._py2ro = py2ro
-        self._ri2py = ri2py
-
         if template is None:
+            templates = tuple()
             lineage = tuple()
         else:
+            templates = (template, )
             lineage = list(template.lineage)
             lineage.append(name)
             lineage = tuple(lineage)
-            overlay_converter(template, self)
+        self._init(name, templates, lineage)
+
+    def _init(self, name, templates, lineage):
+        (ri2ro, py2ri, py2ro, ri2py) = \
+            Converter.make_dispatch_functions(templates)
+        self._name = name
+        self._ri2ro = ri2ro
+        self._py2ri = py2ri
+        self._py2ro = py2ro
+        self._ri2py = ri2py
         self._lineage = lineage
+        # converter -> self + converter
+        self._sums = weakref.WeakKeyDictionary()
+        self._context_layer = None
+
+    def _has_own_rules(self):
+        return any(len(x._registry) > 0
+                   for x in (self._ri2ro, self._py2ri,
+                             self._py2ro, self._ri2py))
 
     def __add__(self, converter):
         assert isinstance(converter, Converter)
+        result_converter = self._sums.get(converter)
+        if result_converter is not None and \
+           not result_converter._has_own_rules():
+            return result_converter
         new_name = '%s + %s' % (self.name, converter.name)
-        # create a copy of `self` as the result converter
-        result_converter = Converter(new_name, template=self)
-        overlay_converter(converter, result_converter)
+        # the result converter is layered on `self` and `converter`
+        # (the rules in `converter` taking precedence): nothing is copied,
+        # and the rules registered later in them are visible in the sum
+        result_converter = Converter.__new__(Converter)
+        lineage = list(self.lineage)
+        lineage.append(new_name)
+        result_converter._init(new_name, (self, converter), tuple(lineage))
+        self._sums[converter] = result_converter
         return result_converter
+
+    def _in_context(self):
+        # Converter layered on self, for localconverter blocks (the rules
+        # registered in a block do not change self). It is reused by the
+        # following blocks, with its caches, unless rules were registered
+        # in it.
+        res = self._context_layer
+        if res is None or res._has_own_rules():
+            res = Converter('%s (in context)' % self.name, template=self)
+            self._context_layer = res
+        return res
     
     @staticmethod
-    def make_dispatch_functions():
-        ri2ro = singledispatch(_ri2ro)
-        py2ri = singledispatch(_py2ri)
-        py2ro = singledispatch(_py2ro)
-        ri2py = singledispatch(_ri2py)
+    def make_dispatch_functions(templates=()):
+        ri2ro = _CachedDispatch(_ri2ro, tuple(x.ri2ro for x in templates))
+        py2ri = _CachedDispatch(_py2ri, tuple(x.py2ri for x in templates))
+        py2ro = _CachedDispatch(_py2ro, tuple(x.py2ro for x in templates))
+        ri2py = _CachedDispatch(_ri2py, tuple(x.ri2py for x in templates))
 
         return (ri2ro, py2ri, py2ro, ri2py)
 
@@ -130,40 +274,130 @@ class Converter(object):
 class ConversionContext(object):
     """
     Context manager for instances of class Converter.
+
+    The converter is active in the current context only: in the current
+    thread, or the current :mod:`asyncio` task (and in the tasks
+    created from it while it is active).
     """
     def __init__(self, ctx_converter):
         assert isinstance(ctx_converter, Converter)
-        self._original_converter = converter
-        self.ctx_converter = Converter('Converter-%i-in-context' % id(self),
-                                       template=ctx_converter)
+        self.ctx_converter = ctx_converter._in_context()
 
     def __enter__(self):
-        set_conversion(self.ctx_converter)
+        # The tokens are kept in the current context (rather than in the
+        # instance), so that an instance can be entered in several
+        # threads or tasks at once, or recursively.
+        token = _converter_ctx.set(self.ctx_converter)
+        _converter_tokens.set(_converter_tokens.get() + (token, ))
+        _set_converter_attribute()
         return self.ctx_converter
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        set_conversion(self._original_converter)
+        tokens = _converter_tokens.get()
+        _converter_tokens.set(tokens[:-1])
+        _converter_ctx.reset(tokens[-1])
+        _set_converter_attribute()
         return False
 
 localconverter = ConversionContext
-    
-converter = None
-py2ri = None
-py2ro = None
-ri2ro = None
-ri2py = None
+
+
+class _ThreadLocalVar(threading.local):
+    """ Stand-in for :class:`contextvars.ContextVar` on Python < 3.7:
+    the value is local to the current thread. """
+
+    def __init__(self, default=None):
+        self.value = default
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        token = self.value
+        self.value = value
+        return token
+
+    def reset(self, token):
+        self.value = token
+
+# Converter active in the current context (set in localconverter blocks,
+# and inherited by the asyncio tasks created in them). Contexts without
+# one use the converter for the whole process. The tokens restoring the
+# previous converter at the end of the localconverter blocks are kept as
+# a stack in the context as well.
+if contextvars is None:
+    _converter_ctx = _ThreadLocalVar()
+    _converter_tokens = _ThreadLocalVar(default=())
+else:
+    _converter_ctx = contextvars.ContextVar('rpy2_converter', default=None)
+    _converter_tokens = contextvars.ContextVar('rpy2_converter_tokens',
+                                               default=())
+_process_converter = None
+
+def _set_converter_attribute():
+    # Python < 3.7 has no module-level __getattr__ (PEP 562): the module
+    # attribute `converter` is set to the converter last made active.
+    if sys.version_info < (3, 7):
+        globals()['converter'] = get_conversion()
+
+def get_conversion():
+    """
+    Return the conversion rules active in the current context.
+    :rtype: :class:`Converter`
+    """
+    return _converter_ctx.get() or _process_converter
 
 def set_conversion(this_converter):
     """
     Set conversion rules in the conversion module.
+
+    In a context with its own conversion rules (within a
+    :func:`localconverter` block), the rules are set for that context
+    until the end of the block. Otherwise they are set for the whole
+    process (for all the threads without conversion rules of their own).
+
     :param this_converter: The conversion rules
     :type this_converter: :class:`Converter`
     """
-    global converter, py2ri, py2ro, ri2ro, ri2py
-    converter = this_converter
-    py2ri = converter.py2ri
-    py2ro = converter.py2ro
-    ri2ro = converter.ri2ro
-    ri2py = converter.ri2py
+    global _process_converter
+    if _converter_ctx.get() is None:
+        _process_converter = this_converter
+    else:
+        _converter_ctx.set(this_converter)
+    _set_converter_attribute()
+
+class _ContextDispatch(object):
+    """
+    Conversion function of the converter active in the current context
+    (see :func:`get_conversion`).
+    """
+
+    def __init__(self, name):
+        self._get = attrgetter(name)
+        self.__name__ = name
+
+    def __call__(self, obj, *args, **kwargs):
+        return self._get(_converter_ctx.get() or _process_converter)(
+            obj, *args, **kwargs)
+
+    registry = property(lambda self: self._get(get_conversion()).registry)
+
+    def register(self, cls, func=None):
+        return self._get(get_conversion()).register(cls, func)
+
+    def dispatch(self, cls):
+        return self._get(get_conversion()).dispatch(cls)
+
+py2ri = _ContextDispatch('py2ri')
+py2ro = _ContextDispatch('py2ro')
+ri2ro = _ContextDispatch('ri2ro')
+ri2py = _ContextDispatch('ri2py')
+
+def __getattr__(name):
+    # `converter` is the converter active in the current context
+    if name == 'converter':
+        return get_conversion()
+    raise AttributeError("module '%s' has no attribute '%s'" %
+                         (__name__, name))
 
 set_conversion(Converter('base converter'))
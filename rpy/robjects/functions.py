@@ -1,8 +1,10 @@
 import os, re
+import itertools
 from collections import OrderedDict
 from rpy2.robjects.robject import RObjectMixin, RObject
 import rpy2.rinterface as rinterface
 from rpy2.robjects import help
+from rpy2.rinterface import executor
 #import rpy2.robjects.conversion conversion
 from . import conversion
 # XXX: I need to import default_ri2ro
@@ -18,6 +20,13 @@ baseenv_ri = rinterface.baseenv
 #needed to avoid circular imports
 _reval = rinterface.baseenv['eval']
 
+# apply a function to a list of lists of arguments in R, with the
+# same named arguments `kw` for all calls
+# (quote=TRUE: symbols and language objects are not evaluated)
+_map_chunk = _reval(rinterface.parse('function(f, args, kw) '
+                                     'lapply(args, function(a) '
+                                     'do.call(f, c(a, kw), quote=TRUE))'))
+
 __formals = baseenv_ri.get('formals')
 __args = baseenv_ri.get('args')
 #_genericsargsenv = baseenv_ri['.GenericArgsEnv']
@@ -107,6 +116,43 @@ class Function(RObjectMixin, rinterface.SexpClosure):
         res = conversion.ri2ro(res)
         return res
 
+    def acall(self, *args, **kwargs):
+        """ Call the function in the thread of the default
+        :class:`rpy2.rinterface.executor.RExecutor` and return an
+        :class:`asyncio.Future` for the result (to be awaited from a
+        coroutine). The conversion of the arguments and of the result
+        is done in that thread as well. """
+        return executor.asyncio_submit(self, *args, **kwargs)
+
+    def map(self, iterable, chunk_size=1000, **kwargs):
+        """ Call the function for each item in `iterable` (a tuple with
+        the positional arguments for the call) and return an iterator over
+        the results. The named arguments in `kwargs` are passed to all
+        the calls. The items are sent to R in chunks of (at most)
+        `chunk_size` items, for which the calls are run in R (with
+        `lapply()`) in one evaluation. An error in R for any of the calls
+        in a chunk raises an exception for the whole chunk. """
+        if chunk_size < 1:
+            raise ValueError('chunk_size must be at least 1.')
+        kw = rinterface.ListSexpVector(
+            [conversion.py2ri(v) for v in kwargs.values()])
+        if len(kwargs) > 0:
+            kw.do_slot_assign('names',
+                              rinterface.StrSexpVector(tuple(kwargs.keys())))
+        return self._map(iter(iterable), chunk_size, kw)
+
+    def _map(self, iterator, chunk_size, kw):
+        while True:
+            chunk = tuple(itertools.islice(iterator, chunk_size))
+            if len(chunk) == 0:
+                break
+            args = rinterface.ListSexpVector(
+                [rinterface.ListSexpVector([conversion.py2ri(a)
+                                            for a in item])
+                 for item in chunk])
+            for res in _map_chunk(self, args, kw):
+                yield conversion.ri2ro(res)
+
     def formals(self):
         """ Return the signature of the underlying R function 
         (as the R function 'formals()' would).
@@ -115,6 +161,14 @@ class Function(RObjectMixin, rinterface.SexpClosure):
         res = conversion.ri2ro(res)
         return res
 
+    def prepare(self, *names):
+        """ Prepare a call to the function with a fixed signature, for
+        repeated calls. Each item in `names` is the name of an argument
+        in the call, or None for an unnamed argument. The R call is
+        built once and calling the returned :class:`PreparedCall` with
+        as many (positional) arguments only sets their values. """
+        return PreparedCall(self, names)
+
     def rcall(self, *args):
         """ Wrapper around the parent method rpy2.rinterface.SexpClosure.rcall(). """
         res = super(Function, self).rcall(*args)
@@ -124,6 +178,26 @@ class Function(RObjectMixin, rinterface.SexpClosure):
         # res = ro.default_ri2ro(res)
         return res
 
+class PreparedCall(object):
+    """ Call to an R function with a fixed signature (see
+    :meth:`Function.prepare`). The arguments are converted with
+    the active conversion, as is the result. """
+
+    def __init__(self, function, names):
+        self._function = function
+        self._names = tuple(names)
+        self._call = rinterface.SexpClosure.prepare(function, self._names)
+
+    function = property(lambda self: self._function, None, None,
+                        "The function called.")
+
+    names = property(lambda self: self._names, None, None,
+                     "Names of the arguments (None for unnamed arguments).")
+
+    def __call__(self, *args):
+        res = self._call(*[conversion.py2ri(a) for a in args])
+        return conversion.ri2ro(res)
+
 class SignatureTranslatedFunction(Function):
     """ Python representation of an R function, where
     the names in named argument are translated to valid
@@ -177,6 +251,19 @@ class SignatureTranslatedFunction(Function):
                 kwargs[r_k] = v
         return super(SignatureTranslatedFunction, self).__call__(*args, **kwargs)
 
+    def prepare(self, *names):
+        prm_translate = self._prm_translate
+        names = tuple(None if k is None else prm_translate.get(k, k)
+                      for k in names)
+        return super(SignatureTranslatedFunction, self).prepare(*names)
+
+    def map(self, iterable, chunk_size=1000, **kwargs):
+        prm_translate = self._prm_translate
+        kwargs = dict((prm_translate.get(k, k), v)
+                      for k, v in kwargs.items())
+        return super(SignatureTranslatedFunction, self).map(
+            iterable, chunk_size=chunk_size, **kwargs)
+
 pattern_link = re.compile(r'\\link\{(.+?)\}')
 pattern_code = re.compile(r'\\code\{(.+?)\}')
 pattern_samp = re.compile(r'\\samp\{(.+?)\}')
@@ -6,8 +6,10 @@ from rpy2.rinterface import (Sexp,
                              ListSexpVector,
                              StrSexpVector, ByteSexpVector,
                              LGLSXP, INTSXP, REALSXP, CPLXSXP,
-                             STRSXP, VECSXP, NULL)
+                             STRSXP, VECSXP, NULL,
+                             NA_Integer)
 import numpy
+import warnings
 
 #from rpy2.robjects.vectors import DataFrame, Vector, ListVector
 
@@ -34,6 +36,9 @@ _kinds = {
 #       32bits architectures
 _kinds['float64'] = rinterface.REALSXP
 
+# Kinds for which the array buffer can be copied directly into R
+_buffer_kinds = ('b', 'i', 'f', 'c')
+
 _vectortypes = (rinterface.LGLSXP,
                 rinterface.INTSXP,
                 rinterface.REALSXP,
@@ -65,6 +70,26 @@ else:
             res = conversion.py2ri(list(o))
         return res
     
+def _numpy2ri_sequence(o):
+    # "F" means "use column-major order"
+    vec = SexpVector(o.ravel("F"), _kinds[o.dtype.kind])
+    dim = SexpVector(o.shape, INTSXP)
+    #FIXME: no dimnames ?
+    res = rinterface.baseenv['array'](vec, dim=dim)
+    return res
+
+def _vector_frombuffer(o, setdim=False):
+    # Integers that do not fit in an R integer make a vector of doubles.
+    try:
+        return rinterface.vector_frombuffer(o, _kinds[o.dtype.kind],
+                                            setdim=setdim)
+    except OverflowError:
+        if o.dtype.kind != 'i':
+            raise
+        warnings.warn('The integers in the numpy array do not all fit in '
+                      'an R integer: they are converted to doubles.')
+        return rinterface.vector_frombuffer(o, REALSXP, setdim=setdim)
+
 @py2ri.register(numpy.ndarray)
 def numpy2ri(o):
     """ Augmented conversion function, converting numpy arrays into
@@ -73,13 +98,16 @@ def numpy2ri(o):
         raise(ValueError("Cannot pass numpy arrays with non-native byte orders at the moment."))
 
     # Most types map onto R arrays:
-    if o.dtype.kind in _kinds:
-        # "F" means "use column-major order"
-        vec = SexpVector(o.ravel("F"), _kinds[o.dtype.kind])
-        dim = SexpVector(o.shape, INTSXP)
-        #FIXME: no dimnames ?
-        #FIXME: optimize what is below needed/possible ? (other ways to create R arrays ?)
-        res = rinterface.baseenv['array'](vec, dim=dim)
+    if o.dtype.kind in _buffer_kinds:
+        # The array is copied into an R array (with its "dim" attribute)
+        # straight from its buffer.
+        try:
+            res = _vector_frombuffer(o, setdim=True)
+        except TypeError:
+            # items not directly usable by R (e.g., float16)
+            res = _numpy2ri_sequence(o)
+    elif o.dtype.kind in _kinds:
+        res = _numpy2ri_sequence(o)
     # R does not support unsigned types:
     elif o.dtype.kind == "u":
         raise(ValueError("Cannot convert numpy array of unsigned values -- R does not have unsigned integers."))
@@ -128,6 +156,16 @@ def numpy2ro(obj):
     res = numpy2ri(obj)
     return ro.vectors.rtypeof2rotype[res.typeof](res)
 
+def ri2py_factor_levels(obj):
+    """ Return a numpy array of objects with the level (a string) for each
+    item in the R factor `obj`, or None for NA. The levels are looked up
+    from the integer codes in one vectorized operation. """
+    levels = numpy.empty(len(obj.do_slot('levels')) + 1, dtype=object)
+    levels[:-1] = tuple(obj.do_slot('levels'))
+    codes = numpy.asarray(obj)
+    # NA maps to the last level: None
+    return levels[numpy.where(codes == NA_Integer, 0, codes) - 1]
+
 @ri2py.register(ListSexpVector)
 def ri2py_list(obj):
     if 'data.frame' in obj.rclass:
@@ -140,8 +178,7 @@ def ri2py_list(obj):
         # level return numpy arrays
         for column in rinterface.ListSexpVector(obj):
             if 'factor' in column.rclass:
-                levels = tuple(column.do_slot("levels"))
-                column = tuple(levels[x-1] for x in column)
+                column = ri2py_factor_levels(column)
             o2.append(column)
         names = obj.do_slot('names')
         if names is NULL:
@@ -153,9 +190,36 @@ def ri2py_list(obj):
         res = ro.default_converter.ri2py(obj)
     return res
 
+# R types for which a numpy array can share the memory of the R vector
+_view_types = (rinterface.LGLSXP,
+               rinterface.INTSXP,
+               rinterface.REALSXP,
+               rinterface.CPLXSXP)
+
+def ri2py_view(obj):
+    """ Return a numpy array that is a view on the items of the R vector
+    `obj` (of type LGLSXP, INTSXP, REALSXP, or CPLXSXP): no copy is made.
+
+    The array keeps a reference to `obj`, so the R vector stays alive
+    (protected from R's garbage collection) for as long as the array, or
+    any other array derived from it, is in use. Modifying the array
+    modifies the R vector.
+
+    R arrays (vectors with a "dim" attribute) give arrays with the same
+    shape in FORTRAN order. R logical vectors use 32-bit integers, and the
+    array is of dtype int32 (0 for FALSE, 1 for TRUE, and the minimum
+    32-bit integer for NA).
+    """
+    if obj.typeof not in _view_types:
+        raise ValueError('Only R vectors of type LGLSXP, INTSXP, '
+                         'REALSXP, or CPLXSXP can be viewed as arrays.')
+    return numpy.asarray(obj)
+
 @ri2py.register(Sexp)
 def ri2py_sexp(obj):
-    if (obj.typeof in _vectortypes) and (obj.typeof != VECSXP):
+    if obj.typeof in _view_types:
+        res = ri2py_view(obj)
+    elif (obj.typeof in _vectortypes) and (obj.typeof != VECSXP):
         res = numpy.asarray(obj)
     else:
         res = ro.default_converter.ri2py(obj)
@@ -168,7 +232,7 @@ def activate():
     if original_converter is not None:
         return
 
-    original_converter = conversion.converter
+    original_converter = conversion.get_conversion()
     new_converter = conversion.Converter('numpy conversion',
                                          template=original_converter)
 
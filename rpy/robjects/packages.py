@@ -164,6 +164,8 @@ class Package(ModuleType):
     __update_dict__ = None
     _exported_names = None
     _symbol_r2python = None
+    _on_conflict = None
+    _lazy = False
     __version__ = None
     __rdata__ = None
 
@@ -171,7 +173,8 @@ class Package(ModuleType):
                  exported_names = None, on_conflict = 'fail',
                  version = None,
                  symbol_r2python = default_symbol_r2python,
-                 symbol_check_after = default_symbol_check_after):
+                 symbol_check_after = default_symbol_check_after,
+                 lazy = False):
         """ Create a Python module-like object from an R environment,
         using the specified translation if defined. 
 
@@ -186,6 +189,8 @@ class Package(ModuleType):
                            The default translate `.` into `_`.
         - symbol_check_after: function to check the Python symbols obtained
                               from `symbol_r2python`.
+        - lazy: only map the Python symbols to the R symbols, and fetch
+                (and convert) the R objects on first access (default: False)
         """
 
         super(Package, self).__init__(name)
@@ -199,6 +204,7 @@ class Package(ModuleType):
         self._exported_names = exported_names
         self._symbol_r2python = symbol_r2python
         self._symbol_check_after = symbol_check_after
+        self._lazy = lazy
         self.__fill_rpy2r__(on_conflict = on_conflict)
         self._exported_names = self._exported_names.difference(mynames)
         self.__version__ = version
@@ -206,7 +212,8 @@ class Package(ModuleType):
     def __update_dict__(self, on_conflict = 'fail'):
         """ Update the __dict__ according to what is in the R environment """
         for elt in self._rpy2r:
-            del(self.__dict__[elt])
+            # with lazy packages, objects not accessed yet are not there
+            self.__dict__.pop(elt, None)
         self._rpy2r.clear()
         self.__fill_rpy2r__(on_conflict = on_conflict)
 
@@ -219,6 +226,7 @@ class Package(ModuleType):
         assert(on_conflict in ('fail', 'warn'))
 
         name = self.__rname__
+        self._on_conflict = on_conflict
 
         (symbol_mapping, 
          conflicts, 
@@ -251,16 +259,43 @@ class Package(ModuleType):
             if (rpyname != rname) and (rname in self._exported_names):
                 self._exported_names.remove(rname)
                 self._exported_names.add(rpyname)
+            if self._lazy:
+                # the object is fetched by __getattr__()
+                continue
             try:
-                riobj = self._env[rname]
+                rpyobj = self.__fetch__(rname)
             except rinterface.RRuntimeError as rre:
                 warn(str(rre))
-            rpyobj = conversion.ri2ro(riobj)
-            if hasattr(rpyobj, '__rname__'):
-                rpyobj.__rname__ = rname
+                continue
             #FIXME: shouldn't the original R name be also in the __dict__ ?
             self.__dict__[rpyname] = rpyobj
 
+    def __fetch__(self, rname):
+        """ Return the Python object for the R object `rname`
+        in the environment. """
+        riobj = self._env[rname]
+        rpyobj = conversion.ri2ro(riobj)
+        if hasattr(rpyobj, '__rname__'):
+            rpyobj.__rname__ = rname
+        return rpyobj
+
+    def __getattr__(self, name):
+        # Only called when the attribute is not found otherwise, that is
+        # for objects in lazy packages that were not accessed yet.
+        rpy2r = self.__dict__.get('_rpy2r')
+        if rpy2r is None or name not in rpy2r:
+            raise AttributeError("module '%s' has no attribute '%s'" %
+                                 (self.__name__, name))
+        rpyobj = self.__fetch__(rpy2r[name])
+        self.__dict__[name] = rpyobj
+        return rpyobj
+
+    def __dir__(self):
+        res = set(super(Package, self).__dir__())
+        if self._rpy2r is not None:
+            res.update(self._rpy2r)
+        return sorted(res)
+
     def __repr__(self):
         s = super(Package, self).__repr__()
         return 'rpy2.robjects.packages.Package as a ' + s
@@ -272,14 +307,14 @@ class SignatureTranslatedPackage(Package):
     """ R package in which the R functions had their signatures 
     'translated' (that this the named parameters were made to 
     to conform Python's rules for vaiable names)."""
-    def __fill_rpy2r__(self, on_conflict = 'fail'):
-        super(SignatureTranslatedPackage, self).__fill_rpy2r__(on_conflict = on_conflict)
-        for name, robj in self.__dict__.items():
-            if isinstance(robj, rinterface.Sexp) and robj.typeof == rinterface.CLOSXP:
-                self.__dict__[name] = STF(self.__dict__[name],
-                                          on_conflict = on_conflict,
-                                          symbol_r2python = self._symbol_r2python,
-                                          symbol_check_after = self._symbol_check_after)
+    def __fetch__(self, rname):
+        robj = super(SignatureTranslatedPackage, self).__fetch__(rname)
+        if isinstance(robj, rinterface.Sexp) and robj.typeof == rinterface.CLOSXP:
+            robj = STF(robj,
+                       on_conflict = self._on_conflict,
+                       symbol_r2python = self._symbol_r2python,
+                       symbol_check_after = self._symbol_check_after)
+        return robj
 
 # alias
 STP = SignatureTranslatedPackage
@@ -309,12 +344,11 @@ class InstalledSTPackage(SignatureTranslatedPackage):
                 doc.append('[R help was not found]')
         return os.linesep.join(doc)
 
-    def __fill_rpy2r__(self, on_conflict = 'fail'):
-        super(SignatureTranslatedPackage, self).__fill_rpy2r__(on_conflict = on_conflict)
-        for name, robj in self.__dict__.items():
-            if isinstance(robj, rinterface.Sexp) and robj.typeof == rinterface.CLOSXP:
-                self.__dict__[name] = DocumentedSTFunction(self.__dict__[name],
-                                                           packagename = self.__rname__)
+    def __fetch__(self, rname):
+        robj = super(SignatureTranslatedPackage, self).__fetch__(rname)
+        if isinstance(robj, rinterface.Sexp) and robj.typeof == rinterface.CLOSXP:
+            robj = DocumentedSTFunction(robj, packagename = self.__rname__)
+        return robj
 
 
 class InstalledPackage(Package):
@@ -343,6 +377,8 @@ class WeakPackage(Package):
     
     def __getattr__(self, name):
         res =self.__dict__.get(name)
+        if res is None and name in (self._rpy2r or ()):
+            res = super(WeakPackage, self).__getattr__(name)
         if res is None:
             warnings.warn("The symbol '%s' is not in this R namespace/package." % name)
         return res
@@ -407,7 +443,8 @@ def importr(name,
             on_conflict = 'fail',
             symbol_r2python = default_symbol_r2python,
             symbol_check_after = default_symbol_check_after,
-            data = True):
+            data = True,
+            lazy = False):
     """ Import an R package.
 
     Arguments:
@@ -433,6 +470,10 @@ def importr(name,
     - data: embed a PackageData objects under the attribute 
       name __rdata__ (default: True)
 
+    - lazy: only map the Python symbols to the R symbols when importing,
+      and fetch the R objects (and make the Python objects for them) on
+      first access. `dir()` lists all symbols. (default: False)
+
     Return:
 
     - an instance of class SignatureTranslatedPackage, or of class Package 
@@ -465,14 +506,16 @@ def importr(name,
                                   on_conflict = on_conflict,
                                   version = version,
                                   symbol_r2python = symbol_r2python,
-                                  symbol_check_after = symbol_check_after)
+                                  symbol_check_after = symbol_check_after,
+                                  lazy = lazy)
     else:
         pack = InstalledPackage(env, name, translation = robject_translations,
                                 exported_names = exported_names,
                                 on_conflict = on_conflict,
                                 version = version,
                                 symbol_r2python = symbol_r2python,
-                                symbol_check_after = symbol_check_after)
+                                symbol_check_after = symbol_check_after,
+                                lazy = lazy)
     if data:
         if pack.__rdata__ is not None:
             warn('While importing the R package "%s", the rpy2 Package object is masking a translated R symbol "__rdata__" already present' % name)
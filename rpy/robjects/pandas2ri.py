@@ -1,13 +1,14 @@
 import os
 import pytz
-from datetime import datetime
+import dateutil.tz
 import rpy2.robjects as ro
 import rpy2.robjects.conversion as conversion
 import rpy2.rinterface as rinterface
 from rpy2.rinterface import (SexpVector,
                              StrSexpVector,
                              IntSexpVector,
-                             INTSXP)
+                             INTSXP,
+                             NA_Integer)
 
 from pandas.core.frame import DataFrame as PandasDataFrame
 from pandas.core.series import Series as PandasSeries
@@ -53,15 +54,24 @@ def py2ri_pandasdataframe(obj):
     od = OrderedDict()
     for name, values in obj.iteritems():
         try:
-            od[name] = conversion.py2ri(values)
+            od[str(name)] = py2ri_seriesvalues(values)
         except Exception as e:
             warnings.warn('Error while trying to convert '
                           'the column "%s". Fall back to string conversion. '
                           'The error is: %s' %\
                           (name, str(e)))
-            od[name] = StrVector(values)
-        
-    return DataFrame(od)
+            od[str(name)] = StrVector(values)
+    # The columns all have as many items as there are rows in obj,
+    # and R's data.frame() (copying them) is not needed. R's row names
+    # must be unique: as data.frame() does, a duplicated index falls back
+    # to the row numbers.
+    if obj.index.is_unique:
+        row_names = tuple(str(x) for x in obj.index)
+    else:
+        row_names = None
+    return DataFrame.from_columns(od,
+                                  row_names=row_names,
+                                  validate=False)
 
 @py2ri.register(PandasIndex)
 def py2ri_pandasindex(obj):
@@ -80,31 +90,65 @@ def py2ri_categoryseries(obj):
     for c in obj.cat.categories:
         if not isinstance(c, str):
             raise ValueError('Converting pandas "Category" series to R factor is only possible when categories are strings.')
-    res = IntSexpVector(list(x+1 for x in obj.cat.codes))
+    # codes are shifted to R's 1-based codes, and -1 (missing) maps to NA
+    codes = numpy.asarray(obj.cat.codes)
+    res = codes.astype('i4') + 1
+    res[codes < 0] = NA_Integer
+    res = IntSexpVector(res)
     res.do_slot_assign('levels', StrSexpVector(obj.cat.categories))
     if obj.cat.ordered:
-        res.rclass = StrSexpVector('ordered', 'factor')
+        res.rclass = StrSexpVector(('ordered', 'factor'))
     else:
-        res.rclass = StrSexpVector('factor')
+        res.rclass = StrSexpVector(('factor', ))
     return res
 
-@py2ri.register(PandasSeries)
-def py2ri_pandasseries(obj):
+def py2ri_datetime64(obj):
+    """ Return an R vector of class POSIXct for the pandas Series `obj`
+    of dtype datetime64[ns] (with or without a time zone).
+
+    The nanoseconds since epoch (UTC) are turned into seconds in one
+    vectorized operation. Dates without a time zone are wall-clock times
+    in R's local time zone: their fields are passed to R's ISOdatetime()
+    (one vector for each field). """
+    tz = getattr(obj.dtype, 'tz', None)
+    if tz is None:
+        idx = pandas.DatetimeIndex(obj)
+        seconds = (numpy.asarray(idx.second, dtype='f8') +
+                   numpy.asarray(idx.microsecond, dtype='f8') / 1e6 +
+                   numpy.asarray(idx.nanosecond, dtype='f8') / 1e9)
+        # NaT fields are NaN, and the dates NA
+        fields = [FloatSexpVector(numpy.asarray(x, dtype='f8'))
+                  for x in (idx.year, idx.month, idx.day,
+                            idx.hour, idx.minute)]
+        fields.append(FloatSexpVector(seconds))
+        return ISOdatetime(*fields)
+    tzone = getattr(tz, 'zone', None) or str(tz)
+    # the values of a series with a time zone are in UTC
+    ns = numpy.asarray(obj.values, dtype=dt_datetime64ns_type).view('i8')
+    seconds = ns / 1e9
+    seconds[ns == numpy.iinfo('i8').min] = numpy.nan # NaT
+    res = FloatSexpVector(seconds)
+    res.do_slot_assign('class', StrSexpVector(('POSIXct', 'POSIXt')))
+    res.do_slot_assign('tzone', StrSexpVector((tzone, )))
+    return res
+
+def py2ri_seriesvalues(obj):
+    """ Return an R vector for the values in the pandas Series `obj`
+    (without its index). """
     if obj.dtype.name == 'category':
         res = py2ri_categoryseries(obj)
         res = FactorVector(res)
-    elif obj.dtype == dt_datetime64ns_type:
+    elif obj.dtype.kind == 'M':
         # time series
-        d = [IntVector([x.year for x in obj]),
-             IntVector([x.month for x in obj]),
-             IntVector([x.day for x in obj]),
-             IntVector([x.hour for x in obj]),
-             IntVector([x.minute for x in obj]),
-             IntVector([x.second for x in obj])]
-        res = ISOdatetime(*d)
-        #FIXME: can the POSIXct be created from the POSIXct constructor ?
-        # (is '<M8[ns]' mapping to Python datetime.datetime ?)
-        res = POSIXct(res)
+        res = POSIXct(py2ri_datetime64(obj))
+    elif (obj.ndim == 1 and isinstance(obj.dtype, numpy.dtype) and
+          obj.dtype.isnative and obj.dtype.kind in numpy2ri._buffer_kinds):
+        # copied from the buffer into an R vector (no "dim" attribute)
+        try:
+            res = numpy2ri._vector_frombuffer(numpy.asarray(obj))
+        except TypeError:
+            # items not directly usable by R (e.g., float16)
+            res = as_vector(numpy2ri.numpy2ri(numpy.asarray(obj)))
     else:
         # converted as a numpy array
         func = numpy2ri.converter.py2ri.registry[numpy.ndarray]
@@ -114,7 +158,11 @@ def py2ri_pandasseries(obj):
             if (obj.dtype != dt_O_type):
                 # force into an R vector
                 res=as_vector(res)
+    return res
 
+@py2ri.register(PandasSeries)
+def py2ri_pandasseries(obj):
+    res = py2ri_seriesvalues(obj)
     # "index" is equivalent to "names" in R
     if obj.ndim == 1:
         res.do_slot_assign('names',
@@ -129,13 +177,22 @@ def ri2py_vector(obj):
     res = numpy2ri.ri2py(obj)
     return res
     
+def ri2py_factor(obj):
+    """ Return a pandas.Categorical for the R factor `obj`, built from
+    its integer codes in one vectorized operation (NA becomes a missing
+    value). """
+    codes = numpy.asarray(obj)
+    res = codes - 1
+    res[codes == NA_Integer] = -1
+    return pandas.Categorical.from_codes(res,
+                                        categories = obj.do_slot('levels'),
+                                        ordered = 'ordered' in obj.rclass)
+
 @ri2py.register(IntSexpVector)
 def ri2py_intvector(obj):
     # special case for factors
     if 'factor' in obj.rclass:
-        res = pandas.Categorical.from_codes(numpy.asarray(obj) - 1,
-                                            categories = obj.do_slot('levels'),
-                                            ordered = 'ordered' in obj.rclass)
+        res = ri2py_factor(obj)
     else:
         res = numpy2ri.ri2py(obj)
     return res
@@ -162,19 +219,41 @@ def get_timezone():
     return timezone
 
 
+def ri2py_posixct(obj):
+    """ Return a pandas DatetimeIndex (with a time zone) for the R vector
+    `obj` of class POSIXct.
+
+    The seconds since epoch are turned into nanoseconds in one vectorized
+    operation. The time zone is the one in the R attribute "tzone",
+    or the system's time zone when R uses it implicitly. """
+    try:
+        tzone_name = obj.do_slot('tzone')[0]
+    except LookupError:
+        tzone_name = ''
+    if tzone_name == '':
+        # R is implicitly using the local timezone, while Python time libraries
+        # will assume UTC.
+        tzone = get_timezone()
+        if tzone is None:
+            tzone = dateutil.tz.tzlocal()
+    else:
+        tzone = tzone_name
+    seconds = numpy.asarray(obj, dtype='f8')
+    na = numpy.isnan(seconds)
+    # whole seconds and their fraction are converted separately
+    # to keep the precision R has (about a microsecond)
+    whole = numpy.floor(numpy.where(na, 0, seconds))
+    ns = (whole.astype('i8') * 1000000000 +
+          numpy.round((seconds - whole) * 1e9).astype('i8'))
+    ns[na] = numpy.iinfo('i8').min # NaT
+    res = pandas.DatetimeIndex(ns.view(dt_datetime64ns_type))
+    return res.tz_localize('UTC').tz_convert(tzone)
+
 @ri2py.register(FloatSexpVector)
 def ri2py_floatvector(obj):
     # special case for POSIXct date objects
     if 'POSIXct' in obj.rclass:
-        tzone_name = obj.do_slot('tzone')[0]
-        if tzone_name == '':
-            # R is implicitly using the local timezone, while Python time libraries
-            # will assume UTC.
-            tzone = get_timezone()
-        else:
-            tzone = pytz.timezone(tzone_name)
-        foo = (tzone.localize(datetime.fromtimestamp(x)) for x in obj)
-        res = pandas.to_datetime(tuple(foo))
+        res = ri2py_posixct(obj)
     else:
         res = numpy2ri.ri2py(obj)
     return res
@@ -187,16 +266,28 @@ def ri2py_listvector(obj):
         res = numpy2ri.ri2py(obj)
     return res
 
+def _ri2py_column(column):
+    if 'factor' in column.rclass:
+        return ri2py_factor(column)
+    if 'POSIXct' in column.rclass:
+        return ri2py_posixct(column)
+    return numpy2ri.ri2py(column)
+
 @ri2py.register(DataFrame)
 def ri2py_dataframe(obj):
-    # use the numpy converter
-    recarray = numpy2ri.ri2py(obj)
+    # Columns are converted one by one (numeric columns as numpy views
+    # on the R vectors, see numpy2ri.ri2py_view), without building
+    # an intermediate record array.
+    columns = OrderedDict((i, _ri2py_column(column))
+                          for i, column in enumerate(ListSexpVector(obj)))
     try:
         idx = numpy2ri.ri2py(obj.do_slot('row.names'))
     except LookupError as le:
         idx = None
-    res = PandasDataFrame.from_records(recarray,
-                                       index=idx)
+    res = PandasDataFrame(columns, index=idx, copy=False)
+    names = obj.do_slot('names')
+    if names is not rinterface.NULL:
+        res.columns = tuple(names)
     return res
 
 def activate():
@@ -205,11 +296,12 @@ def activate():
     if original_converter is not None: 
         return
 
-    original_converter = conversion.Converter('snapshot before pandas conversion',
-                                              template=conversion.converter)
+    # converters are layered on their template rather than copied:
+    # keep the active converter itself, to be restored by deactivate()
+    original_converter = conversion.get_conversion()
     numpy2ri.activate()
     new_converter = conversion.Converter('snapshot before pandas conversion',
-                                         template=conversion.converter)
+                                         template=conversion.get_conversion())
     numpy2ri.deactivate()
 
     for k,v in py2ri.registry.items():
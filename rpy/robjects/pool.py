@@ -0,0 +1,351 @@
+"""
+Pool of worker processes, each running its own embedded R.
+
+An embedded R is single-threaded. A :class:`RPool` starts worker
+processes that each initialize R, and runs calls to R functions in them
+in parallel. Arguments and results are sent between processes with
+:mod:`pickle`, that is R's own serialization for R objects
+(see :meth:`rpy2.rinterface.Sexp.__getstate__` and
+:func:`rpy2.rinterface.unserialize`).
+
+The function to call can be:
+
+- an R function (:class:`rpy2.robjects.functions.Function`, for example
+  one from a package imported with
+  :func:`rpy2.robjects.packages.importr`)
+
+- a string with R code evaluating to a function, evaluated in each
+  worker (for example `'stats::rnorm'` or `'function(x) x + 1'`)
+
+With `sharedmem_minlength`, the vectors of type REALSXP, INTSXP, or LGLSXP
+with at least that many items are sent through shared memory instead
+(see :mod:`rpy2.rinterface.sharedmem`).
+
+>>> from rpy2.robjects.pool import RPool
+>>> with RPool(processes=4) as pool:
+...     res = pool.map('function(i) sum(rnorm(1000))', range(100))
+
+"""
+
+import concurrent.futures
+import itertools
+import multiprocessing
+import threading
+
+import rpy2.rinterface as rinterface
+
+
+_sharedmem_minlength = None
+
+def _init_worker(initializer, initargs, sharedmem_minlength):
+    global _sharedmem_minlength
+    # The import of rpy2.robjects initializes R.
+    import rpy2.robjects
+    _sharedmem_minlength = sharedmem_minlength
+    if initializer is not None:
+        initializer(*initargs)
+
+
+_functions = {}
+
+def _resolve(function):
+    if isinstance(function, str):
+        import rpy2.robjects
+        res = _functions.get(function)
+        if res is None:
+            res = rpy2.robjects.r(function)
+            if not isinstance(res, rinterface.SexpClosure):
+                raise ValueError('The R code "%s" does not evaluate to '
+                                 'a function.' % function)
+            _functions[function] = res
+        return res
+    return function
+
+
+def _share(obj, minlength):
+    if minlength is None:
+        return obj
+    from rpy2.rinterface import sharedmem
+    return sharedmem.share(obj, minlength)
+
+
+def _unshare(obj, minlength):
+    if minlength is None:
+        return obj
+    from rpy2.rinterface import sharedmem
+    if isinstance(obj, sharedmem.SharedVector):
+        from rpy2.robjects import conversion
+        return conversion.ri2ro(obj.to_vector())
+    return obj
+
+
+def _unlink(objs, minlength):
+    # Free the blocks of shared memory for the SharedVector objects in
+    # `objs` that were not rebuilt (the others are already freed).
+    if minlength is None:
+        return
+    from rpy2.rinterface import sharedmem
+    for obj in objs:
+        if isinstance(obj, sharedmem.SharedVector):
+            try:
+                obj.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def _share_all(objs, minlength):
+    res = []
+    try:
+        for obj in objs:
+            res.append(_share(obj, minlength))
+    except BaseException:
+        _unlink(res, minlength)
+        raise
+    return tuple(res)
+
+
+def _unshare_all(objs, minlength):
+    objs = tuple(objs)
+    res = []
+    try:
+        for obj in objs:
+            res.append(_unshare(obj, minlength))
+    except BaseException:
+        # the blocks for the objects not rebuilt yet would never be freed
+        _unlink(objs[len(res):], minlength)
+        raise
+    return res
+
+
+class _TaskError(object):
+    """ Exception raised by a task of :meth:`RPool.map` or
+    :meth:`RPool.imap`. It is returned rather than raised so that the
+    other tasks in the same chunk are run and their results returned
+    (and their shared memory freed). """
+
+    def __init__(self, exception):
+        self.exception = exception
+
+
+def _call(function, args, kwargs):
+    values = _unshare_all(tuple(args) + tuple(kwargs.values()),
+                          _sharedmem_minlength)
+    kwargs = dict(zip(kwargs.keys(), values[len(args):]))
+    res = _resolve(function)(*values[:len(args)], **kwargs)
+    return _share(res, _sharedmem_minlength)
+
+
+def _call_star(task):
+    function, args = task
+    try:
+        args = _unshare_all(args, _sharedmem_minlength)
+        res = _resolve(function)(*args)
+        return _share(res, _sharedmem_minlength)
+    except Exception as exc:
+        return _TaskError(exc)
+
+
+class RPool(object):
+    """ Pool of `processes` worker processes (the number of CPUs by
+    default), each with its own embedded R.
+
+    :param processes: number of worker processes
+    :param initializer: callable called with `initargs` in each worker
+        once R is initialized (for example to load R packages or
+        to activate a conversion)
+    :param initargs: arguments for `initializer`
+    :param context: :mod:`multiprocessing` start method. The default
+        ('spawn') starts fresh Python processes rather than forking
+        the one with the embedded R.
+    :param sharedmem_minlength: minimum length for the vectors of type
+        REALSXP, INTSXP, or LGLSXP (arguments and results) to be sent
+        through shared memory rather than pickled (None, the default,
+        never uses shared memory).
+    """
+
+    def __init__(self, processes=None, initializer=None, initargs=(),
+                 context='spawn', sharedmem_minlength=None):
+        if processes is None:
+            processes = multiprocessing.cpu_count()
+        if processes < 1:
+            raise ValueError('The number of processes must be at least 1.')
+        if initializer is not None and not callable(initializer):
+            raise TypeError('initializer must be a callable.')
+        self._processes = processes
+        self._sharedmem_minlength = sharedmem_minlength
+        # arguments in shared memory for the tasks not completed yet
+        # (freed if the pool is terminated before the tasks are run)
+        self._pending = dict()
+        self._pending_lock = threading.Lock()
+        self._pending_keys = itertools.count()
+        ctx = multiprocessing.get_context(context)
+        self._pool = ctx.Pool(processes,
+                              initializer=_init_worker,
+                              initargs=(initializer, initargs,
+                                        sharedmem_minlength))
+
+    processes = property(lambda self: self._processes, None, None,
+                         "Number of worker processes.")
+
+    sharedmem_minlength = property(lambda self: self._sharedmem_minlength,
+                                   None, None,
+                                   "Minimum length for vectors to be sent "
+                                   "through shared memory (None if never).")
+
+    def _share(self, args):
+        """ Share `args`, and return a key for them and the shared
+        arguments. """
+        args = _share_all(args, self._sharedmem_minlength)
+        key = next(self._pending_keys)
+        if self._sharedmem_minlength is not None:
+            with self._pending_lock:
+                self._pending[key] = args
+        return key, args
+
+    def _done(self, key, unlink=False):
+        """ Forget about the arguments for the task `key`, freeing
+        their shared memory if `unlink` (when the task may not have
+        rebuilt them). """
+        with self._pending_lock:
+            args = self._pending.pop(key, ())
+        if unlink:
+            _unlink(args, self._sharedmem_minlength)
+
+    def _unshare(self, obj):
+        return _unshare(obj, self._sharedmem_minlength)
+
+    def _unshare_results(self, results):
+        """ Rebuild the results of the tasks of :meth:`map` or
+        :meth:`imap`, in order. When a task failed, the shared memory
+        for the results of the remaining tasks is freed (waiting for
+        them to complete) before its exception is raised. """
+        results = iter(results)
+        for x in results:
+            if isinstance(x, _TaskError):
+                error = x.exception
+            else:
+                try:
+                    x = self._unshare(x)
+                except Exception as exc:
+                    error = exc
+                else:
+                    yield x
+                    continue
+            for x in results:
+                if not isinstance(x, _TaskError):
+                    _unlink((x, ), self._sharedmem_minlength)
+            raise error
+
+    def submit(self, function, *args, **kwargs):
+        """ Submit the call function(*args, **kwargs) to a worker and
+        return a :class:`concurrent.futures.Future` for its result. """
+        future = concurrent.futures.Future()
+        future.set_running_or_notify_cancel()
+        key, values = self._share(tuple(args) + tuple(kwargs.values()))
+        args = values[:len(args)]
+        kwargs = dict(zip(kwargs.keys(), values[len(args):]))
+
+        def callback(res):
+            self._done(key)
+            try:
+                future.set_result(self._unshare(res))
+            except Exception as exc:
+                future.set_exception(exc)
+
+        def error_callback(exc):
+            # the task may have failed before rebuilding its arguments
+            self._done(key, unlink=True)
+            future.set_exception(exc)
+
+        try:
+            self._pool.apply_async(_call, (function, args, kwargs),
+                                   callback=callback,
+                                   error_callback=error_callback)
+        except BaseException:
+            self._done(key, unlink=True)
+            raise
+        return future
+
+    def map(self, function, *iterables, chunksize=None):
+        """ Return the list [function(*args) for args in zip(*iterables)],
+        with the calls distributed across the workers. The items
+        are sent to the workers in chunks of `chunksize` (computed
+        from the number of items and of workers by default).
+
+        If calls fail, the exception for the first one is raised once
+        all the calls are completed. """
+        tasks = []
+        try:
+            for args in zip(*iterables):
+                tasks.append(self._share(args))
+            results = self._pool.map(_call_star,
+                                     [(function, args)
+                                      for key, args in tasks],
+                                     chunksize)
+        except BaseException:
+            for key, args in tasks:
+                self._done(key, unlink=True)
+            raise
+        for key, args in tasks:
+            self._done(key)
+        return list(self._unshare_results(results))
+
+    def imap(self, function, *iterables, chunksize=1):
+        """ Lazy version of :meth:`map`, returning an iterator over
+        the results (in order).
+
+        If a call fails, its exception is raised once all the calls
+        are completed. """
+        keys = []
+
+        def tasks():
+            for args in zip(*iterables):
+                key, args = self._share(args)
+                keys.append(key)
+                yield (function, args)
+
+        def results():
+            res_iter = self._pool.imap(_call_star, tasks(), chunksize)
+            for i in itertools.count():
+                try:
+                    res = next(res_iter)
+                except StopIteration:
+                    return
+                except BaseException:
+                    if i < len(keys):
+                        self._done(keys[i], unlink=True)
+                    raise
+                self._done(keys[i])
+                yield res
+
+        return self._unshare_results(results())
+
+    def close(self):
+        """ Prevent further work from being submitted. The workers exit
+        once the work already submitted is completed. """
+        self._pool.close()
+
+    def join(self):
+        """ Wait for the workers to exit (:meth:`close` must be
+        called first). """
+        self._pool.join()
+
+    def terminate(self):
+        """ Stop the workers immediately. The shared memory for the
+        arguments of the tasks not run is freed. """
+        self._pool.terminate()
+        with self._pending_lock:
+            pending = tuple(self._pending.values())
+            self._pending.clear()
+        for args in pending:
+            _unlink(args, self._sharedmem_minlength)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.terminate()
+        self.join()
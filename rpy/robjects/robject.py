@@ -193,6 +193,21 @@ vector elements.
             l[0] = _reduce_robjectmixin
             return tuple(l)
 
+        def __reduce_ex__(self, protocol):
+            """
+            robjects-level `__reduce_ex__()`. With pickle protocol 5
+            or higher, the serialized R object can be handled out-of-band
+            (see :meth:`rpy2.rinterface.Sexp.__reduce_ex__`).
+            """
+            if protocol < 5:
+                return self.__reduce__()
+            t = super().__reduce_ex__(protocol)
+            # fix the constructor and parameters
+            l = list(t)
+            l[1] = (l[1][0], l[1][1], l[0], type(self))
+            l[0] = _reduce_robjectmixin
+            return tuple(l)
+
     
 def repr_robject(o, linesep=os.linesep):
     s = rpy2.rinterface.baseenv.get("deparse")(o)
@@ -0,0 +1,122 @@
+import unittest
+import math
+import rpy2.robjects as robjects
+import rpy2.rinterface as rinterface
+from rpy2.robjects import default_converter
+from rpy2.robjects.conversion import localconverter
+
+has_pyarrow = True
+try:
+    import pyarrow
+    import rpy2.robjects.arrow2ri as rpya
+except:
+    has_pyarrow = False
+
+
+@unittest.skipUnless(has_pyarrow, "The Python package 'pyarrow' is not installed: functionalities associated with it cannot be tested.")
+class ArrowConversionsTestCase(unittest.TestCase):
+
+    def testTable2DataFrame(self):
+        table = pyarrow.table([pyarrow.array([1.5, None, 3.0]),
+                               pyarrow.array([1, 2, None], pyarrow.int32()),
+                               pyarrow.array([True, None, False]),
+                               pyarrow.array(['a', None, 'c'])],
+                              names=['f', 'i', 'b', 's'])
+        with localconverter(default_converter + rpya.converter) as cv:
+            dataf = robjects.conversion.py2ri(table)
+        self.assertEqual('data.frame', dataf.rclass[0])
+        self.assertEqual(('f', 'i', 'b', 's'), tuple(dataf.names))
+        self.assertEqual(3, dataf.nrow)
+        is_na = robjects.baseenv['is.na']
+        for i, (first, last) in enumerate(((1.5, 3.0), (1, None),
+                                           (True, False), ('a', 'c'))):
+            column = dataf[i]
+            self.assertEqual([False, True, False], list(is_na(column)))
+            self.assertEqual(first, column[0])
+            if last is not None:
+                self.assertEqual(last, column[2])
+
+    def testChunkedArray(self):
+        array = pyarrow.chunked_array([[1, 2], [], [3, None]],
+                                      type=pyarrow.int64())
+        with localconverter(default_converter + rpya.converter) as cv:
+            res = robjects.conversion.py2ri(array)
+        # R has no 64-bit integers
+        self.assertEqual(rinterface.REALSXP, res.typeof)
+        self.assertEqual([1.0, 2.0, 3.0], list(res)[:3])
+        self.assertTrue(robjects.baseenv['is.na'](res)[3])
+
+    def testSlicedArray(self):
+        array = pyarrow.array([1, None, 3, 4], pyarrow.int32()).slice(1, 3)
+        with localconverter(default_converter + rpya.converter) as cv:
+            res = robjects.conversion.py2ri(array)
+        self.assertEqual([rinterface.NA_Integer, 3, 4], list(res))
+
+    def testDictionary2Factor(self):
+        chunks = [pyarrow.array(['b', 'a', None]).dictionary_encode(),
+                  pyarrow.array(['c', 'a']).dictionary_encode()]
+        array = pyarrow.chunked_array(chunks)
+        with localconverter(default_converter + rpya.converter) as cv:
+            res = robjects.conversion.py2ri(array)
+        self.assertEqual(('factor', ), tuple(res.rclass))
+        self.assertEqual(('b', 'a', 'c'), tuple(res.do_slot('levels')))
+        self.assertEqual([1, 2, rinterface.NA_Integer, 3, 2], list(res))
+
+    def testTimestamp2POSIXct(self):
+        array = pyarrow.array([1335954600500, None],
+                              pyarrow.timestamp('ms', tz='Europe/Paris'))
+        with localconverter(default_converter + rpya.converter) as cv:
+            res = robjects.conversion.py2ri(array)
+        self.assertEqual(('POSIXct', 'POSIXt'), tuple(res.rclass))
+        self.assertEqual('Europe/Paris', res.do_slot('tzone')[0])
+        self.assertEqual(1335954600.5, res[0])
+        self.assertTrue(robjects.baseenv['is.na'](res)[1])
+
+    def testDataFrame2Table(self):
+        dataf = robjects.r('data.frame(f=c(1.5, NA, NaN), '
+                           '           i=c(1L, NA, 3L), '
+                           '           b=c(TRUE, NA, FALSE), '
+                           '           s=c("a", NA, "c"), '
+                           '           g=factor(c("x", NA, "y")), '
+                           '           stringsAsFactors=FALSE)')
+        with localconverter(default_converter + rpya.converter) as cv:
+            table = robjects.conversion.ri2py(dataf)
+        self.assertIsInstance(table, pyarrow.Table)
+        self.assertEqual(['f', 'i', 'b', 's', 'g'], table.column_names)
+        columns = [table.column(i) for i in range(table.num_columns)]
+        for column in columns:
+            self.assertEqual(1, column.null_count)
+        self.assertEqual(pyarrow.float64(), columns[0].type)
+        # NaN is not NA
+        self.assertTrue(math.isnan(columns[0][2].as_py()))
+        self.assertEqual(pyarrow.int32(), columns[1].type)
+        self.assertEqual(pyarrow.bool_(), columns[2].type)
+        self.assertEqual([True, None, False], columns[2].to_pylist())
+        self.assertEqual(['a', None, 'c'], columns[3].to_pylist())
+        self.assertTrue(pyarrow.types.is_dictionary(columns[4].type))
+        self.assertEqual(['x', None, 'y'], columns[4].to_pylist())
+
+    def testPOSIXct2Timestamp(self):
+        r_time = robjects.r('as.POSIXct(c(1335954600.5, NA), '
+                            '           origin="1970-01-01", tz="UTC")')
+        with localconverter(default_converter + rpya.converter) as cv:
+            array = robjects.conversion.ri2py(r_time)
+        self.assertEqual(pyarrow.timestamp('us', 'UTC'), array.type)
+        self.assertEqual(1, array.null_count)
+        self.assertEqual(1335954600500000, array.cast(pyarrow.int64())[0].as_py())
+
+    def testRoundTrip(self):
+        table = pyarrow.table({'x': pyarrow.array([1.0, None, 2.5]),
+                               'y': pyarrow.array(['u', 'v', None])})
+        with localconverter(default_converter + rpya.converter) as cv:
+            robjects.globalenv['arrow_dataf'] = table
+            res = robjects.conversion.ri2py(robjects.globalenv['arrow_dataf'])
+        del(robjects.globalenv['arrow_dataf'])
+        self.assertTrue(table.equals(res))
+
+
+def suite():
+    return unittest.TestLoader().loadTestsFromTestCase(ArrowConversionsTestCase)
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
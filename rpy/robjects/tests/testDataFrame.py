@@ -47,6 +47,56 @@ class DataFrameTestCase(unittest.TestCase):
         dataf = robjects.DataFrame(od, stringsasfactor=False)
         self.assertTrue(isinstance(dataf.rx2('b'), robjects.StrVector))
 
+    def testFrom_columns(self):
+        od = rlc.OrdDict((('a', robjects.IntVector((1, 2, 3))),
+                          ('b', robjects.StrVector(('c', 'd', 'e')))))
+        dataf = robjects.DataFrame.from_columns(od)
+        self.assertEqual("data.frame", dataf.rclass[0])
+        self.assertEqual((3, 2), (dataf.nrow, dataf.ncol))
+        self.assertEqual(('a', 'b'), tuple(dataf.colnames))
+        self.assertEqual(('1', '2', '3'), tuple(dataf.rownames))
+        # compact row names
+        row_names = robjects.baseenv['.row_names_info'](dataf, 0)
+        self.assertEqual(rinterface.NA_Integer, row_names[0])
+        self.assertEqual(-3, row_names[1])
+        self.assertTrue(robjects.r['identical'](
+            dataf,
+            robjects.r('data.frame(a=1:3, b=c("c", "d", "e"), '
+                       '           stringsAsFactors=FALSE)'))[0])
+
+    def testFrom_columnsRownames(self):
+        dataf = robjects.DataFrame.from_columns(
+            (('a', robjects.IntVector((1, 2))),
+             ('a', robjects.FloatVector((3, 4)))),
+            row_names=('x', 'y'))
+        self.assertEqual(('a', 'a'), tuple(dataf.colnames))
+        self.assertEqual(('x', 'y'), tuple(dataf.rownames))
+
+    def testFrom_columnsEmpty(self):
+        dataf = robjects.DataFrame.from_columns(())
+        self.assertEqual((0, 0), (dataf.nrow, dataf.ncol))
+
+    def testFrom_columnsValidate(self):
+        columns = (('a', robjects.IntVector((1, 2))),
+                   ('b', robjects.IntVector((1, 2, 3))))
+        self.assertRaises(ValueError,
+                          robjects.DataFrame.from_columns, columns)
+        self.assertRaises(ValueError,
+                          robjects.DataFrame.from_columns,
+                          (('a', robjects.IntVector((1, 2))), ),
+                          row_names=('x', ))
+        self.assertRaises(ValueError,
+                          robjects.DataFrame.from_columns,
+                          ((1, robjects.IntVector((1, 2))), ))
+        # duplicated row names
+        self.assertRaises(ValueError,
+                          robjects.DataFrame.from_columns,
+                          (('a', robjects.IntVector((1, 2))), ),
+                          row_names=('x', 'x'))
+        # no validation
+        dataf = robjects.DataFrame.from_columns(columns, validate=False)
+        self.assertEqual(2, dataf.ncol)
+
     def testDim(self):
         letters = robjects.r.letters        
         numbers = robjects.r('1:26')
@@ -2,6 +2,7 @@ import unittest
 import rpy2.robjects as robjects
 rinterface = robjects.rinterface
 import array
+import asyncio
 
 identical = rinterface.baseenv["identical"]
 Function = robjects.functions.Function
@@ -39,6 +40,19 @@ class FunctionTestCase(unittest.TestCase):
         res = ri_f(ro_vec)
         self.assertEqual(6, res[0])
 
+    def testAcall(self):
+        ri_f = rinterface.baseenv.get('sum')
+        ro_f = robjects.Function(ri_f)
+        ro_v = robjects.IntVector(array.array('i', [1,2,3]))
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            res = loop.run_until_complete(ro_f.acall(ro_v))
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
+        self.assertEqual(6, res[0])
+
     def testFormals(self):
         ri_f = robjects.r('function(x, y) TRUE')
         res = ri_f.formals()
@@ -49,6 +63,48 @@ class FunctionTestCase(unittest.TestCase):
         self.assertEqual("x", n[0])
         self.assertEqual("y", n[1])
 
+    def testPrepare(self):
+        ro_f = robjects.r('function(x, y=0) x + y')
+        call = ro_f.prepare(None, 'y')
+        self.assertEqual((None, 'y'), call.names)
+        for i in range(3):
+            res = call(robjects.IntVector((1, 2)), i)
+            self.assertTrue(isinstance(res, robjects.vectors.IntVector))
+            self.assertEqual([1 + i, 2 + i], list(res))
+
+    def testMap(self):
+        ro_f = robjects.r('function(x, y) x * y')
+        args = ((i, 2.0) for i in range(10))
+        res = ro_f.map(args, chunk_size=3)
+        self.assertEqual([2.0 * i for i in range(10)],
+                         [x[0] for x in res])
+
+    def testMapSymbol(self):
+        ro_f = robjects.baseenv['identity']
+        res = list(ro_f.map(((rinterface.SexpSymbol('a'), ), )))
+        self.assertEqual(1, len(res))
+        self.assertEqual(rinterface.SYMSXP, res[0].typeof)
+
+    def testMapEmpty(self):
+        ro_f = robjects.baseenv['sum']
+        self.assertEqual([], list(ro_f.map(())))
+        # raised by the call, not when iterating
+        self.assertRaises(ValueError, ro_f.map, ((1, ), ), chunk_size=0)
+
+    def testMapKwargs(self):
+        ro_f = robjects.r('function(x, y=1, z=0) x * y + z')
+        res = ro_f.map(((i, ) for i in range(5)), chunk_size=2, y=3, z=1)
+        self.assertEqual([3.0 * i + 1 for i in range(5)],
+                         [x[0] for x in res])
+        ro_f = robjects.baseenv['paste']
+        res = ro_f.map((('a', 'b'), ('c', 'd')), sep='-')
+        self.assertEqual(['a-b', 'c-d'], [x[0] for x in res])
+
+    def testMapRError(self):
+        ro_f = robjects.baseenv['sum']
+        res = ro_f.map(((1, ), ('a', )))
+        self.assertRaises(rinterface.RRuntimeError, list, res)
+
 class SignatureTranslatedFunctionTestCase(unittest.TestCase):
     def testNewInvalid(self):
         self.assertRaises(ValueError, 
@@ -74,6 +130,14 @@ class SignatureTranslatedFunctionTestCase(unittest.TestCase):
         
         s = ro_f(ro_v)
 
+    def testPrepare(self):
+        ri_f = rinterface.baseenv.get('rank')
+        ro_f = SignatureTranslatedFunction(ri_f)
+        call = ro_f.prepare(None, 'na_last')
+        self.assertEqual((None, 'na.last'), call.names)
+        res = call(robjects.FloatVector((2, rinterface.NA_Real, 1)), False)
+        self.assertEqual([3.0, 1.0, 2.0], list(res))
+
 def suite():
     suite = unittest.TestLoader().loadTestsFromTestCase(FunctionTestCase)
     return suite
@@ -1,5 +1,6 @@
 import unittest
 import sys
+import warnings
 import rpy2.robjects as robjects
 import rpy2.robjects.conversion as conversion
 r = robjects.r
@@ -111,6 +112,30 @@ class NumpyConversionsTestCase(unittest.TestCase):
         # Make sure we got the row/column swap right:
         self.assertEqual(r["["](f3d_r, 1, 2, 3)[0], f3d[0, 1, 2])
 
+    def testArrayCOrderAndStrided(self):
+        f2d = numpy.arange(12, dtype="d").reshape((3, 4))
+        for a in (f2d, numpy.asfortranarray(f2d), f2d[::2, 1::2], f2d.T):
+            a_r = conversion.py2ri(a)
+            self.assertEqual(tuple(r["dim"](a_r)), a.shape)
+            self.assertEqual(tuple(a_r), tuple(a.ravel("F")))
+
+    def testArrayInt64(self):
+        i64 = numpy.array([[1, 2], [3, 4]], dtype="int64")
+        i64_r = conversion.py2ri(i64)
+        self.assertEqual(r["storage.mode"](i64_r)[0], "integer")
+        self.assertEqual(r["["](i64_r, 2, 1)[0], 3)
+
+    def testArrayInt64Overflow(self):
+        i64 = numpy.array([[1, 2], [3, 2**40]], dtype="int64")
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            i64_r = conversion.py2ri(i64)
+        self.assertEqual(1, len(w))
+        # the integers are converted to doubles rather than to NA
+        self.assertEqual(r["storage.mode"](i64_r)[0], "double")
+        self.assertEqual((2, 2), tuple(r["dim"](i64_r)))
+        self.assertEqual(2.0**40, r["["](i64_r, 2, 2)[0])
+
     def testScalar(self):
         i32 = numpy.int32(100)
         i32_r = conversion.py2ri(i32)
@@ -174,6 +199,11 @@ class NumpyConversionsTestCase(unittest.TestCase):
         self.assertEqual(1, rec.a[0])
         self.assertEqual(2, rec.b[0])
 
+    def testDataFrameFactorToNumpy(self):
+        df = robjects.r('data.frame(a=factor(c("x", NA, "y", "x")))')
+        rec = conversion.ri2py(df)
+        self.assertEqual(['x', None, 'y', 'x'], list(rec.a))
+
     def testAtomicVectorToNumpy(self):
         v = robjects.vectors.IntVector((1,2,3))
         a = rpyn.ri2py(v)
@@ -187,6 +217,33 @@ class NumpyConversionsTestCase(unittest.TestCase):
         b = df.rx2('B')
         self.assertEquals(tuple((1,2,3)), tuple(b))
 
+    def testRi2pyViewSharesMemory(self):
+        v = robjects.vectors.FloatVector((1.0, 2.0, 3.0))
+        a = rpyn.ri2py_view(v)
+        self.assertEqual(numpy.float64, a.dtype)
+        a[0] = 10.0
+        self.assertEqual(10.0, v[0])
+
+    def testRi2pyViewKeepsRObject(self):
+        import gc
+        a = rpyn.ri2py_view(robjects.r('c(1L, 2L, 3L)'))
+        gc.collect()
+        robjects.r('gc()')
+        self.assertEqual([1, 2, 3], list(a))
+
+    def testRi2pyViewTypes(self):
+        a = rpyn.ri2py_view(robjects.r('c(TRUE, NA)'))
+        self.assertEqual(numpy.int32, a.dtype)
+        self.assertEqual(1, a[0])
+        a = rpyn.ri2py_view(robjects.r('complex(real=1, imaginary=2)'))
+        self.assertEqual(numpy.complex128, a.dtype)
+        self.assertEqual(1+2j, a[0])
+        a = rpyn.ri2py_view(robjects.r('matrix(1:6, nrow=2)'))
+        self.assertEqual((2, 3), a.shape)
+        self.assertEqual(3, a[0, 1])
+        self.assertRaises(ValueError, rpyn.ri2py_view,
+                          robjects.r('c("a", "b")'))
+
 def suite():
     if has_numpy:
         return unittest.TestLoader().loadTestsFromTestCase(NumpyConversionsTestCase)
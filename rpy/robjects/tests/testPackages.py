@@ -49,6 +49,20 @@ class PackagesTestCase(unittest.TestCase):
                           robjects.packages.Package,
                           env, "dummy_package")
 
+    def testNewLazy(self):
+        env = robjects.Environment()
+        env['a.a'] = robjects.StrVector('abcd')
+        env['c'] = robjects.r(''' function(x) x^2''')
+        pck = robjects.packages.Package(env, "dummy_package", lazy=True)
+        self.assertFalse('a_a' in pck.__dict__)
+        self.assertTrue('a_a' in dir(pck))
+        self.assertTrue('c' in dir(pck))
+        self.assertTrue(isinstance(pck.a_a, robjects.Vector))
+        self.assertTrue('a_a' in pck.__dict__)
+        self.assertTrue(isinstance(pck.c, robjects.Function))
+        self.assertRaises(AttributeError, getattr, pck, 'a.a')
+        self.assertRaises(AttributeError, getattr, pck, 'd')
+
 class SignatureTranslatedAnonymousPackagesTestCase(unittest.TestCase):
     string = """
    square <- function(x) {
@@ -104,6 +118,18 @@ class ImportrTestCase(unittest.TestCase):
                 sys.stdout = stdout
                 tmp_file.close()
 
+
+    def testImportStatsLazy(self):
+        stats = robjects.packages.importr('stats',
+                                          on_conflict='warn',
+                                          lazy=True)
+        self.assertTrue('rnorm' in dir(stats))
+        self.assertFalse('rnorm' in stats.__dict__)
+        self.assertTrue(isinstance(stats.rnorm,
+                                   robjects.functions.DocumentedSTFunction))
+        self.assertTrue(isinstance(stats.t_test,
+                                   robjects.functions.SignatureTranslatedFunction))
+        self.assertEqual('t.test', stats.t_test.__rname__)
         
     def testImportDatasets(self):
         datasets = robjects.packages.importr('datasets')
@@ -49,6 +49,14 @@ class PandasConversionsTestCase(unittest.TestCase):
         self.assertEqual(l, len(conversion.py2ri.registry))
         self.assertEqual(k, set(conversion.py2ri.registry.keys()))
 
+    def testActivateDeactivateRestores(self):
+        c = robjects.conversion.get_conversion()
+        for i in range(3):
+            rpyp.activate()
+            self.assertFalse(c is robjects.conversion.get_conversion())
+            rpyp.deactivate()
+            self.assertTrue(c is robjects.conversion.get_conversion())
+
     def testDataFrame(self):
         # Content for test data frame
         l = (('b', numpy.array([True, False, True], dtype=numpy.bool_)),
@@ -76,6 +84,25 @@ class PandasConversionsTestCase(unittest.TestCase):
                              type(col_s))
             self.assertSequenceEqual(col_s.levels, [b"b", b"c", b"d"])
             
+    def testDataFrameColumns(self):
+        pd_df = pandas.DataFrame(OrderedDict((('a b', [1.5, 2.5]),
+                                              ('c', [1, 2]))),
+                                 index=['x', 'y'])
+        with localconverter(default_converter + rpyp.converter) as cv:
+            rp_df = robjects.conversion.py2ri(pd_df)
+        self.assertEqual(('a b', 'c'), tuple(rp_df.names))
+        self.assertEqual(('x', 'y'), tuple(rp_df.rownames))
+        # no names or dim attributes for the columns
+        self.assertEqual((), tuple(rp_df[0].list_attrs()))
+
+    def testDataFrameDuplicatedIndex(self):
+        pd_df = pandas.DataFrame({'a': [1, 2, 3]}, index=['x', 'x', 'y'])
+        with localconverter(default_converter + rpyp.converter) as cv:
+            rp_df = robjects.conversion.py2ri(pd_df)
+        # as with R's data.frame(), the row names are the row numbers
+        self.assertEqual(('1', '2', '3'), tuple(rp_df.rownames))
+        self.assertEqual(3, robjects.baseenv['nrow'](rp_df)[0])
+
     def testSeries(self):
         Series = pandas.core.series.Series
         s = Series(numpy.random.randn(5), index=['a', 'b', 'c', 'd', 'e'])
@@ -108,6 +135,25 @@ class PandasConversionsTestCase(unittest.TestCase):
             #rp_c = robjects.conversion.py2ri(category)
             #self.assertEqual(rinterface.IntSexpVector, type(rp_c))
 
+    def testCategory2FactorNA(self):
+        category = pandas.Series(pandas.Categorical(["b", None, "a", "b"],
+                                                    categories=["b", "a"],
+                                                    ordered=True))
+        with localconverter(default_converter + rpyp.converter) as cv:
+            rp_c = robjects.conversion.py2ri(category)
+        self.assertEqual(('ordered', 'factor'), tuple(rp_c.rclass))
+        self.assertEqual(('b', 'a'), tuple(rp_c.levels))
+        self.assertEqual([1, rinterface.NA_Integer, 2, 1],
+                         list(rinterface.IntSexpVector(rp_c)))
+
+    def testFactor2CategoryNA(self):
+        factor = robjects.r('factor(c("a", NA, "b"), levels=c("b", "a"))')
+        with localconverter(default_converter + rpyp.converter) as cv:
+            rp_c = robjects.conversion.ri2py(factor)
+        self.assertEqual([1, -1, 0], list(rp_c.codes))
+        self.assertEqual(['b', 'a'], list(rp_c.categories))
+        self.assertFalse(rp_c.ordered)
+
     def testTimeR2Pandas(self):
         tzone = rpyp.get_timezone()
         dt = [datetime(1960, 5, 2),
@@ -127,6 +173,41 @@ class PandasConversionsTestCase(unittest.TestCase):
         # Check that the round trip did not introduce changes
         for expected, obtained in zip(dt, py_time):
             self.assertEqual(expected, obtained.to_pydatetime())
+
+    def testTimeR2PandasTzone(self):
+        r_time = robjects.r('as.POSIXct(c("2012-05-02 10:30:00.25", NA), '
+                            '           tz="America/New_York")')
+        with localconverter(default_converter + rpyp.converter) as cv:
+            py_time = robjects.conversion.ri2py(r_time)
+        self.assertEqual('America/New_York', str(py_time.tz))
+        self.assertEqual(pandas.Timestamp('2012-05-02 10:30:00.25',
+                                          tz='America/New_York'),
+                         py_time[0])
+        self.assertTrue(pandas.isnull(py_time[1]))
+
+    def testTimePandas2R(self):
+        s = pandas.Series(pandas.to_datetime(['2012-05-02 10:30:00.5',
+                                              None,
+                                              '1960-01-01']))
+        with localconverter(default_converter + rpyp.converter) as cv:
+            r_time = robjects.conversion.py2ri(s)
+        self.assertEqual(('POSIXct', 'POSIXt'), tuple(r_time.rclass))
+        # dates without a time zone are in R's local time zone
+        r_format = robjects.baseenv['format']
+        self.assertEqual('2012-05-02 10:30:00.5',
+                         r_format(r_time, '%Y-%m-%d %H:%M:%OS1')[0])
+        self.assertTrue(robjects.r['is.na'](r_time)[1])
+        self.assertEqual('1960-01-01 00:00:00.0',
+                         r_format(r_time, '%Y-%m-%d %H:%M:%OS1')[2])
+
+    def testTimePandas2RTzone(self):
+        s = pandas.Series(pandas.date_range('2012-05-02', periods=3,
+                                            freq='H', tz='Europe/Paris'))
+        with localconverter(default_converter + rpyp.converter) as cv:
+            r_time = robjects.conversion.py2ri(s)
+            self.assertEqual('Europe/Paris', r_time.do_slot('tzone')[0])
+            py_time = robjects.conversion.ri2py(r_time)
+        self.assertEqual(list(s), list(py_time))
         
         
     def testRepr(self):
@@ -159,7 +240,20 @@ class PandasConversionsTestCase(unittest.TestCase):
         self.assertEquals(('a', 'b', 'c'), tuple(pandas_df.keys()))
         self.assertEquals(pandas_df['a'].dtype, numpy.dtype('int32'))
         self.assertEquals(pandas_df['b'].dtype, numpy.dtype('O'))
-        self.assertEquals(pandas_df['c'].dtype, numpy.dtype('O'))
+        self.assertEquals(pandas_df['c'].dtype.name, 'category')
+
+    def testRi2pandasColumns(self):
+        rdataf = robjects.r('data.frame(a=c(1.5, 2.5), '
+                            '           b=factor(c("x", NA)), '
+                            '           a=c(TRUE, FALSE), '
+                            '           check.names=FALSE)')
+        with localconverter(default_converter + rpyp.converter) as cv:
+            pandas_df = robjects.conversion.ri2py(rdataf)
+        self.assertEquals(('a', 'b', 'a'), tuple(pandas_df.columns))
+        self.assertEquals([1.5, 2.5], list(pandas_df.iloc[:, 0]))
+        self.assertEquals('category', pandas_df['b'].dtype.name)
+        self.assertEquals([0, -1], list(pandas_df['b'].cat.codes))
+        self.assertEquals([1, 0], list(pandas_df.iloc[:, 2]))
     
     def testRi2pandas_issue207(self):
         d = robjects.DataFrame({'x': 1})
@@ -0,0 +1,106 @@
+import os
+import unittest
+import rpy2.robjects as robjects
+from rpy2.robjects.packages import importr
+from rpy2.robjects.pool import RPool
+
+
+def _set_x(value):
+    robjects.globalenv['x'] = value
+
+
+class RPoolTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.pool = RPool(processes=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.close()
+        cls.pool.join()
+
+    def testNewInvalid(self):
+        self.assertRaises(ValueError, RPool, processes=0)
+        self.assertRaises(TypeError, RPool, processes=1, initializer=3)
+
+    def testProcesses(self):
+        self.assertEqual(2, self.pool.processes)
+
+    def testSubmitString(self):
+        f = self.pool.submit('function(x, y) x + y', 1, y=2)
+        self.assertEqual(3, f.result()[0])
+
+    def testSubmitFunction(self):
+        rsum = robjects.r['sum']
+        f = self.pool.submit(rsum, robjects.IntVector((1, 2, 3)))
+        self.assertEqual(6, f.result()[0])
+
+    def testSubmitImportr(self):
+        stats = importr('stats')
+        f = self.pool.submit(stats.qnorm, 0.5)
+        self.assertEqual(0, f.result()[0])
+
+    def testSubmitError(self):
+        f = self.pool.submit('function() stop("boom")')
+        self.assertRaises(Exception, f.result)
+
+    def testSubmitNotFunction(self):
+        f = self.pool.submit('1:3')
+        self.assertRaises(ValueError, f.result)
+
+    def testMap(self):
+        res = self.pool.map('function(i) i * 2', range(10))
+        self.assertEqual([2 * i for i in range(10)],
+                         [x[0] for x in res])
+
+    def testMapSeveralIterables(self):
+        rpaste = robjects.r['paste']
+        res = self.pool.map(rpaste, 'abc', 'xyz', chunksize=2)
+        self.assertEqual(['a x', 'b y', 'c z'], [x[0] for x in res])
+
+    def testImap(self):
+        res = self.pool.imap('function(i) i + 1', range(5))
+        self.assertEqual([1, 2, 3, 4, 5], [x[0] for x in res])
+
+    def testSharedMemory(self):
+        with RPool(processes=1, sharedmem_minlength=10) as pool:
+            self.assertEqual(10, pool.sharedmem_minlength)
+            x = robjects.FloatVector(range(100))
+            f = pool.submit('function(x) x * 2', x)
+            res = f.result()
+            self.assertTrue(isinstance(res, robjects.FloatVector))
+            self.assertEqual([2.0 * i for i in range(100)], list(res))
+            m = robjects.r.matrix(robjects.IntVector(range(20)), nrow=4)
+            res = pool.map('function(m, i) m + i', (m, m), (1, 2))
+            self.assertEqual((4, 5), tuple(res[1].dim))
+            self.assertEqual([i + 2 for i in range(20)], list(res[1]))
+
+    @unittest.skipUnless(os.path.isdir('/dev/shm'),
+                         'no /dev/shm to list the blocks of shared memory')
+    def testSharedMemoryFreedOnError(self):
+        before = set(os.listdir('/dev/shm'))
+        x = robjects.FloatVector(range(100))
+        with RPool(processes=2, sharedmem_minlength=10) as pool:
+            self.assertRaises(Exception, pool.map,
+                              'function(x, i) if (i == 2) stop("boom") else x',
+                              (x, ) * 4, range(4), chunksize=1)
+            res = pool.imap('function(x, i) if (i == 0) stop("boom") else x',
+                            (x, ) * 4, range(4))
+            self.assertRaises(Exception, list, res)
+            f = pool.submit('function(x, y) stop("boom")', x, y=x)
+            self.assertRaises(Exception, f.result)
+        self.assertEqual(set(), set(os.listdir('/dev/shm')) - before)
+
+    def testInitializer(self):
+        with RPool(processes=1, initializer=_set_x, initargs=(3, )) as pool:
+            f = pool.submit('function() x')
+            self.assertEqual(3, f.result()[0])
+
+
+def suite():
+    suite = unittest.TestLoader().loadTestsFromTestCase(RPoolTestCase)
+    return suite
+
+if __name__ == '__main__':
+     unittest.main()
@@ -2,6 +2,7 @@ import unittest
 import rpy2.robjects as robjects
 rinterface = robjects.rinterface
 import array
+import sys
 import tempfile
 
 class RObjectTestCase(unittest.TestCase):
@@ -84,6 +85,17 @@ class RObjectPicklingTestCase(unittest.TestCase):
                                                       robj_again)[0])
         tmp_file.close()
 
+    @unittest.skipIf(sys.version_info < (3, 8), 'pickle protocol 5 is missing')
+    def testPickleOutOfBand(self):
+        robj = robjects.FloatVector(range(10))
+        buffers = []
+        robj_pickled = pickle.dumps(robj, protocol=5,
+                                    buffer_callback=buffers.append)
+        robj_again = pickle.loads(robj_pickled, buffers=buffers)
+        self.assertTrue(isinstance(robj_again, robjects.FloatVector))
+        self.assertTrue(robjects.baseenv["identical"](robj,
+                                                      robj_again)[0])
+
 import rpy2.robjects.methods
 
 class RS4TestCase(unittest.TestCase):
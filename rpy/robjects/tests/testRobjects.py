@@ -2,6 +2,8 @@ import unittest
 import rpy2.robjects as robjects
 rinterface = robjects.rinterface
 import array
+import asyncio
+import threading
 
 import sys
 
@@ -32,6 +34,18 @@ class RInstanceTestCase(unittest.TestCase):
         x = robjects.baseenv['seq'](1, 50, 2)
         res = robjects.r('sum(%s)' %x.r_repr())
         self.assertEqual(625, res[0])
+
+    def testAcall(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            res = loop.run_until_complete(robjects.r.acall('sum(1:10)'))
+            res2 = loop.run_until_complete(robjects.areval('sum(1:4)'))
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
+        self.assertEqual(55, res[0])
+        self.assertEqual(10, res2[0])
         
 class MappingTestCase(unittest.TestCase):
 
@@ -121,6 +135,176 @@ class MappingTestCase(unittest.TestCase):
         self.assertEqual(rinterface.CLOSXP, rob.typeof)
 
 
+    def testMapperR2Python_vectors(self):
+        for code, cls in (('matrix(1:4, nrow=2)', robjects.vectors.Matrix),
+                          ('array(1:8, dim=c(2, 2, 2))', robjects.vectors.Array),
+                          ('factor("a")', robjects.vectors.FactorVector),
+                          ('Sys.time()', robjects.vectors.POSIXct),
+                          ('data.frame(a=1)', robjects.vectors.DataFrame),
+                          ('1', robjects.vectors.FloatVector),
+                          ('list(1)', robjects.vectors.ListVector),
+                          ('y ~ x', robjects.Formula)):
+            self.assertEqual(cls, type(robjects.r(code)))
+
+    def testConverterCache(self):
+        converter = robjects.conversion.Converter('test')
+        class A(object):
+            pass
+        class B(A):
+            pass
+        converter.py2ri.register(A, lambda obj: 'A')
+        self.assertEqual('A', converter.py2ri(B()))
+        # the implementation cached for B is replaced
+        converter.py2ri.register(B, lambda obj: 'B')
+        self.assertEqual('B', converter.py2ri(B()))
+        self.assertEqual('A', converter.py2ri(A()))
+        self.assertRaises(NotImplementedError, converter.py2ri, 1)
+
+    def testConverterConcurrentRegister(self):
+        converter = robjects.conversion.Converter('test')
+        classes = [type('A%i' % i, (object, ), {}) for i in range(200)]
+        errors = []
+        def f():
+            try:
+                for cls in classes:
+                    converter.py2ri.register(cls, lambda obj: 'A')
+            except Exception as e:
+                errors.append(e)
+        t = threading.Thread(target=f)
+        t.start()
+        try:
+            while t.is_alive():
+                for cls in classes:
+                    converter.py2ri.dispatch(cls)
+        finally:
+            t.join()
+        self.assertEqual([], errors)
+        # no implementation built before a registration is left in the cache
+        for cls in classes:
+            self.assertEqual('A', converter.py2ri(cls()))
+
+    def testConverterAdd(self):
+        class A(object):
+            pass
+        c1 = robjects.conversion.Converter('c1')
+        c2 = robjects.conversion.Converter('c2')
+        c1.py2ri.register(A, lambda obj: 'c1')
+        c1.py2ri.register(int, lambda obj: 'c1')
+        c2.py2ri.register(A, lambda obj: 'c2')
+        c = c1 + c2
+        self.assertEqual('c2', c.py2ri(A()))
+        self.assertEqual('c1', c.py2ri(1))
+        self.assertEqual(set((object, A, int)), set(c.py2ri.registry.keys()))
+        # the sum is layered on c1 and c2
+        c2.py2ri.register(int, lambda obj: 'c2')
+        self.assertEqual('c2', c.py2ri(1))
+        # the sum is memoized, unless rules are registered in it
+        self.assertTrue(c1 + c2 is c)
+        c.py2ri.register(int, lambda obj: 'c')
+        self.assertFalse(c1 + c2 is c)
+        self.assertEqual('c2', (c1 + c2).py2ri(1))
+
+    def testLocalconverter(self):
+        class A(object):
+            pass
+        c = robjects.conversion.Converter('c')
+        c.py2ri.register(A, lambda obj: 'c')
+        with robjects.conversion.localconverter(c) as cv:
+            self.assertEqual('c', robjects.conversion.py2ri(A()))
+            # rules registered in the context do not change c
+            cv.py2ri.register(A, lambda obj: 'cv')
+            self.assertEqual('cv', robjects.conversion.py2ri(A()))
+        self.assertEqual('c', c.py2ri(A()))
+        with robjects.conversion.localconverter(c) as cv2:
+            self.assertFalse(cv2 is cv)
+            self.assertEqual('c', robjects.conversion.py2ri(A()))
+        # without rules registered in it, the converter in context is reused
+        with robjects.conversion.localconverter(c) as cv3:
+            self.assertTrue(cv3 is cv2)
+
+    def testLocalconverterThread(self):
+        class A(object):
+            pass
+        c = robjects.conversion.Converter('c')
+        c.py2ri.register(A, lambda obj: 'c')
+        res = []
+        def f():
+            try:
+                res.append(robjects.conversion.py2ri(A()))
+            except NotImplementedError:
+                res.append(None)
+        with robjects.conversion.localconverter(c) as cv:
+            # the rules are local to this thread
+            t = threading.Thread(target=f)
+            t.start()
+            t.join()
+            f()
+        self.assertEqual([None, 'c'], res)
+
+    @unittest.skipIf(sys.version_info < (3, 7),
+                     'contextvars requires Python >= 3.7')
+    def testLocalconverterAsyncio(self):
+        class A(object):
+            pass
+        converters = [robjects.conversion.Converter('c%i' % i)
+                      for i in range(3)]
+        for i, c in enumerate(converters):
+            c.py2ri.register(A, lambda obj, i=i: i)
+        async def task(c):
+            with robjects.conversion.localconverter(c):
+                await asyncio.sleep(0.01)
+                return robjects.conversion.py2ri(A())
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            res = loop.run_until_complete(
+                asyncio.gather(*(task(c) for c in converters)))
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
+        self.assertEqual([0, 1, 2], res)
+
+    def testLocalconverterReentered(self):
+        class A(object):
+            pass
+        c1 = robjects.conversion.Converter('c1')
+        c1.py2ri.register(A, lambda obj: 'c1')
+        c2 = robjects.conversion.Converter('c2')
+        c2.py2ri.register(A, lambda obj: 'c2')
+        ctx1 = robjects.conversion.localconverter(c1)
+        ctx2 = robjects.conversion.localconverter(c2)
+        with ctx1:
+            with ctx2:
+                with ctx1:
+                    self.assertEqual('c1', robjects.conversion.py2ri(A()))
+                self.assertEqual('c2', robjects.conversion.py2ri(A()))
+            self.assertEqual('c1', robjects.conversion.py2ri(A()))
+        # the same instance entered in two threads at once
+        entered = threading.Barrier(2)
+        res = []
+        def f():
+            with ctx2:
+                entered.wait()
+                entered.wait()
+                res.append(robjects.conversion.py2ri(A()))
+            res.append(robjects.conversion.get_conversion() is ctx2.ctx_converter)
+        t = threading.Thread(target=f)
+        t.start()
+        with ctx2:
+            entered.wait()
+        entered.wait()
+        t.join()
+        self.assertEqual(['c2', False], res)
+        self.assertFalse(robjects.conversion.get_conversion() is ctx2.ctx_converter)
+
+    def testConversionExtraArguments(self):
+        class A(object):
+            pass
+        c = robjects.conversion.Converter('c')
+        c.py2ri.register(A, lambda obj, x, y=None: (x, y))
+        with robjects.conversion.localconverter(c):
+            self.assertEqual((1, 2), robjects.conversion.py2ri(A(), 1, y=2))
+
     def testOverride_ri2ro(self):
         class Density(object):
             def __init__(self, x):
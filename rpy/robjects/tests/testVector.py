@@ -113,6 +113,13 @@ class VectorTestCase(unittest.TestCase):
         letters = robjects.baseenv["letters"]
         self.assertRaises(IndexError, letters.__getitem__, 26)
 
+    def testIterList(self):
+        # the items are converted as with __getitem__
+        vec = robjects.r('list(1, "a")')
+        res = list(vec)
+        self.assertTrue(isinstance(res[0], robjects.vectors.FloatVector))
+        self.assertTrue(isinstance(res[1], robjects.vectors.StrVector))
+
     def testSetItem(self):
         vec = robjects.r.seq(1, 10)
         vec[0] = 20
@@ -1190,6 +1190,73 @@ class DataFrame(ListVector):
         res = utils_ri['head'](self, *args, **kwargs)
         return conversion.ri2ro(res)
     
+    @staticmethod
+    def from_columns(columns, row_names=None, validate=True):
+        """ Create an instance from columns, without calling R's function
+        `data.frame()`: the R list is assembled directly, with its attributes
+        `names`, `class`, and `row.names` (by default the compact form
+        R uses for row names 1 to n). The columns are not copied,
+        and not recycled to a common length.
+
+        :param columns: mapping name -> column, or sequence of
+                    (name, column) pairs. Columns that are not R objects
+                    are converted with :func:`conversion.py2ri`.
+        :param row_names: sequence of row names, or None.
+        :param validate: Boolean indicating whether the names of the
+                    columns should be checked to be strings, the
+                    columns to be R vectors with as many items as there
+                    are rows, and the row names to be unique and
+                    as many as there are items in the columns
+                    (a ValueError is raised otherwise).
+                    Invalid columns or row names make invalid R data
+                    frames.
+        """
+        if hasattr(columns, 'items'):
+            columns = columns.items()
+        names = list()
+        values = list()
+        for name, value in columns:
+            if not isinstance(value, Sexp):
+                value = conversion.py2ri(value)
+            names.append(name)
+            values.append(value)
+        if row_names is None:
+            nrow = len(values[0]) if len(values) > 0 else 0
+        else:
+            if not isinstance(row_names, Sexp):
+                row_names = StrSexpVector(tuple(row_names))
+            nrow = len(row_names)
+        if validate:
+            if row_names is not None:
+                if len(values) > 0 and len(values[0]) != nrow:
+                    raise ValueError('There are %i row names, and the '
+                                     'columns have %i items.' %
+                                     (nrow, len(values[0])))
+                if len(set(row_names)) != nrow:
+                    raise ValueError('The row names must be unique.')
+            for name, value in zip(names, values):
+                if not isinstance(name, str):
+                    raise ValueError('Column names must be strings '
+                                     '(and we get %s).' % repr(name))
+                if not isinstance(value, SexpVector):
+                    raise ValueError('The column "%s" is not an R vector.' %
+                                     name)
+                if len(value) != nrow:
+                    raise ValueError('The column "%s" has %i items, '
+                                     'and there are %i rows.' %
+                                     (name, len(value), nrow))
+        res = ListSexpVector(values)
+        res.do_slot_assign('names', StrSexpVector(names))
+        if row_names is None:
+            # compact row names c(NA, -nrow), as in R's .set_row_names()
+            if nrow > 0:
+                row_names = IntSexpVector((NA_Integer, -nrow))
+            else:
+                row_names = IntSexpVector(())
+        res.do_slot_assign('row.names', row_names)
+        res.do_slot_assign('class', DataFrame._dataframe_name)
+        return DataFrame(res)
+
     @staticmethod
     def from_csvfile(path, header = True, sep = ",",
                      quote = "\"", dec = ".", 
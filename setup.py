@@ -324,6 +324,10 @@ def getRinterface_ext():
                                     'rpy', 'rinterface', 'sequence.h'),
                        os.path.join(package_prefix,
                                     'rpy', 'rinterface', 'sexp.h'),
+                       os.path.join(package_prefix,
+                                    'rpy', 'rinterface', 'serialize.h'),
+                       os.path.join(package_prefix,
+                                    'rpy', 'rinterface', 'altrep.h'),
                        os.path.join(package_prefix,
                                     'rpy', 'rinterface', '_rinterface.h'),
                        os.path.join(package_prefix,